@@ -5,6 +5,7 @@ import jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
+from docu_talk.agents import HistoryPolicy
 from docu_talk.docu_talk import DocuTalk
 from mailing.mailing_bot import MailingBot
 from utils.file_io import get_encoded_image
@@ -30,6 +31,11 @@ CREDIT_EXCHANGE_RATE = CONFIG["credits"]["credit_exchange_rate"]
 MAX_ICON_FILE_SIZE = CONFIG["limits"]["max_icon_file_size"]
 MAX_NB_DOC_PER_CHATBOT = CONFIG["limits"]["max_nb_doc_per_chatbot"]
 MAX_NB_PAGES_PER_CHATBOT = CONFIG["limits"]["max_nb_pages_per_chatbot"]
+MAX_DOCUMENT_BYTES = CONFIG["limits"]["max_document_size_mb"] * 1024 ** 2
+MAX_CHATBOT_BYTES = CONFIG["limits"]["max_chatbot_size_mb"] * 1024 ** 2
+HISTORY_POLICY = HistoryPolicy(**CONFIG["history"])
+RETRIEVAL_TOP_K_DOCUMENTS = CONFIG["retrieval"]["top_k_documents"]
+SOURCES_ATTRIBUTION_MODE = CONFIG["sources"]["attribution_mode"]
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
@@ -60,11 +66,12 @@ def get_current_user(
 
     return email
 
-def check_user_access(
+async def check_user_access(
         chatbot_id: str,
         email: str,
-        check_admin: bool = False
-    ):
+        check_admin: bool = False,
+        use_cache: bool = True
+    ) -> None:
     """
     Verify if a user has access to a specific chatbot, with an optional admin check.
 
@@ -76,6 +83,9 @@ def check_user_access(
         The user's email to check access for.
     check_admin : bool, optional
         If True, verifies that the user has admin rights. Default is False.
+    use_cache : bool, optional
+        Whether a cached access decision can be used. Default is True. Admin checks
+        always read the database, as cache invalidations are local to an instance.
 
     Raises
     ------
@@ -84,34 +94,29 @@ def check_user_access(
         required.
     """
 
-    user_accesses = docu_talk.get_user_accesses(user_id=email)
+    decision = await docu_talk.get_access_decision(
+        chatbot_id=chatbot_id,
+        user_id=email,
+        use_cache=use_cache and not check_admin
+    )
 
-    if chatbot_id not in user_accesses:
+    if decision is None:
 
-        chatbots_data = docu_talk.db.get_data(
-            table="Chatbots",
-            filter={"id": chatbot_id}
+        raise HTTPException(
+            status_code=404,
+            detail="Chatbot not found"
         )
 
-        if len(chatbots_data) == 0:
-
-            raise HTTPException(
-                status_code=404,
-                detail="Chatbot not found"
-            )
-
-        chatbot_data = chatbots_data[0]
+    if decision.role is None and not decision.is_public:
 
-        if chatbot_data["access"] != "public":
-
-            raise HTTPException(
-                status_code=403,
-                detail="You don't have access to this chatbot"
-            )
+        raise HTTPException(
+            status_code=403,
+            detail="You don't have access to this chatbot"
+        )
 
     if check_admin:
 
-        if user_accesses.get(chatbot_id) != "Admin":
+        if decision.role != "Admin":
 
             raise HTTPException(
                 status_code=403,
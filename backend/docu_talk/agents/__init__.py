@@ -1,9 +1,24 @@
 from .chatbot.chatbot import ChatBotService
+from .chatbot.context_cache import ContextCacheManager, get_context_cache_manager
+from .chatbot.history import HistoryPolicy
+from .chatbot.retrieval import BM25Index
 from .predictor.predictor import Predictor
-from .storage import GoogleCloudStorageManager
+from .storage import (
+    BaseStorageManager,
+    GoogleCloudStorageManager,
+    LocalStorageManager,
+    get_storage_manager,
+)
 
 __all__ = [
+    "BaseStorageManager",
+    "BM25Index",
     "ChatBotService",
+    "ContextCacheManager",
     "GoogleCloudStorageManager",
-    "Predictor"
+    "HistoryPolicy",
+    "LocalStorageManager",
+    "Predictor",
+    "get_context_cache_manager",
+    "get_storage_manager"
 ]
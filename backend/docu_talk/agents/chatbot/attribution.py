@@ -0,0 +1,218 @@
+import re
+from collections import Counter, defaultdict
+
+from docu_talk.agents.chatbot.retrieval import TOKEN_PATTERN, tokenize
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+def split_sentences(text: str) -> list[str]:
+    """
+    Splits a text into sentences and list items.
+
+    Parameters
+    ----------
+    text : str
+        The text to split.
+
+    Returns
+    -------
+    list of str
+        The non-empty sentences, in order.
+    """
+
+    sentences = [s.strip(" *-#>\t") for s in SENTENCE_PATTERN.split(text)]
+
+    return [s for s in sentences if len(s) > 0]
+
+def get_shingles(
+        tokens: list[str],
+        n: int
+    ) -> set[tuple[str, ...]]:
+    """
+    Computes the set of word n-grams (shingles) of a token sequence.
+
+    Parameters
+    ----------
+    tokens : list of str
+        The tokens.
+    n : int
+        The number of words of a shingle.
+
+    Returns
+    -------
+    set of tuple of str
+        The shingles.
+    """
+
+    return {tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+
+class ShingleAttributor:
+    """
+    Attributes the sentences of an answer to the document pages they are drawn from,
+    by matching word shingles against the extracted page text.
+    """
+
+    def __init__(
+            self,
+            pages: list[dict],
+            n: int = 4
+        ) -> None:
+        """
+        Indexes the shingles of the document pages.
+
+        Parameters
+        ----------
+        pages : list of dict
+            The `DocumentPages` records, with their `document_id`, `page` and `text`.
+        n : int, optional
+            The number of words of a shingle (default is 4).
+        """
+
+        self.pages = pages
+        self.n = n
+
+        # Tokens are kept with their offsets to quote the page text verbatim
+        self.page_tokens: list[list[tuple[str, int, int]]] = []
+        self.shingles: dict[tuple[str, ...], set[int]] = defaultdict(set)
+
+        for index, page in enumerate(pages):
+
+            tokens = [
+                (match.group().lower(), match.start(), match.end())
+                for match in TOKEN_PATTERN.finditer(page["text"])
+            ]
+            self.page_tokens.append(tokens)
+
+            for shingle in get_shingles([t[0] for t in tokens], n=n):
+                self.shingles[shingle].add(index)
+
+    def get_citation(
+            self,
+            index: int,
+            shingles: set[tuple[str, ...]]
+        ) -> str:
+        """
+        Quotes the longest passage of a page covered by the shingles of a sentence.
+
+        Parameters
+        ----------
+        index : int
+            The index of the page.
+        shingles : set of tuple of str
+            The shingles of the sentence.
+
+        Returns
+        -------
+        str
+            The passage, as written in the page text.
+        """
+
+        tokens = self.page_tokens[index]
+        words = [t[0] for t in tokens]
+
+        matched = [False] * len(tokens)
+        for i in range(len(tokens) - self.n + 1):
+            if tuple(words[i:i + self.n]) in shingles:
+                matched[i:i + self.n] = [True] * self.n
+
+        best_start, best_end, start = 0, 0, None
+        for i, is_matched in enumerate(matched + [False]):
+            if is_matched and start is None:
+                start = i
+            elif not is_matched and start is not None:
+                if i - start > best_end - best_start:
+                    best_start, best_end = start, i
+                start = None
+
+        text = self.pages[index]["text"]
+
+        return text[tokens[best_start][1]:tokens[best_end - 1][2]]
+
+    def attribute_sentence(
+            self,
+            sentence: str,
+            min_overlap: float = 0.3
+        ) -> dict | None:
+        """
+        Finds the page a sentence is drawn from.
+
+        Parameters
+        ----------
+        sentence : str
+            The sentence.
+        min_overlap : float, optional
+            The minimum share of the sentence's shingles found in the page (default is
+            0.3).
+
+        Returns
+        -------
+        dict or None
+            The `document_id`, `page`, `citation` and overlap `score` of the best page,
+            or None if no page reaches the minimum overlap.
+        """
+
+        shingles = get_shingles(tokenize(sentence), n=self.n)
+        if len(shingles) == 0:
+            return None
+
+        counts = Counter(
+            index for shingle in shingles for index in self.shingles.get(shingle, ())
+        )
+        if len(counts) == 0:
+            return None
+
+        index, count = counts.most_common(1)[0]
+        score = count / len(shingles)
+        if score < min_overlap:
+            return None
+
+        source = {
+            "document_id": self.pages[index]["document_id"],
+            "page": self.pages[index]["page"],
+            "citation": self.get_citation(index=index, shingles=shingles),
+            "score": score
+        }
+
+        return source
+
+    def attribute(
+            self,
+            answer: str,
+            min_overlap: float = 0.3,
+            max_sources: int = 5
+        ) -> list[dict]:
+        """
+        Finds the pages an answer is drawn from, keeping the best matching sentence of
+        each page.
+
+        Parameters
+        ----------
+        answer : str
+            The answer.
+        min_overlap : float, optional
+            The minimum share of a sentence's shingles found in a page (default is
+            0.3).
+        max_sources : int, optional
+            The maximum number of sources (default is 5).
+
+        Returns
+        -------
+        list of dict
+            The sources, with their `document_id`, `page`, `citation` and `score`, by
+            decreasing score.
+        """
+
+        sources = {}
+        for sentence in split_sentences(answer):
+
+            source = self.attribute_sentence(sentence, min_overlap=min_overlap)
+            if source is None:
+                continue
+
+            key = (source["document_id"], source["page"])
+            if key not in sources or source["score"] > sources[key]["score"]:
+                sources[key] = source
+
+        ranking = sorted(sources.values(), key=lambda s: s["score"], reverse=True)
+
+        return ranking[:max_sources]
@@ -1,11 +1,17 @@
+import asyncio
 import json
 import logging
 import os
-from typing import Generator, Tuple
+from typing import AsyncGenerator, Generator, Literal, Tuple
 
+from google.api_core.exceptions import GoogleAPICallError
+
+from docu_talk.agents.chatbot.attribution import ShingleAttributor
+from docu_talk.agents.chatbot.context_cache import ContextCacheManager
 from docu_talk.agents.chatbot.generator import Gemini
+from docu_talk.agents.chatbot.history import HistoryPolicy
 from docu_talk.agents.chatbot.icons import get_icon_bytes
-from docu_talk.agents.storage import GoogleCloudStorageManager
+from docu_talk.agents.storage import BaseStorageManager
 from docu_talk.exceptions import BadOutputFormatError
 from utils.file_io import recursive_read
 from utils.parsing import extract_dict, extract_list, extract_list_of_dicts
@@ -32,7 +38,11 @@ class ChatBotService:
     def __init__(
             self,
             documents: list,
-            storage_manager: GoogleCloudStorageManager
+            storage_manager: BaseStorageManager,
+            chatbot_id: str | None = None,
+            context_cache: ContextCacheManager | None = None,
+            history_policy: HistoryPolicy | None = None,
+            summary: str | None = None
         ) -> None:
         """
         Initializes the ChatBotService with documents and a storage manager.
@@ -41,11 +51,25 @@ class ChatBotService:
         ----------
         documents : list
             A list of documents to associate with the chatbot.
-        storage_manager : GoogleCloudStorageManager
+        storage_manager : BaseStorageManager
             The storage manager for handling file storage operations.
+        chatbot_id : str or None, optional
+            The chatbot's unique identifier, required to share the context cache of
+            its documents (default is None).
+        context_cache : ContextCacheManager or None, optional
+            The manager of the context caches of the documents (default is None, the
+            documents are sent with every request).
+        history_policy : HistoryPolicy or None, optional
+            The policy bounding the conversation history sent with each request
+            (default is None, the default policy).
+        summary : str or None, optional
+            The summary of the conversation messages preceding `messages` (default is
+            None).
         """
 
         self.documents = documents
+        self.chatbot_id = chatbot_id
+        self.context_cache = context_cache
 
         self.gemini = Gemini(
             project_id=os.getenv("GCP_PROJECT_ID"),
@@ -54,7 +78,11 @@ class ChatBotService:
 
         self.storage_manager = storage_manager
 
+        self.history_policy = history_policy or HistoryPolicy()
+        self.summary = summary
+
         self.messages = []
+        self.last_usages = None
 
     def get_documents_contents(
             self,
@@ -90,6 +118,212 @@ class ChatBotService:
 
         return documents_contents
 
+    def get_conversation_messages(
+            self,
+            document_ids: list | None = None,
+            include_documents: bool = True
+        ) -> list[dict]:
+        """
+        Builds the messages holding the documents and the conversation history, bounded
+        by the history policy: the summary of the earlier messages followed by the
+        last messages.
+
+        Parameters
+        ----------
+        document_ids : list or None, optional
+            A list of document IDs to include in the context (default is None).
+        include_documents : bool, optional
+            Whether to include the documents, which can be left out when they are read
+            from a context cache (default is True).
+
+        Returns
+        -------
+        list of dict
+            The messages to send to the model.
+        """
+
+        messages = []
+        if include_documents:
+            messages = self.get_documents_contents(document_ids=document_ids)
+
+        if self.summary is not None:
+            summary = PROMPTS["history_summary"].format(summary=self.summary)
+            messages.append({"role": "user", "parts": [summary]})
+
+        older_messages, recent_messages = self.history_policy.split(
+            messages=self.messages,
+            summary=self.summary
+        )
+
+        # Older messages are sent verbatim until they are folded into the summary,
+        # which is due as soon as they no longer fit in the token budget
+        is_summary_due = self.history_policy.is_summary_due(
+            older_messages,
+            recent_messages=recent_messages,
+            summary=self.summary
+        )
+        if not is_summary_due:
+            recent_messages = older_messages + recent_messages
+
+        messages.extend(
+            [{"role": m["role"], "parts": [m["content"]]} for m in recent_messages]
+        )
+
+        return messages
+
+    async def summarize_history_async(
+            self,
+            model: str = "gemini-1.5-flash-002"
+        ) -> list[dict]:
+        """
+        Folds the messages falling out of the history policy into the running summary
+        of the conversation.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for summarization (default is "gemini-1.5-flash-002").
+
+        Returns
+        -------
+        list of dict
+            The messages folded into the summary, in chronological order (empty if
+            folding is not due yet, in which case the model is not called).
+        """
+
+        older_messages, recent_messages = self.history_policy.split(
+            messages=self.messages,
+            summary=self.summary
+        )
+
+        is_summary_due = self.history_policy.is_summary_due(
+            older_messages,
+            recent_messages=recent_messages,
+            summary=self.summary
+        )
+        if not is_summary_due:
+            return []
+
+        transcript = "\n\n".join(
+            f"{m['role']}: {m['content']}" for m in older_messages
+        )
+        prompt = PROMPTS["summarize_history"].format(
+            summary=self.summary or "",
+            messages=transcript
+        )
+
+        response = await self.gemini.get_answer_async(
+            messages=[{"role": "user", "parts": [prompt]}],
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        self.last_usages = response["usages"]
+        self.summary = response["answer"].strip()
+        self.messages = recent_messages
+
+        return older_messages
+
+    async def get_cached_content(
+            self,
+            model: str,
+            context: str | None = None
+        ) -> str | None:
+        """
+        Retrieves the context cache of all the documents, shared across the
+        conversations of the chatbot whatever the documents selected for a question.
+
+        Parameters
+        ----------
+        model : str
+            The model the cache is used with.
+        context : str or None, optional
+            The system instruction cached with the documents (default is None).
+
+        Returns
+        -------
+        str or None
+            The name of the cache, or None if context caching is not available.
+        """
+
+        if self.context_cache is None or self.chatbot_id is None:
+            return None
+
+        cached_content = await self.context_cache.get_cached_content(
+            chatbot_id=self.chatbot_id,
+            documents=self.documents,
+            contents=self.get_documents_contents(),
+            model=model,
+            context=context
+        )
+
+        return cached_content
+
+    async def get_answer_async(
+            self,
+            messages: list[dict],
+            model: str,
+            stream: bool = False,
+            context: str | None = None,
+            document_ids: list | None = None,
+            **kwargs
+        ):
+        """
+        Retrieves a response from the model, reading all the documents from their
+        context cache when available, and sending the selected documents ahead of the
+        messages otherwise.
+
+        Parameters
+        ----------
+        messages : list of dict
+            The messages to send to the model, without the documents.
+        model : str
+            The model to use.
+        stream : bool, optional
+            Whether to stream the response (default is False).
+        context : str or None, optional
+            Context or system instruction for the model (default is None).
+        document_ids : list or None, optional
+            A list of document IDs to send when the documents are not read from the
+            context cache (default is None).
+        kwargs : dict
+            Additional configuration options for the generation.
+
+        Returns
+        -------
+        AsyncGenerator or dict
+            A streamed response or a complete response depending on the mode.
+        """
+
+        # Caching every subset of selected documents would create a new cache for
+        # nearly every question
+        cached_content = await self.get_cached_content(model=model, context=context)
+
+        if cached_content is not None:
+            try:
+                response = await self.gemini.get_answer_async(
+                    messages=messages,
+                    stream=stream,
+                    model=model,
+                    cached_content=cached_content,
+                    **kwargs
+                )
+                return response
+            except GoogleAPICallError as e:
+                # e.g. the cache expired or was deleted by another instance
+                logger.warning(f"Failed to use context cache {cached_content}: {e}")
+
+        response = await self.gemini.get_answer_async(
+            messages=self.get_documents_contents(document_ids=document_ids) + messages,
+            stream=stream,
+            model=model,
+            context=context,
+            **kwargs
+        )
+
+        return response
+
     def reset_conversation(self) -> None:
         """
         Resets the conversation history of the chatbot.
@@ -131,6 +365,83 @@ class ChatBotService:
             }
         )
 
+    async def return_streamed_response_async(
+            self,
+            stream: AsyncGenerator
+        ) -> AsyncGenerator:
+        """
+        Handles asynchronous streaming responses from the generative model.
+
+        Parameters
+        ----------
+        stream : AsyncGenerator
+            An asynchronous generator yielding parts of the response.
+
+        Yields
+        ------
+        str or dict
+            Streamed content parts and usage data.
+        """
+
+        answer = ""
+        async for part in stream:
+
+            if isinstance(part, str):
+                answer += part
+                yield part
+            else:
+                self.last_usages = part
+
+        self.messages.append(
+            {
+                "role": "assistant",
+                "content": answer
+            }
+        )
+
+    def get_title_description_messages(self) -> list[dict]:
+        """
+        Builds the messages asking for a title and a description of the chatbot.
+
+        Returns
+        -------
+        list of dict
+            The messages to send to the model.
+        """
+
+        messages = self.get_documents_contents()
+        messages.append({"role": "user", "parts": [PROMPTS["title_description"]]})
+
+        return messages
+
+    def parse_title_description(
+            self,
+            response: dict
+        ) -> Tuple[str, str]:
+        """
+        Parses the title and description generated by the model.
+
+        Parameters
+        ----------
+        response : dict
+            The model response, containing the answer and usage information.
+
+        Returns
+        -------
+        tuple of str
+            The generated title and description.
+        """
+
+        self.last_usages = response["usages"]
+
+        try:
+            desc = extract_dict(response["answer"])
+            Desc(**desc)
+        except Exception as e:
+            raise BadOutputFormatError("Bad LLM output format") from e
+
+        return desc["title"], desc["description"]
+
     def generate_title_description(
             self,
             model: str = "gemini-1.5-flash-002",
@@ -149,45 +460,58 @@ class ChatBotService:
             The generated title and description.
         """
 
-        messages = self.get_documents_contents()
-        messages.append({"role": "user", "parts": [PROMPTS["title_description"]]})
-
         response = self.gemini.get_answer(
-            messages=messages,
+            messages=self.get_title_description_messages(),
             stream=False,
             model=model,
             temperature=0
         )
 
-        self.last_usages = response["usages"]
+        return self.parse_title_description(response)
 
-        try:
-            desc = extract_dict(response["answer"])
-            Desc(**desc)
-        except Exception as e:
-            raise BadOutputFormatError("Bad LLM output format") from e
+    async def generate_title_description_async(
+            self,
+            model: str = "gemini-1.5-flash-002",
+        ) -> Tuple[str, str]:
+        """
+        Asynchronous counterpart of `generate_title_description`.
 
-        return desc["title"], desc["description"]
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for generation (default is "gemini-1.5-flash-002").
 
-    def generate_icon(
+        Returns
+        -------
+        tuple of str
+            The generated title and description.
+        """
+
+        response = await self.gemini.get_answer_async(
+            messages=self.get_title_description_messages(),
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        return self.parse_title_description(response)
+
+    def get_icon_messages(
             self,
-            description: str,
-            model: str = "gemini-1.5-flash-002",
-        ) -> bytes:
+            description: str
+        ) -> list[dict]:
         """
-        Generates an icon for the chatbot based on its description.
+        Builds the messages asking for an icon matching the chatbot description.
 
         Parameters
         ----------
         description : str
             The chatbot's description.
-        model : str, optional
-            The model to use for icon generation (default is "gemini-1.5-flash-002").
 
         Returns
         -------
-        bytes
-            The generated icon in binary format.
+        list of dict
+            The messages to send to the model.
         """
 
         prompt = PROMPTS["icon"].format(
@@ -195,12 +519,25 @@ class ChatBotService:
             chatbot_description=description
         )
 
-        response = self.gemini.get_answer(
-            messages=[{"role": "user", "parts": [prompt]}],
-            stream=False,
-            model=model,
-            temperature=0
-        )
+        return [{"role": "user", "parts": [prompt]}]
+
+    def parse_icon(
+            self,
+            response: dict
+        ) -> bytes:
+        """
+        Renders the icon chosen by the model.
+
+        Parameters
+        ----------
+        response : dict
+            The model response, containing the answer and usage information.
+
+        Returns
+        -------
+        bytes
+            The generated icon in binary format.
+        """
 
         self.last_usages = response["usages"]
 
@@ -218,34 +555,99 @@ class ChatBotService:
 
         return icon_bytes
 
-    def get_suggested_prompts(
+    def generate_icon(
             self,
+            description: str,
             model: str = "gemini-1.5-flash-002",
-        ) -> list:
+        ) -> bytes:
         """
-        Retrieves a list of suggested prompts for the chatbot.
+        Generates an icon for the chatbot based on its description.
 
         Parameters
         ----------
+        description : str
+            The chatbot's description.
         model : str, optional
-            The model to use for generating suggested prompts.
+            The model to use for icon generation (default is "gemini-1.5-flash-002").
 
         Returns
         -------
-        list
-            A list of suggested prompts.
+        bytes
+            The generated icon in binary format.
         """
 
-        messages = self.get_documents_contents()
-        messages.append({"role": "user", "parts": [PROMPTS["suggested_prompts"]]})
-
         response = self.gemini.get_answer(
-            messages=messages,
+            messages=self.get_icon_messages(description),
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        return self.parse_icon(response)
+
+    async def generate_icon_async(
+            self,
+            description: str,
+            model: str = "gemini-1.5-flash-002",
+        ) -> bytes:
+        """
+        Asynchronous counterpart of `generate_icon`.
+
+        Parameters
+        ----------
+        description : str
+            The chatbot's description.
+        model : str, optional
+            The model to use for icon generation (default is "gemini-1.5-flash-002").
+
+        Returns
+        -------
+        bytes
+            The generated icon in binary format.
+        """
+
+        response = await self.gemini.get_answer_async(
+            messages=self.get_icon_messages(description),
             stream=False,
             model=model,
             temperature=0
         )
 
+        return self.parse_icon(response)
+
+    def get_suggested_prompts_messages(self) -> list[dict]:
+        """
+        Builds the messages asking for suggested prompts.
+
+        Returns
+        -------
+        list of dict
+            The messages to send to the model.
+        """
+
+        messages = self.get_documents_contents()
+        messages.append({"role": "user", "parts": [PROMPTS["suggested_prompts"]]})
+
+        return messages
+
+    def parse_suggested_prompts(
+            self,
+            response: dict
+        ) -> list:
+        """
+        Parses the suggested prompts generated by the model.
+
+        Parameters
+        ----------
+        response : dict
+            The model response, containing the answer and usage information.
+
+        Returns
+        -------
+        list
+            A list of suggested prompts.
+        """
+
         self.last_usages = response["usages"]
 
         try:
@@ -256,28 +658,84 @@ class ChatBotService:
 
         return suggested_prompts
 
-    def ask(
+    def get_suggested_prompts(
             self,
-            message: str,
             model: str = "gemini-1.5-flash-002",
-            document_ids: list | None = None
-        ):
+        ) -> list:
         """
-        Sends a user query to the chatbot and retrieves a response.
+        Retrieves a list of suggested prompts for the chatbot.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for generating suggested prompts.
+
+        Returns
+        -------
+        list
+            A list of suggested prompts.
+        """
+
+        response = self.gemini.get_answer(
+            messages=self.get_suggested_prompts_messages(),
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        return self.parse_suggested_prompts(response)
+
+    async def get_suggested_prompts_async(
+            self,
+            model: str = "gemini-1.5-flash-002",
+        ) -> list:
+        """
+        Asynchronous counterpart of `get_suggested_prompts`.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for generating suggested prompts.
+
+        Returns
+        -------
+        list
+            A list of suggested prompts.
+        """
+
+        response = await self.gemini.get_answer_async(
+            messages=self.get_suggested_prompts_messages(),
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        return self.parse_suggested_prompts(response)
+
+    def get_ask_messages(
+            self,
+            message: str,
+            document_ids: list | None = None,
+            include_documents: bool = True
+        ) -> list[dict]:
+        """
+        Appends the user query to the conversation and builds the messages to send to
+        the model.
 
         Parameters
         ----------
         message : str
             The user's query.
-        model : str, optional
-            The model to use for the query (default is "gemini-1.5-flash-002").
         document_ids : list or None, optional
             A list of document IDs to include in the context (default is None).
+        include_documents : bool, optional
+            Whether to include the documents, which can be left out when they are read
+            from a context cache (default is True).
 
         Returns
         -------
-        Generator
-            A generator yielding parts of the response.
+        list of dict
+            The messages to send to the model.
         """
 
         self.messages.append(
@@ -287,13 +745,37 @@ class ChatBotService:
             }
         )
 
-        messages = self.get_documents_contents(document_ids=document_ids)
-        messages.extend(
-            [{"role": m["role"], "parts": [m["content"]]} for m in self.messages]
+        return self.get_conversation_messages(
+            document_ids=document_ids,
+            include_documents=include_documents
         )
 
+    def ask(
+            self,
+            message: str,
+            model: str = "gemini-1.5-flash-002",
+            document_ids: list | None = None
+        ):
+        """
+        Sends a user query to the chatbot and retrieves a response.
+
+        Parameters
+        ----------
+        message : str
+            The user's query.
+        model : str, optional
+            The model to use for the query (default is "gemini-1.5-flash-002").
+        document_ids : list or None, optional
+            A list of document IDs to include in the context (default is None).
+
+        Returns
+        -------
+        Generator
+            A generator yielding parts of the response.
+        """
+
         response = self.gemini.get_answer(
-            messages=messages,
+            messages=self.get_ask_messages(message, document_ids=document_ids),
             stream=True,
             model=model,
             context=PROMPTS["context_ask"]
@@ -301,40 +783,95 @@ class ChatBotService:
 
         return self.return_streamed_response(response)
 
-    def get_last_message_sources(
+    async def ask_async(
             self,
+            message: str,
             model: str = "gemini-1.5-flash-002",
             document_ids: list | None = None
-        ) -> list[dict]:
+        ) -> AsyncGenerator:
         """
-        Retrieves the sources for the last message in the conversation.
+        Asynchronous counterpart of `ask`.
 
         Parameters
         ----------
+        message : str
+            The user's query.
         model : str, optional
-            The model to use for source identification.
+            The model to use for the query (default is "gemini-1.5-flash-002").
         document_ids : list or None, optional
-            A list of document IDs to include in the context (default is None).
+            A list of document IDs to include in the context, ignored when all the
+            documents are read from the context cache (default is None).
 
         Returns
         -------
-        list of dict
-            A list of source dictionaries containing file metadata and signed URLs.
+        AsyncGenerator
+            An asynchronous generator yielding parts of the response.
         """
 
-        messages = self.get_documents_contents(document_ids=document_ids)
-        messages.extend(
-            [{"role": m["role"], "parts": [m["content"]]} for m in self.messages]
+        messages = self.get_ask_messages(
+            message,
+            document_ids=document_ids,
+            include_documents=False
         )
-        messages.append({"role": "user", "parts": [PROMPTS["source_identification"]]})
 
-        response = self.gemini.get_answer(
+        response = await self.get_answer_async(
             messages=messages,
-            stream=False,
+            stream=True,
             model=model,
-            temperature=0
+            context=PROMPTS["context_ask"],
+            document_ids=document_ids
         )
 
+        return self.return_streamed_response_async(response)
+
+    def get_sources_messages(
+            self,
+            document_ids: list | None = None,
+            include_documents: bool = True
+        ) -> list[dict]:
+        """
+        Builds the messages asking for the sources of the last message.
+
+        Parameters
+        ----------
+        document_ids : list or None, optional
+            A list of document IDs to include in the context (default is None).
+        include_documents : bool, optional
+            Whether to include the documents, which can be left out when they are read
+            from a context cache (default is True).
+
+        Returns
+        -------
+        list of dict
+            The messages to send to the model.
+        """
+
+        messages = self.get_conversation_messages(
+            document_ids=document_ids,
+            include_documents=include_documents
+        )
+        messages.append({"role": "user", "parts": [PROMPTS["source_identification"]]})
+
+        return messages
+
+    def parse_sources(
+            self,
+            response: dict
+        ) -> list[dict]:
+        """
+        Parses the sources identified by the model and attaches signed URLs to them.
+
+        Parameters
+        ----------
+        response : dict
+            The model response, containing the answer and usage information.
+
+        Returns
+        -------
+        list of dict
+            A list of source dictionaries containing file metadata and signed URLs.
+        """
+
         self.last_usages = response["usages"]
 
         try:
@@ -342,7 +879,28 @@ class ChatBotService:
         except Exception as e:
             raise BadOutputFormatError("Bad LLM output format") from e
 
-        filenames = [document["filename"] for document in self.documents]
+        return self.sign_sources(extracted_sources)
+
+    def sign_sources(
+            self,
+            extracted_sources: list[dict]
+        ) -> list[dict]:
+        """
+        Validates sources and attaches signed URLs to them.
+
+        Parameters
+        ----------
+        extracted_sources : list of dict
+            The sources, with their `citation`, `filename` and `page`.
+
+        Returns
+        -------
+        list of dict
+            The valid sources referring to the chatbot's documents, with their signed
+            URLs.
+        """
+
+        uris = {document["filename"]: document["uri"] for document in self.documents}
         sources = []
         for extracted_source in extracted_sources:
 
@@ -355,17 +913,150 @@ class ChatBotService:
                 )
                 continue
 
-            if extracted_source["filename"] not in filenames:
+            if extracted_source["filename"] not in uris:
                 continue
 
-            uri = next(
-                document["uri"]
-                for document in self.documents
-                if document["filename"] == extracted_source["filename"]
-            )
-            signed_url = self.storage_manager.generate_signed_url(uri)
-            extracted_source["url"] = f"{signed_url}#page={extracted_source['page']}"
-
             sources.append(extracted_source)
 
+        # Sources citing the same document share its signed URL
+        signed_urls = self.storage_manager.generate_signed_urls(
+            [uris[source["filename"]] for source in sources]
+        )
+
+        for source, signed_url in zip(sources, signed_urls, strict=True):
+            source["url"] = f"{signed_url}#page={source['page']}"
+
         return sources
+
+    def get_last_message_sources(
+            self,
+            model: str = "gemini-1.5-flash-002",
+            document_ids: list | None = None
+        ) -> list[dict]:
+        """
+        Retrieves the sources for the last message in the conversation.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for source identification.
+        document_ids : list or None, optional
+            A list of document IDs to include in the context (default is None).
+
+        Returns
+        -------
+        list of dict
+            A list of source dictionaries containing file metadata and signed URLs.
+        """
+
+        response = self.gemini.get_answer(
+            messages=self.get_sources_messages(document_ids=document_ids),
+            stream=False,
+            model=model,
+            temperature=0
+        )
+
+        return self.parse_sources(response)
+
+    def get_local_sources(
+            self,
+            pages: list[dict],
+            document_ids: list | None = None
+        ) -> list[dict]:
+        """
+        Retrieves the sources of the last message by matching its sentences against
+        the text of the document pages, without calling the model.
+
+        Parameters
+        ----------
+        pages : list of dict
+            The `DocumentPages` records of the chatbot's documents.
+        document_ids : list or None, optional
+            A list of document IDs to look for sources in (default is None).
+
+        Returns
+        -------
+        list of dict
+            A list of source dictionaries containing file metadata and signed URLs.
+        """
+
+        answers = [m["content"] for m in self.messages if m["role"] == "assistant"]
+        if len(answers) == 0:
+            return []
+
+        filenames = {d["id"]: d["filename"] for d in self.documents}
+
+        pages = [
+            page for page in pages
+            if page["document_id"] in filenames
+            and (document_ids is None or page["document_id"] in document_ids)
+        ]
+
+        attributor = ShingleAttributor(pages=pages)
+
+        extracted_sources = [
+            {
+                "citation": source["citation"],
+                "filename": filenames[source["document_id"]],
+                "page": source["page"]
+            }
+            for source in attributor.attribute(answers[-1])
+        ]
+
+        return self.sign_sources(extracted_sources)
+
+    async def get_last_message_sources_async(
+            self,
+            model: str = "gemini-1.5-flash-002",
+            document_ids: list | None = None,
+            mode: Literal["llm", "local", "local_with_llm_fallback"] = "llm",
+            pages: list[dict] | None = None
+        ) -> list[dict]:
+        """
+        Asynchronous counterpart of `get_last_message_sources`, which can also locate
+        the sources locally.
+
+        Parameters
+        ----------
+        model : str, optional
+            The model to use for source identification.
+        document_ids : list or None, optional
+            A list of document IDs to include in the context (default is None).
+        mode : {'llm', 'local', 'local_with_llm_fallback'}, optional
+            How the sources are located: by the model ('llm'), by matching the last
+            message against the page text ('local'), or locally and by the model if
+            no source is found ('local_with_llm_fallback'). Default is 'llm'.
+        pages : list of dict or None, optional
+            The `DocumentPages` records of the chatbot's documents, required by the
+            local modes (default is None).
+
+        Returns
+        -------
+        list of dict
+            A list of source dictionaries containing file metadata and signed URLs.
+            `last_usages` is set to None when the model was not called.
+        """
+
+        if mode in ("local", "local_with_llm_fallback"):
+
+            # URL signing may call the IAM API on Cloud Run
+            sources = await asyncio.to_thread(
+                self.get_local_sources,
+                pages=pages or [],
+                document_ids=document_ids
+            )
+
+            if len(sources) > 0 or mode == "local":
+                self.last_usages = None
+                return sources
+
+        response = await self.get_answer_async(
+            messages=self.get_sources_messages(include_documents=False),
+            stream=False,
+            model=model,
+            document_ids=document_ids,
+            temperature=0
+        )
+
+        # URL signing may call the IAM API on Cloud Run
+        return await asyncio.to_thread(self.parse_sources, response)
@@ -0,0 +1,402 @@
+import asyncio
+import hashlib
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+from weakref import WeakValueDictionary
+
+from docu_talk.agents.chatbot.generator import Gemini
+from docu_talk.database.database import AsyncDatabase, ThreadedDatabase
+
+logger = logging.getLogger(__name__)
+
+class ContextCacheBackend(Protocol):
+    """
+    The operations a context cache provider must implement.
+    """
+
+    def create(
+            self,
+            model: str,
+            contents: list[dict],
+            context: str | None,
+            ttl: timedelta
+        ) -> tuple[str | None, datetime]:
+        ...
+
+    def delete(
+            self,
+            name: str
+        ) -> None:
+        ...
+
+class VertexContextCacheBackend:
+    """
+    Context caches stored by Vertex AI, whose handles can be passed to Gemini in place
+    of the cached contents.
+    """
+
+    def __init__(self, gemini: Gemini) -> None:
+        """
+        Initializes the backend.
+
+        Parameters
+        ----------
+        gemini : Gemini
+            The Gemini instance, used to build the cached contents.
+        """
+
+        self.gemini = gemini
+
+    def create(
+            self,
+            model: str,
+            contents: list[dict],
+            context: str | None,
+            ttl: timedelta
+        ) -> tuple[str, datetime]:
+        """
+        Creates a context cache in Vertex AI.
+
+        Parameters
+        ----------
+        model : str
+            The model the cache is created for.
+        contents : list of dict
+            The messages to cache.
+        context : str or None
+            The system instruction to cache with the contents.
+        ttl : timedelta
+            The lifetime of the cache.
+
+        Returns
+        -------
+        tuple of (str, datetime)
+            The resource name of the cache and its expiration time.
+        """
+
+        from vertexai.preview import caching
+
+        cached_content = caching.CachedContent.create(
+            model_name=model,
+            system_instruction=context,
+            contents=self.gemini.get_contents(contents),
+            ttl=ttl
+        )
+
+        return cached_content.resource_name, cached_content.expire_time
+
+    def delete(
+            self,
+            name: str
+        ) -> None:
+        """
+        Deletes a context cache from Vertex AI.
+
+        Parameters
+        ----------
+        name : str
+            The resource name of the cache.
+        """
+
+        from vertexai.preview import caching
+
+        caching.CachedContent(cached_content_name=name).delete()
+
+class LocalContextCacheBackend:
+    """
+    Stand-in for the Vertex AI context caches, used to exercise the bookkeeping of the
+    cache handles without Vertex AI. No cache is created: the documents are still
+    sent with each request.
+    """
+
+    def create(
+            self,
+            model: str,
+            contents: list[dict],
+            context: str | None,
+            ttl: timedelta
+        ) -> tuple[None, datetime]:
+        """
+        Records a context cache without creating it, since only Vertex AI can resolve
+        cache names.
+
+        Parameters
+        ----------
+        model : str
+            The model the cache is created for.
+        contents : list of dict
+            The messages to cache.
+        context : str or None
+            The system instruction to cache with the contents.
+        ttl : timedelta
+            The lifetime of the cache.
+
+        Returns
+        -------
+        tuple of (None, datetime)
+            No cache name, and the expiration time of the record.
+        """
+
+        return None, datetime.now(timezone.utc) + ttl
+
+    def delete(
+            self,
+            name: str
+        ) -> None:
+        """
+        Does nothing, no cache being created.
+
+        Parameters
+        ----------
+        name : str
+            The name of the cache.
+        """
+
+class ContextCacheManager:
+    """
+    Shares one context cache of the documents of a chatbot across conversation turns
+    and users. Cache handles are stored in the `ContextCaches` table, keyed by chatbot,
+    document set, model and system instruction.
+    """
+
+    def __init__(
+            self,
+            db: AsyncDatabase | ThreadedDatabase,
+            backend: ContextCacheBackend,
+            ttl: timedelta = timedelta(hours=1),
+            refresh_margin: timedelta = timedelta(minutes=5),
+            failure_ttl: timedelta = timedelta(minutes=15)
+        ) -> None:
+        """
+        Initializes the context cache manager.
+
+        Parameters
+        ----------
+        db : AsyncDatabase or ThreadedDatabase
+            The database storing the cache handles.
+        backend : ContextCacheBackend
+            The context cache provider.
+        ttl : timedelta, optional
+            The lifetime of a cache (default is 1 hour).
+        refresh_margin : timedelta, optional
+            Caches expiring within this margin are replaced rather than reused
+            (default is 5 minutes).
+        failure_ttl : timedelta, optional
+            How long a failed cache creation is remembered before being retried, so
+            that documents too small to be cached do not slow down every request
+            (default is 15 minutes).
+        """
+
+        self.db = db
+        self.backend = backend
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.failure_ttl = failure_ttl
+
+        # A lock is dropped once no request of this instance is holding it
+        self.locks: WeakValueDictionary[tuple, asyncio.Lock] = WeakValueDictionary()
+
+    def get_key(
+            self,
+            documents: list[dict],
+            context: str | None
+        ) -> str:
+        """
+        Computes the key identifying a document set and a system instruction.
+
+        Parameters
+        ----------
+        documents : list of dict
+            The cached documents.
+        context : str or None
+            The cached system instruction.
+
+        Returns
+        -------
+        str
+            The SHA-256 digest of the document URIs and the system instruction.
+        """
+
+        uris = sorted(document["uri"] for document in documents)
+        payload = "\n".join(uris + [context or ""])
+
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get_cached_content(
+            self,
+            chatbot_id: str,
+            documents: list[dict],
+            contents: list[dict],
+            model: str,
+            context: str | None = None
+        ) -> str | None:
+        """
+        Retrieves a valid cache of a chatbot's documents, creating it if needed.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        documents : list of dict
+            The documents to cache.
+        contents : list of dict
+            The messages holding the documents.
+        model : str
+            The model the cache is used with.
+        context : str or None, optional
+            The system instruction to cache with the documents (default is None).
+
+        Returns
+        -------
+        str or None
+            The name of the cache, or None if it could not be created (e.g. when the
+            documents are below the minimum cacheable size), in which case the
+            documents should be sent with the request.
+        """
+
+        documents_key = self.get_key(documents=documents, context=context)
+        filter = {
+            "chatbot_id": chatbot_id,
+            "model": model,
+            "documents_key": documents_key
+        }
+
+        # Concurrent first requests of this instance create a single cache
+        key = (chatbot_id, model, documents_key)
+        lock = self.locks.get(key)
+        if lock is None:
+            lock = self.locks[key] = asyncio.Lock()
+
+        async with lock:
+
+            caches = await self.db.get_data(
+                table="ContextCaches",
+                filter=filter,
+                sort={"column": "expire_time", "direction": -1},
+                limit=1
+            )
+
+            now = datetime.now(timezone.utc)
+
+            if len(caches) > 0:
+                cache = caches[0]
+                # Failed creations are remembered until they expire
+                margin = timedelta()
+                if cache["name"] is not None:
+                    margin = self.refresh_margin
+                # MongoDB returns naive UTC datetimes
+                expire_time = cache["expire_time"].replace(tzinfo=timezone.utc)
+                if expire_time > now + margin:
+                    return cache["name"]
+
+            try:
+                name, expire_time = await asyncio.to_thread(
+                    self.backend.create,
+                    model=model,
+                    contents=contents,
+                    context=context,
+                    ttl=self.ttl
+                )
+            except Exception as e:
+                logger.warning(f"Failed to create a context cache: {e}")
+                name, expire_time = None, now + self.failure_ttl
+
+            # The expired caches of the chatbot are already deleted by the provider
+            await self.db.delete_data(
+                table="ContextCaches",
+                filter={"chatbot_id": chatbot_id, "expire_time": {"$lte": now}}
+            )
+
+            await self.db.insert_data(
+                table="ContextCaches",
+                data={
+                    **filter,
+                    "name": name,
+                    "expire_time": expire_time.astimezone(timezone.utc)
+                }
+            )
+
+        return name
+
+    async def invalidate(
+            self,
+            chatbot_id: str
+        ) -> None:
+        """
+        Deletes the caches of a chatbot, after its documents changed.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        """
+
+        caches = await self.db.get_data(
+            table="ContextCaches",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+        for cache in caches:
+            if cache["name"] is None:
+                continue
+            try:
+                await asyncio.to_thread(self.backend.delete, cache["name"])
+            except Exception as e:
+                # Expired caches are already deleted by the provider
+                logger.warning(f"Failed to delete context cache {cache['name']}: {e}")
+
+        await self.db.delete_data(
+            table="ContextCaches",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+def get_context_cache_manager(
+        db: AsyncDatabase | ThreadedDatabase,
+        backend: str | None = None
+    ) -> ContextCacheManager | None:
+    """
+    Instantiates the context cache manager selected by the settings.
+
+    Parameters
+    ----------
+    db : AsyncDatabase or ThreadedDatabase
+        The database storing the cache handles.
+    backend : str or None, optional
+        The context cache provider: Vertex AI ('vertex') or the in-memory stand-in
+        ('local'). Default is None, fetched from the `CONTEXT_CACHE_BACKEND`
+        environment variable; context caching is disabled if it is not set.
+
+    Returns
+    -------
+    ContextCacheManager or None
+        The context cache manager, or None if context caching is disabled.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+    """
+
+    if backend is None:
+        backend = os.getenv("CONTEXT_CACHE_BACKEND")
+
+    if backend is None:
+        return None
+    elif backend == "vertex":
+        gemini = Gemini(
+            project_id=os.getenv("GCP_PROJECT_ID"),
+            location=os.getenv("GCP_LOCATION")
+        )
+        cache_backend = VertexContextCacheBackend(gemini=gemini)
+    elif backend == "local":
+        cache_backend = LocalContextCacheBackend()
+    else:
+        raise ValueError(
+            f"Unknown context cache backend `{backend}`. Expected 'vertex' or 'local'."
+        )
+
+    ttl = timedelta(minutes=int(os.getenv("CONTEXT_CACHE_TTL_MINUTES", 60)))
+
+    return ContextCacheManager(db=db, backend=cache_backend, ttl=ttl)
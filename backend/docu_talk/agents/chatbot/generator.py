@@ -1,8 +1,15 @@
-from typing import Generator
+import asyncio
+import base64
+from typing import AsyncGenerator, AsyncIterable, Generator
+from urllib.parse import unquote, urlparse
 
 import vertexai
 from google.api_core.exceptions import ResourceExhausted
-from vertexai.generative_models import GenerativeModel, SafetySetting
+from vertexai.generative_models import (
+    GenerationResponse,
+    GenerativeModel,
+    SafetySetting,
+)
 
 from utils.decorators import retry_with_exponential_backoff
 from utils.misc import get_param_or_env
@@ -88,6 +95,16 @@ class Gemini:
                             "file_uri": part
                         }
                     }
+                elif part.startswith("file://"):
+                    # Gemini cannot read local files, which are sent inline
+                    with open(unquote(urlparse(part).path), "rb") as f:
+                        data = base64.b64encode(f.read()).decode()
+                    part = {
+                        "inline_data": {
+                            "mime_type": "application/pdf",
+                            "data": data
+                        }
+                    }
                 else:
                     part = {
                         "text": part
@@ -95,12 +112,73 @@ class Gemini:
 
                 new_parts.append(part)
 
-            message["parts"] = new_parts
-
-            contents.append(message)
+            # The messages are left untouched, to be sent again on a retry
+            contents.append({**message, "parts": new_parts})
 
         return contents
 
+    def get_client(
+            self,
+            model: str,
+            context: str | None = None,
+            cached_content: str | None = None
+        ) -> GenerativeModel:
+        """
+        Builds the Gemini model client.
+
+        Parameters
+        ----------
+        model : str
+            The model name.
+        context : str or None, optional
+            Context or system instruction for the model (default is None).
+        cached_content : str or None, optional
+            The name of a context cache holding the system instruction and the leading
+            messages (default is None).
+
+        Returns
+        -------
+        GenerativeModel
+            The initialized Gemini model client.
+        """
+
+        if cached_content is not None:
+            return GenerativeModel.from_cached_content(cached_content=cached_content)
+
+        client = GenerativeModel(
+            model_name=model,
+            system_instruction=context
+        )
+
+        return client
+
+    def get_usages(
+            self,
+            response: GenerationResponse
+        ) -> dict[str, str | int]:
+        """
+        Extracts usage information from a complete response or from the last chunk of a
+        streamed response.
+
+        Parameters
+        ----------
+        response : GenerationResponse
+            The model response.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the model version, unit and consumed quantity.
+        """
+
+        usages = {
+            "model": response._raw_response.model_version,
+            "unit": "characters",
+            "qty": response.usage_metadata.total_token_count
+        }
+
+        return usages
+
     @retry_with_exponential_backoff(errors=(ResourceExhausted,))
     def get_answer(
             self,
@@ -108,6 +186,7 @@ class Gemini:
             model: str = "gemini-1.5-pro-002",
             stream: bool = False,
             context: str | None = None,
+            cached_content: str | None = None,
             **kwargs
         ):
         """
@@ -124,6 +203,9 @@ class Gemini:
             Whether to stream the response (default is False).
         context : str or None, optional
             Context or system instruction for the model (default is None).
+        cached_content : str or None, optional
+            The name of a context cache to use in place of the context and of the
+            cached messages (default is None).
 
         Returns
         -------
@@ -131,9 +213,10 @@ class Gemini:
             A streamed response or a complete response depending on the mode.
         """
 
-        client = GenerativeModel(
-            model_name=model,
-            system_instruction=context
+        client = self.get_client(
+            model=model,
+            context=context,
+            cached_content=cached_content
         )
 
         contents = self.get_contents(messages)
@@ -156,6 +239,71 @@ class Gemini:
 
         return response
 
+    @retry_with_exponential_backoff(errors=(ResourceExhausted,))
+    async def get_answer_async(
+            self,
+            messages: list,
+            model: str = "gemini-1.5-pro-002",
+            stream: bool = False,
+            context: str | None = None,
+            cached_content: str | None = None,
+            **kwargs
+        ):
+        """
+        Asynchronous counterpart of `get_answer`, relying on the native async calls of
+        the Vertex AI SDK.
+
+        Parameters
+        ----------
+        messages : list
+            A list of messages to send to the model.
+        model : str, optional
+            The model name (default is "gemini-1.5-pro-002").
+        stream : bool, optional
+            Whether to stream the response (default is False).
+        context : str or None, optional
+            Context or system instruction for the model (default is None).
+        cached_content : str or None, optional
+            The name of a context cache to use in place of the context and of the
+            cached messages (default is None).
+
+        Returns
+        -------
+        AsyncGenerator or dict
+            A streamed response or a complete response depending on the mode.
+        """
+
+        client = self.get_client(
+            model=model,
+            context=context,
+            cached_content=cached_content
+        )
+
+        # Local files are read and encoded off the event loop
+        contents = await asyncio.to_thread(self.get_contents, messages)
+
+        if stream is True:
+
+            # The stream is opened here so that quota errors are retried
+            completion = await client.generate_content_async(
+                contents=contents,
+                generation_config=kwargs,
+                stream=True,
+                safety_settings=self.safety_settings
+            )
+
+            response = self.get_streamed_response_async(completion)
+
+        else:
+
+            response = await self.get_unstreamed_response_async(
+                client=client,
+                contents=contents,
+                **kwargs
+            )
+
+        return response
+
     def get_streamed_response(
             self,
             client: GenerativeModel,
@@ -191,13 +339,31 @@ class Gemini:
             part = chunk.candidates[0].content.parts[0].text
             yield part
 
-        usages = {
-            "model": chunk._raw_response.model_version,
-            "unit": "characters",
-            "qty": chunk.usage_metadata.total_token_count
-        }
+        yield self.get_usages(chunk)
+
+    async def get_streamed_response_async(
+            self,
+            completion: AsyncIterable[GenerationResponse]
+        ) -> AsyncGenerator:
+        """
+        Iterates over an asynchronous streamed response from the Gemini model.
+
+        Parameters
+        ----------
+        completion : AsyncIterable of GenerationResponse
+            The opened asynchronous stream.
+
+        Yields
+        ------
+        str or dict
+            Streamed content parts and usage information.
+        """
+
+        async for chunk in completion:
+            part = chunk.candidates[0].content.parts[0].text
+            yield part
 
-        yield usages
+        yield self.get_usages(chunk)
 
     def get_unstreamed_response(
             self,
@@ -232,11 +398,46 @@ class Gemini:
 
         response = {
             "answer": completion.text,
-            "usages": {
-                "model": completion._raw_response.model_version,
-                "unit": "characters",
-                "qty": completion.to_dict()["usage_metadata"]["total_token_count"]
-            }
+            "usages": self.get_usages(completion)
+        }
+
+        return response
+
+    async def get_unstreamed_response_async(
+            self,
+            client: GenerativeModel,
+            contents: list,
+            **kwargs
+        ) -> dict[str, str | dict[str, str | int]]:
+        """
+        Retrieves a complete, unstreamed response from the Gemini model without blocking
+        the event loop.
+
+        Parameters
+        ----------
+        client : GenerativeModel
+            The initialized Gemini model client.
+        contents : list
+            The structured content to send to the model.
+        kwargs : dict
+            Additional configuration options for the generation.
+
+        Returns
+        -------
+        dict
+            A dictionary containing the answer and usage information.
+        """
+
+        completion = await client.generate_content_async(
+            contents=contents,
+            generation_config=kwargs,
+            stream=False,
+            safety_settings=self.safety_settings
+        )
+
+        response = {
+            "answer": completion.text,
+            "usages": self.get_usages(completion)
         }
 
         return response
@@ -0,0 +1,130 @@
+from dataclasses import dataclass
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens of a text, at about four characters per token.
+
+    Parameters
+    ----------
+    text : str
+        The text to estimate.
+
+    Returns
+    -------
+    int
+        The estimated number of tokens.
+    """
+
+    return len(text) // 4 + 1
+
+@dataclass
+class HistoryPolicy:
+    """
+    Bounds the conversation history sent with each request: the last turns are kept
+    verbatim within a token budget, and older turns are folded into a running
+    summary.
+
+    Attributes
+    ----------
+    recent_turns : int
+        The maximum number of turns (a user message and its answer) kept verbatim.
+    token_budget : int
+        The maximum number of tokens of the summary and the verbatim messages. The
+        last turn is always kept, whatever its size.
+    max_loaded_messages : int
+        The maximum number of messages loaded from the database.
+    summary_interval : int
+        The number of turns falling out of the verbatim window before they are folded
+        into the summary, so that the model summarizes once every few turns. Until
+        then, they are still sent verbatim, as long as they fit in the token budget.
+    """
+
+    recent_turns: int = 4
+    token_budget: int = 8000
+    max_loaded_messages: int = 40
+    summary_interval: int = 2
+
+    def split(
+            self,
+            messages: list[dict],
+            summary: str | None = None
+        ) -> tuple[list[dict], list[dict]]:
+        """
+        Splits the conversation history into the messages to fold into the summary
+        and the messages to keep verbatim.
+
+        Parameters
+        ----------
+        messages : list of dict
+            The messages not yet folded into the summary, in chronological order.
+        summary : str or None, optional
+            The summary of the earlier messages (default is None).
+
+        Returns
+        -------
+        tuple of (list of dict, list of dict)
+            The older messages to fold and the recent messages to keep.
+        """
+
+        budget = self.token_budget
+        if summary is not None:
+            budget -= estimate_tokens(summary)
+
+        nb_recent = 0
+        for message in reversed(messages):
+
+            if nb_recent >= 2 * self.recent_turns:
+                break
+
+            tokens = estimate_tokens(message["content"])
+            if nb_recent >= 2 and tokens > budget:
+                break
+
+            budget -= tokens
+            nb_recent += 1
+
+        index = len(messages) - nb_recent
+
+        return messages[:index], messages[index:]
+
+    def is_summary_due(
+            self,
+            older_messages: list[dict],
+            recent_messages: list[dict],
+            summary: str | None = None
+        ) -> bool:
+        """
+        Checks whether the messages falling out of the verbatim window are folded
+        into the summary, rather than sent verbatim with the recent messages.
+
+        Parameters
+        ----------
+        older_messages : list of dict
+            The older messages returned by `split`.
+        recent_messages : list of dict
+            The recent messages returned by `split`.
+        summary : str or None, optional
+            The summary of the earlier messages (default is None).
+
+        Returns
+        -------
+        bool
+            Whether at least `summary_interval` turns fell out of the window, or the
+            older messages do not fit in the token budget with the recent ones.
+        """
+
+        if len(older_messages) == 0:
+            return False
+
+        if len(older_messages) >= 2 * self.summary_interval:
+            return True
+
+        tokens = sum(
+            estimate_tokens(message["content"])
+            for message in older_messages + recent_messages
+        )
+        if summary is not None:
+            tokens += estimate_tokens(summary)
+
+        return tokens > self.token_budget
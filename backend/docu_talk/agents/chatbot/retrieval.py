@@ -0,0 +1,203 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"\w\w+", flags=re.UNICODE)
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits a text into lowercase word tokens of at least two characters.
+
+    Parameters
+    ----------
+    text : str
+        The text to tokenize.
+
+    Returns
+    -------
+    list of str
+        The tokens, in order of appearance.
+    """
+
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BM25Index:
+    """
+    An in-memory BM25 inverted index over the pages of a chatbot's documents, updated
+    incrementally as documents are added or removed.
+    """
+
+    def __init__(
+            self,
+            k1: float = 1.5,
+            b: float = 0.75
+        ) -> None:
+        """
+        Initializes an empty index.
+
+        Parameters
+        ----------
+        k1 : float, optional
+            The term frequency saturation parameter (default is 1.5).
+        b : float, optional
+            The page length normalization parameter (default is 0.75).
+        """
+
+        self.k1 = k1
+        self.b = b
+
+        # Postings map each term to the frequency of the term in each page, pages
+        # being identified by (document_id, page)
+        self.postings: dict[str, dict[tuple[str, int], int]] = defaultdict(dict)
+        self.page_lengths: dict[tuple[str, int], int] = {}
+        self.document_pages: dict[str, list[tuple[str, int]]] = defaultdict(list)
+        self.document_terms: dict[str, set[str]] = defaultdict(set)
+        self.total_length = 0
+
+    def add_document(
+            self,
+            document_id: str,
+            pages: list[dict]
+        ) -> None:
+        """
+        Indexes the pages of a document.
+
+        Parameters
+        ----------
+        document_id : str
+            The document's unique identifier.
+        pages : list of dict
+            The pages of the document, with their `page` number and `text`.
+        """
+
+        self.remove_document(document_id)
+
+        for page in pages:
+
+            key = (document_id, page["page"])
+            tokens = tokenize(page["text"])
+
+            for term, frequency in Counter(tokens).items():
+                self.postings[term][key] = frequency
+                self.document_terms[document_id].add(term)
+
+            self.page_lengths[key] = len(tokens)
+            self.document_pages[document_id].append(key)
+            self.total_length += len(tokens)
+
+    def remove_document(
+            self,
+            document_id: str
+        ) -> None:
+        """
+        Removes the pages of a document from the index.
+
+        Parameters
+        ----------
+        document_id : str
+            The document's unique identifier.
+        """
+
+        keys = self.document_pages.pop(document_id, [])
+        terms = self.document_terms.pop(document_id, set())
+
+        for term in terms:
+
+            postings = self.postings[term]
+            for key in keys:
+                postings.pop(key, None)
+
+            if len(postings) == 0:
+                del self.postings[term]
+
+        for key in keys:
+            self.total_length -= self.page_lengths.pop(key)
+
+    @property
+    def document_ids(self) -> set[str]:
+        """
+        The identifiers of the indexed documents.
+        """
+
+        return set(self.document_pages)
+
+    def search(
+            self,
+            query: str,
+            top_k: int = 10
+        ) -> list[tuple[str, int, float]]:
+        """
+        Retrieves the pages most relevant to a query.
+
+        Parameters
+        ----------
+        query : str
+            The query.
+        top_k : int, optional
+            The maximum number of pages to retrieve (default is 10).
+
+        Returns
+        -------
+        list of tuple of (str, int, float)
+            The document identifier, page number and BM25 score of the retrieved
+            pages, by decreasing score. Pages sharing no term with the query are left
+            out.
+        """
+
+        nb_pages = len(self.page_lengths)
+        if nb_pages == 0:
+            return []
+
+        average_length = self.total_length / nb_pages
+
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+
+            nb_matches = len(postings)
+            idf = math.log(1 + (nb_pages - nb_matches + 0.5) / (nb_matches + 0.5))
+
+            for key, frequency in postings.items():
+                length = self.page_lengths[key] / average_length
+                saturation = frequency + self.k1 * (1 - self.b + self.b * length)
+                scores[key] += idf * frequency * (self.k1 + 1) / saturation
+
+        ranking = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+        return [(key[0], key[1], score) for key, score in ranking[:top_k]]
+
+    def select_documents(
+            self,
+            query: str,
+            top_k: int = 5
+        ) -> list[str]:
+        """
+        Retrieves the documents most relevant to a query, each document being scored
+        by its best page.
+
+        Parameters
+        ----------
+        query : str
+            The query.
+        top_k : int, optional
+            The maximum number of documents to retrieve (default is 5).
+
+        Returns
+        -------
+        list of str
+            The identifiers of the retrieved documents, by decreasing relevance.
+        """
+
+        document_ids = []
+        for document_id, _, _ in self.search(query, top_k=len(self.page_lengths)):
+
+            if document_id not in document_ids:
+                document_ids.append(document_id)
+
+            if len(document_ids) == top_k:
+                break
+
+        return document_ids
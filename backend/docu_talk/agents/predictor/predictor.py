@@ -1,14 +1,17 @@
+import asyncio
 import os
 import sys
+from dataclasses import dataclass, field
+from datetime import timezone
 from typing import Any, Literal
 
 import joblib
-import pandas as pd
+import numpy as np
 from dotenv import load_dotenv
 from sklearn.ensemble import RandomForestRegressor
 
 sys.path.append(os.path.dirname((os.path.dirname(os.path.dirname(os.path.dirname(__file__))))))
-from docu_talk.database.database import Database
+from docu_talk.database.database import AsyncDatabase, ThreadedDatabase, get_database
 
 load_dotenv()
 
@@ -18,10 +21,95 @@ metrics = [
     "ask_chatbot_token_count"
 ]
 
-models = {}
+features = ["nb_documents", "total_pages", "model", "timestamp"]
+
+@dataclass
+class FeatureSchema:
+    """
+    The encoding of the features a model is trained on, saved with the model.
+
+    Attributes
+    ----------
+    features : list of str
+        The features, in the order of the model's columns.
+    model_codes : dict
+        The code of each generation model name.
+    unknown_model_code : int
+        The code of the generation models unseen in training.
+    """
+
+    features: list[str] = field(default_factory=lambda: list(features))
+    model_codes: dict[str, int] = field(default_factory=dict)
+    unknown_model_code: int = -1
+
+    def encode(
+            self,
+            data: dict
+        ) -> list[float]:
+        """
+        Encodes a record into a row of features.
+
+        Parameters
+        ----------
+        data : dict
+            The record, with a value for each feature.
+
+        Returns
+        -------
+        list of float
+            The features of the record, in column order.
+        """
+
+        row = []
+        for feature in self.features:
+
+            value = data[feature]
+
+            if feature == "model":
+                value = self.model_codes.get(value, self.unknown_model_code)
+            elif feature == "timestamp":
+                # Naive timestamps are read as UTC, as pandas did in training
+                if value.tzinfo is None:
+                    value = value.replace(tzinfo=timezone.utc)
+                value = value.timestamp()
+
+            row.append(value)
+
+        return row
+
+def load_model(path: str) -> tuple[RandomForestRegressor, FeatureSchema]:
+    """
+    Loads a model and its feature schema.
+
+    Parameters
+    ----------
+    path : str
+        The path of the model pickle.
+
+    Returns
+    -------
+    tuple of (RandomForestRegressor, FeatureSchema)
+        The model and its feature schema.
+    """
+
+    payload = joblib.load(path)
+
+    if isinstance(payload, dict):
+        return payload["model"], FeatureSchema(**payload["schema"])
+
+    # Legacy pickles hold the model alone, trained on a pandas DataFrame. Their
+    # model codes were lost, and every model was encoded as 0 at prediction.
+    schema = FeatureSchema(
+        features=list(getattr(payload, "feature_names_in_", features)),
+        unknown_model_code=0
+    )
+
+    return payload, schema
+
+models, schemas = {}, {}
 for metric in metrics:
     path = os.path.join(os.path.dirname(__file__), "models", f"{metric}.pickle")
-    models[metric] = joblib.load(path)
+    models[metric], schemas[metric] = load_model(path)
 
 class Predictor:
     """
@@ -36,18 +124,32 @@ class Predictor:
     }
 
     models: dict[str, RandomForestRegressor] = models
+    schemas: dict[str, FeatureSchema] = schemas
 
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            db: AsyncDatabase | ThreadedDatabase | None = None
+        ) -> None:
         """
         Initializes the Predictor with database and preloaded models.
+
+        Parameters
+        ----------
+        db : AsyncDatabase or ThreadedDatabase or None, optional
+            The database to log metrics into (default is None, a new connection using
+            the backend selected by the `MONGO_DB_BACKEND` environment variable).
         """
 
-        self.db = Database(
-            uri=os.getenv("MONGO_DB_URI"),
-            database_name=os.getenv("MONGO_DB_NAME")
-        )
+        if db is None:
+            db = get_database(
+                uri=os.getenv("MONGO_DB_URI"),
+                database_name=os.getenv("MONGO_DB_NAME"),
+                backend=os.getenv("MONGO_DB_BACKEND")
+            )
 
-    def log_metric(
+        self.db = db
+
+    async def log_metric(
             self,
             metric: Literal[
                 "create_chatbot_duration",
@@ -83,12 +185,12 @@ class Predictor:
 
         data.update(features)
 
-        self.db.insert_data(
+        await self.db.insert_data(
             table=self.metric_tables[metric],
             data=data
         )
 
-    def log_create_chatbot_metric(
+    async def log_create_chatbot_metric(
             self,
             duration: float,
             nb_documents: int,
@@ -113,7 +215,7 @@ class Predictor:
             The unique identifier of the chatbot.
         """
 
-        self.log_metric(
+        await self.log_metric(
             metric="create_chatbot_duration",
             value=duration,
             features={
@@ -124,7 +226,7 @@ class Predictor:
             metadata={"chatbot_id": chatbot_id}
         )
 
-    def log_ask_chatbot_metrics(
+    async def log_ask_chatbot_metrics(
             self,
             duration: float,
             token_count: int,
@@ -152,7 +254,7 @@ class Predictor:
             The unique identifier of the chatbot.
         """
 
-        self.log_metric(
+        await self.log_metric(
             metric="ask_chatbot_duration",
             value=duration,
             features={
@@ -163,7 +265,7 @@ class Predictor:
             metadata={"chatbot_id": chatbot_id}
         )
 
-        self.log_metric(
+        await self.log_metric(
             metric="ask_chatbot_token_count",
             value=token_count,
             features={
@@ -174,36 +276,7 @@ class Predictor:
             metadata={"chatbot_id": chatbot_id}
         )
 
-    def preprocess(
-            self,
-            data: list
-        ) -> pd.DataFrame:
-        """
-        Preprocesses data for model training or prediction.
-
-        Parameters
-        ----------
-        data : list
-            A list of data records to preprocess.
-
-        Returns
-        -------
-        pd.DataFrame
-            A preprocessed pandas DataFrame.
-        """
-
-        df = pd.DataFrame(data)
-
-        for col in ["metadata", "value", "_id", "id"]:
-            if col in df.columns:
-                df = df.drop(columns=[col])
-
-        df["model"] = df["model"].astype("category").cat.codes
-        df["timestamp"] = pd.to_datetime(df["timestamp"]).astype(int) / 10**9
-
-        return df
-
-    def train(
+    async def train(
             self,
             metric: Literal[
                 "create_chatbot_duration",
@@ -212,7 +285,8 @@ class Predictor:
             ]
         ) -> None:
         """
-        Trains a machine learning model for the specified metric.
+        Trains a machine learning model for the specified metric, and saves it with
+        its feature schema.
 
         Parameters
         ----------
@@ -220,9 +294,14 @@ class Predictor:
             The metric to train a model.
         """
 
-        data = self.db.get_data(table=self.metric_tables[metric])
+        data = await self.db.get_data(table=self.metric_tables[metric])
 
-        x = self.preprocess(data)
+        model_names = sorted({d["model"] for d in data})
+        schema = FeatureSchema(
+            model_codes={name: code for code, name in enumerate(model_names)}
+        )
+
+        x = np.array([schema.encode(d) for d in data], dtype=np.float32)
         y = [d["value"] for d in data]
 
         model = RandomForestRegressor(n_estimators=100, random_state=42)
@@ -234,7 +313,45 @@ class Predictor:
             f"{metric}.pickle"
         )
 
-        joblib.dump(model, model_path)
+        joblib.dump({"model": model, "schema": schema.__dict__}, model_path)
+
+        self.models[metric], self.schemas[metric] = model, schema
+
+    def evaluate(
+            self,
+            metric: Literal[
+                "create_chatbot_duration",
+                "ask_chatbot_duration",
+                "ask_chatbot_token_count"
+            ],
+            x: np.ndarray
+        ) -> np.ndarray:
+        """
+        Evaluates the model of a metric on a feature matrix.
+
+        Parameters
+        ----------
+        metric : Literal
+            The metric to predict.
+        x : np.ndarray
+            The float32 feature matrix, one row per prediction.
+
+        Returns
+        -------
+        np.ndarray
+            The predicted values.
+        """
+
+        model = self.models[metric]
+
+        # Averages the trees directly: `RandomForestRegressor.predict` validates its
+        # input and dispatches the trees through joblib on every call, which costs
+        # far more than evaluating the trees on a few rows
+        predictions = np.zeros(len(x))
+        for estimator in model.estimators_:
+            predictions += estimator.tree_.predict(x)[:, 0]
+
+        return predictions / len(model.estimators_)
 
     def predict(
             self,
@@ -244,7 +361,7 @@ class Predictor:
                 "ask_chatbot_token_count"
             ],
             data: dict
-        ) -> int | float:
+        ) -> float:
         """
         Predicts a value for the specified metric using the trained model.
 
@@ -258,22 +375,56 @@ class Predictor:
 
         Returns
         -------
-        int or float
+        float
             The predicted value.
         """
 
-        model = self.models[metric]
+        prediction = self.predict_many(metric=metric, rows=[data])[0]
+
+        return prediction
+
+    def predict_many(
+            self,
+            metric: Literal[
+                "create_chatbot_duration",
+                "ask_chatbot_duration",
+                "ask_chatbot_token_count"
+            ],
+            rows: list[dict]
+        ) -> list[float]:
+        """
+        Predicts values for the specified metric on several inputs at once, the model
+        being evaluated on the whole feature matrix.
 
-        x = self.preprocess([data])
+        Parameters
+        ----------
+        metric : Literal
+            The metric to predict ('create_chatbot_duration', 'ask_chatbot_duration',
+            'ask_chatbot_token_count').
+        rows : list of dict
+            The input data of each prediction.
+
+        Returns
+        -------
+        list of float
+            The predicted values, in input order.
+        """
 
-        predictions = model.predict(X=x)
+        if len(rows) == 0:
+            return []
 
-        prediction = predictions[0]
+        schema = self.schemas[metric]
+        x = np.array([schema.encode(row) for row in rows], dtype=np.float32)
 
-        return prediction
+        predictions = self.evaluate(metric=metric, x=x).tolist()
+
+        return predictions
 
 if __name__ == "__main__":
 
-    predictor = Predictor()
-    for metric in metrics:
-        predictor.train(metric=metric)
+    async def main() -> None:
+        predictor = Predictor()
+        for metric in metrics:
+            await predictor.train(metric=metric)
+
+    asyncio.run(main())
@@ -0,0 +1,11 @@
+from .base import BaseStorageManager
+from .factory import get_storage_manager
+from .gcs import GoogleCloudStorageManager
+from .local import LocalStorageManager
+
+__all__ = [
+    "BaseStorageManager",
+    "GoogleCloudStorageManager",
+    "LocalStorageManager",
+    "get_storage_manager"
+]
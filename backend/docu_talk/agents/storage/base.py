@@ -0,0 +1,297 @@
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import BinaryIO, Tuple
+
+from docu_talk.exceptions import BatchUploadError
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class BaseStorageManager(ABC):
+    """
+    The operations a storage backend provides, and the batch and caching logic shared
+    by the backends. Backends implement the primitives `save_from_filename`, `open`,
+    `sign_url`, `delete` and `delete_directory`.
+    """
+
+    def __init__(
+            self,
+            signed_url_margin: timedelta = timedelta(minutes=5)
+        ) -> None:
+        """
+        Initializes the storage manager.
+
+        Parameters
+        ----------
+        signed_url_margin : timedelta, optional
+            Signed URLs are reused until this margin before they expire (default is
+            5 minutes).
+        """
+
+        self.signed_url_margin = signed_url_margin
+        self.signed_urls = TTLCache(maxsize=4096)
+
+    @abstractmethod
+    def save_from_filename(
+            self,
+            filename: str,
+            path: str
+        ) -> Tuple[str, str]:
+        """
+        Streams a local file to the storage and returns its URIs.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the local file.
+        path : str
+            The destination path in the storage.
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the URI and the public path of the file.
+        """
+
+    @abstractmethod
+    def open(
+            self,
+            uri: str
+        ) -> BinaryIO:
+        """
+        Opens a file for streaming reads, so that it is never held in memory as a
+        whole.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the file.
+
+        Returns
+        -------
+        BinaryIO
+            The file opened in binary read mode, to be closed by the caller.
+        """
+
+    @abstractmethod
+    def sign_url(
+            self,
+            uri: str,
+            expiration: timedelta,
+            method: str
+        ) -> str:
+        """
+        Signs a URL granting temporary access to a file.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the file.
+        expiration : timedelta
+            The validity period of the signed URL.
+        method : str
+            The HTTP method allowed by the signed URL.
+
+        Returns
+        -------
+        str
+            The signed URL.
+        """
+
+    @abstractmethod
+    def delete(
+            self,
+            uri: str
+        ) -> None:
+        """
+        Deletes a file, a file already deleted being ignored.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the file.
+        """
+
+    @abstractmethod
+    def delete_directory(
+            self,
+            directory_path: str
+        ) -> dict[str, Exception]:
+        """
+        Deletes all files within a directory.
+
+        Parameters
+        ----------
+        directory_path : str
+            The directory path in the storage.
+
+        Returns
+        -------
+        dict
+            The error raised for each file that could not be deleted, by file name.
+        """
+
+    def save_many_from_filenames(
+            self,
+            files: list[Tuple[str, str]],
+            max_workers: int = 8
+        ) -> list[Tuple[str, str]]:
+        """
+        Streams several local files to the storage concurrently, all or none of them
+        being saved.
+
+        Parameters
+        ----------
+        files : list of tuple of (str, str)
+            The path of each local file and its destination path in the storage.
+        max_workers : int, optional
+            The maximum number of concurrent uploads (default is 8).
+
+        Returns
+        -------
+        list of tuple of str
+            The URI and the public path of each file, in input order.
+
+        Raises
+        ------
+        BatchUploadError
+            If any upload failed, after deleting the files uploaded by the batch. Its
+            `failures` map the index of each failed file to its error.
+        """
+
+        if len(files) == 0:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+            futures = [
+                executor.submit(self.save_from_filename, filename=filename, path=path)
+                for filename, path in files
+            ]
+
+        results, failures = [], {}
+        for index, future in enumerate(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures[index] = e
+
+        if len(failures) > 0:
+
+            for uri, _ in results:
+                try:
+                    self.delete(uri)
+                except Exception as e:
+                    logger.warning(f"Failed to roll back the upload of {uri}: {e}")
+
+            raise BatchUploadError(
+                failures=failures,
+                message=f"Failed to upload {len(failures)} of {len(files)} files"
+            )
+
+        return results
+
+    def generate_signed_url(
+            self,
+            uri: str,
+            expiration_minutes: int = 15,
+            method: str = "GET"
+        ) -> str:
+        """
+        Generates a signed URL for a file, reusing the URL signed previously for the
+        file with the same validity period until the margin before it expires.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the file.
+        expiration_minutes : int, optional
+            The validity period of a newly signed URL in minutes (default is 15). A
+            reused URL is valid for at least the margin.
+        method : str, optional
+            The HTTP method allowed by the signed URL (default is 'GET').
+
+        Returns
+        -------
+        str
+            The signed URL for accessing the file.
+        """
+
+        # A URL requested for longer is never served from a shorter one
+        key = (uri, method, expiration_minutes)
+
+        signed_url = self.signed_urls.get(key)
+        if signed_url is not None:
+            return signed_url
+
+        validity = timedelta(minutes=expiration_minutes)
+        signed_url = self.sign_url(uri, expiration=validity, method=method)
+
+        ttl = (validity - self.signed_url_margin).total_seconds()
+        if ttl > 0:
+            self.signed_urls.set(key, signed_url, ttl=ttl)
+
+        return signed_url
+
+    def generate_signed_urls(
+            self,
+            uris: list[str],
+            expiration_minutes: int = 15,
+            method: str = "GET",
+            max_workers: int = 8
+        ) -> list[str]:
+        """
+        Generates signed URLs for several files, each distinct file being signed once,
+        concurrently.
+
+        Parameters
+        ----------
+        uris : list of str
+            The URIs of the files.
+        expiration_minutes : int, optional
+            The validity period of a newly signed URL in minutes (default is 15).
+        method : str, optional
+            The HTTP method allowed by the signed URLs (default is 'GET').
+        max_workers : int, optional
+            The maximum number of concurrent signatures (default is 8).
+
+        Returns
+        -------
+        list of str
+            The signed URL of each file, in input order.
+        """
+
+        distinct_uris = list(dict.fromkeys(uris))
+        if len(distinct_uris) == 0:
+            return []
+
+        max_workers = min(max_workers, len(distinct_uris))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            signed_urls = executor.map(
+                lambda uri: self.generate_signed_url(
+                    uri,
+                    expiration_minutes=expiration_minutes,
+                    method=method
+                ),
+                distinct_uris
+            )
+            signed_urls = dict(zip(distinct_uris, signed_urls, strict=True))
+
+        return [signed_urls[uri] for uri in uris]
+
+    def invalidate_signed_urls(
+            self,
+            uri: str
+        ) -> None:
+        """
+        Forgets the signed URLs of a deleted file.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the file.
+        """
+
+        self.signed_urls.invalidate_where(lambda key: key[0] == uri)
@@ -0,0 +1,52 @@
+import os
+import secrets
+
+from docu_talk.agents.storage.base import BaseStorageManager
+from docu_talk.agents.storage.gcs import GoogleCloudStorageManager
+from docu_talk.agents.storage.local import LocalStorageManager
+
+
+def get_storage_manager(backend: str | None = None) -> BaseStorageManager:
+    """
+    Instantiates the storage manager selected by the settings.
+
+    Parameters
+    ----------
+    backend : str or None, optional
+        The storage backend: Google Cloud Storage ('gcs') or a local directory
+        ('local'). Default is None, fetched from the `STORAGE_BACKEND` environment
+        variable, Google Cloud Storage being used if it is not set.
+
+    Returns
+    -------
+    BaseStorageManager
+        The storage manager.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+    """
+
+    if backend is None:
+        backend = os.getenv("STORAGE_BACKEND", "gcs")
+
+    if backend == "gcs":
+        return GoogleCloudStorageManager(
+            project_id=os.getenv("GCP_PROJECT_ID"),
+            bucket_name=os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET")
+        )
+    elif backend == "local":
+        # Without a fixed key, URLs signed before a restart are no longer valid
+        return LocalStorageManager(
+            root_dir=os.getenv("LOCAL_STORAGE_DIR", "storage"),
+            base_url=os.getenv(
+                "LOCAL_STORAGE_URL",
+                "http://localhost:8000/api/storage"
+            ),
+            secret_key=os.getenv("LOCAL_STORAGE_SECRET_KEY") or secrets.token_hex(32)
+        )
+    else:
+        raise ValueError(
+            f"Unknown storage backend `{backend}`. Expected 'gcs' or 'local'."
+        )
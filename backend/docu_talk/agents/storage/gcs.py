@@ -0,0 +1,284 @@
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Tuple
+from urllib.parse import urlparse
+
+from google.api_core.exceptions import NotFound
+from google.cloud import storage
+
+from docu_talk.agents.storage.base import BaseStorageManager
+
+logger = logging.getLogger(__name__)
+
+
+class GoogleCloudStorageManager(BaseStorageManager):
+    """
+    A class to manage Google Cloud Storage operations, including file uploads,
+    downloads, and deletions.
+    """
+
+    def __init__(
+            self,
+            project_id: str,
+            bucket_name: str,
+            signed_url_margin: timedelta = timedelta(minutes=5)
+        ) -> None:
+        """
+        Initializes the Google Cloud Storage Manager.
+
+        Parameters
+        ----------
+        project_id : str
+            The Google Cloud project ID.
+        bucket_name : str
+            The name of the Google Cloud Storage bucket.
+        signed_url_margin : timedelta, optional
+            Signed URLs are reused until this margin before they expire (default is
+            5 minutes).
+        """
+
+        super().__init__(signed_url_margin=signed_url_margin)
+
+        self.bucket_name = bucket_name
+        self.bucket = storage.Client(project_id).bucket(bucket_name)
+
+    def get_uris(
+            self,
+            path: str
+        ) -> Tuple[str, str]:
+        """
+        Builds the URIs of an object.
+
+        Parameters
+        ----------
+        path : str
+            The path of the object in the bucket.
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the GCS URI and the public path of the object.
+        """
+
+        uri = f"gs://{self.bucket_name}/{path}"
+        public_path = f"https://storage.cloud.google.com/{self.bucket_name}/{path}"
+
+        return uri, public_path
+
+    def save_from_filename(
+            self,
+            filename: str,
+            path: str,
+            chunk_size: int = 8 * 1024 * 1024
+        ) -> Tuple[str, str]:
+        """
+        Streams a local file to Google Cloud Storage with a resumable upload, and
+        returns its URIs.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the local file.
+        path : str
+            The destination path in the bucket.
+        chunk_size : int, optional
+            The number of bytes sent per request, a multiple of 256 KiB (default is
+            8 MiB).
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the GCS URI and the public path of the file.
+        """
+
+        # Setting a chunk size makes the upload resumable, one chunk held at a time
+        blob = self.bucket.blob(path, chunk_size=chunk_size)
+        blob.upload_from_filename(filename, content_type="application/pdf")
+
+        return self.get_uris(path)
+
+    def get_blob_name(
+            self,
+            uri: str
+        ) -> str:
+        """
+        Extracts the blob name from a GCS URI.
+
+        Parameters
+        ----------
+        uri : str
+            The GCS URI.
+
+        Returns
+        -------
+        str
+            The blob name extracted from the URI.
+
+        Raises
+        ------
+        ValueError
+            If the URI scheme is not 'gs'.
+        """
+
+        parsed_uri = urlparse(uri)
+        if parsed_uri.scheme != "gs":
+            raise ValueError("Invalid URI scheme. Expected 'gs://'.")
+
+        blob_name = parsed_uri.path.lstrip("/")
+
+        return blob_name
+
+    def open(
+            self,
+            uri: str
+        ) -> BinaryIO:
+        """
+        Opens an object of Google Cloud Storage for streaming reads, downloading it
+        chunk by chunk.
+
+        Parameters
+        ----------
+        uri : str
+            The GCS URI of the object.
+
+        Returns
+        -------
+        BinaryIO
+            The object opened in binary read mode.
+        """
+
+        blob_name = self.get_blob_name(uri)
+        blob = self.bucket.blob(blob_name)
+
+        return blob.open("rb")
+
+    def sign_url(
+            self,
+            uri: str,
+            expiration: timedelta,
+            method: str
+        ) -> str:
+        """
+        Signs a V4 URL granting temporary access to a GCS object.
+
+        Parameters
+        ----------
+        uri : str
+            The GCS URI of the object.
+        expiration : timedelta
+            The validity period of the signed URL.
+        method : str
+            The HTTP method allowed by the signed URL.
+
+        Returns
+        -------
+        str
+            The signed URL for accessing the object.
+        """
+
+        blob_name = self.get_blob_name(uri)
+        blob = self.bucket.blob(blob_name)
+
+        signed_url = blob.generate_signed_url(
+            expiration=datetime.now(timezone.utc) + expiration,
+            method=method
+        )
+
+        return signed_url
+
+    def delete(
+            self,
+            uri: str
+        ) -> None:
+        """
+        Deletes an object from Google Cloud Storage, an object already deleted being
+        ignored.
+
+        Parameters
+        ----------
+        uri : str
+            The GCS URI of the object to delete.
+        """
+
+        self.delete_blob(self.bucket.blob(self.get_blob_name(uri)))
+
+    def delete_blob(
+            self,
+            blob: storage.Blob
+        ) -> None:
+        """
+        Deletes an object listed from Google Cloud Storage, an object already deleted
+        being ignored.
+
+        Parameters
+        ----------
+        blob : storage.Blob
+            The object to delete.
+        """
+
+        try:
+            blob.delete()
+        except NotFound:
+            pass
+
+        self.invalidate_signed_urls(f"gs://{self.bucket_name}/{blob.name}")
+
+    def delete_directory(
+            self,
+            directory_path: str,
+            max_workers: int = 16
+        ) -> dict[str, Exception]:
+        """
+        Deletes all objects within a directory in Google Cloud Storage concurrently.
+        Objects are listed page by page as they are deleted, so that large
+        directories are never listed in memory at once.
+
+        Parameters
+        ----------
+        directory_path : str
+            The directory path in the bucket. Should end with a '/'.
+        max_workers : int, optional
+            The maximum number of concurrent deletions (default is 16).
+
+        Returns
+        -------
+        dict
+            The error raised for each object that could not be deleted, by object
+            name.
+        """
+
+        if not directory_path.endswith("/"):
+            directory_path += "/"
+
+        blobs = self.bucket.list_blobs(prefix=directory_path)
+
+        failures = {}
+        running = {}
+
+        def collect(futures) -> None:
+            for future in futures:
+                name = running.pop(future)
+                if future.exception() is not None:
+                    failures[name] = future.exception()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            for blob in blobs:
+
+                # Bounds the listed objects waiting for deletion
+                if len(running) >= 2 * max_workers:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    collect(done)
+
+                running[executor.submit(self.delete_blob, blob)] = blob.name
+
+            done, _ = wait(running)
+            collect(done)
+
+        if len(failures) > 0:
+            logger.warning(
+                f"Failed to delete {len(failures)} objects from {directory_path}"
+            )
+
+        return failures
@@ -0,0 +1,371 @@
+import hashlib
+import hmac
+import os
+import shutil
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Tuple
+from urllib.parse import quote, unquote, urlencode, urlparse
+from uuid import uuid4
+
+from docu_talk.agents.storage.base import BaseStorageManager
+
+
+class LocalStorageManager(BaseStorageManager):
+    """
+    Stores files in a local directory under `file://` URIs, with URLs signed by an
+    HMAC key and served by the `storage` router. Used to run the chatbot pipelines
+    without Google Cloud Storage, e.g. to profile them.
+    """
+
+    def __init__(
+            self,
+            root_dir: str,
+            base_url: str,
+            secret_key: str,
+            signed_url_margin: timedelta = timedelta(minutes=5)
+        ) -> None:
+        """
+        Initializes the local storage manager.
+
+        Parameters
+        ----------
+        root_dir : str
+            The directory holding the files, created if needed.
+        base_url : str
+            The URL the `storage` router is served at, prefixing the signed URLs.
+        secret_key : str
+            The key signing the URLs.
+        signed_url_margin : timedelta, optional
+            Signed URLs are reused until this margin before they expire (default is
+            5 minutes).
+        """
+
+        super().__init__(signed_url_margin=signed_url_margin)
+
+        self.root_dir = Path(root_dir).resolve()
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+        self.base_url = base_url.rstrip("/")
+        self.secret_key = secret_key.encode("utf-8")
+
+    def get_file_path(
+            self,
+            path: str
+        ) -> Path:
+        """
+        Resolves a path of the storage to a local file path.
+
+        Parameters
+        ----------
+        path : str
+            The path in the storage.
+
+        Returns
+        -------
+        Path
+            The local file path.
+
+        Raises
+        ------
+        ValueError
+            If the path is outside the storage directory.
+        """
+
+        file_path = (self.root_dir / path).resolve()
+        if not file_path.is_relative_to(self.root_dir):
+            raise ValueError(f"Path `{path}` is outside the storage directory.")
+
+        return file_path
+
+    def get_path(
+            self,
+            uri: str
+        ) -> str:
+        """
+        Extracts the path in the storage from a file URI.
+
+        Parameters
+        ----------
+        uri : str
+            The file URI.
+
+        Returns
+        -------
+        str
+            The path in the storage.
+
+        Raises
+        ------
+        ValueError
+            If the URI scheme is not 'file' or the file is outside the storage
+            directory.
+        """
+
+        parsed_uri = urlparse(uri)
+        if parsed_uri.scheme != "file":
+            raise ValueError("Invalid URI scheme. Expected 'file://'.")
+
+        file_path = Path(unquote(parsed_uri.path)).resolve()
+        if not file_path.is_relative_to(self.root_dir):
+            raise ValueError(f"URI `{uri}` is outside the storage directory.")
+
+        return file_path.relative_to(self.root_dir).as_posix()
+
+    def get_uris(
+            self,
+            path: str
+        ) -> Tuple[str, str]:
+        """
+        Builds the URIs of a file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file in the storage.
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the file URI and the public path of the file.
+        """
+
+        uri = self.get_file_path(path).as_uri()
+        public_path = f"{self.base_url}/{quote(path)}"
+
+        return uri, public_path
+
+    def save(
+            self,
+            path: str,
+            write
+        ) -> Tuple[str, str]:
+        """
+        Writes a file through a temporary file, so that readers never see a partially
+        written file.
+
+        Parameters
+        ----------
+        path : str
+            The destination path in the storage.
+        write : Callable
+            A function writing the content of the file to the path it is given.
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the file URI and the public path of the file.
+        """
+
+        file_path = self.get_file_path(path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        temporary_path = file_path.with_name(f".{file_path.name}.{uuid4().hex}")
+        try:
+            write(temporary_path)
+            os.replace(temporary_path, file_path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+        return self.get_uris(path)
+
+    def save_from_filename(
+            self,
+            filename: str,
+            path: str
+        ) -> Tuple[str, str]:
+        """
+        Copies a local file to the storage directory and returns its URIs.
+
+        Parameters
+        ----------
+        filename : str
+            The path of the local file.
+        path : str
+            The destination path in the storage.
+
+        Returns
+        -------
+        tuple of str
+            A tuple containing the file URI and the public path of the file.
+        """
+
+        return self.save(
+            path,
+            write=lambda file_path: shutil.copyfile(filename, file_path)
+        )
+
+    def open(
+            self,
+            uri: str
+        ) -> BinaryIO:
+        """
+        Opens a file of the storage directory for streaming reads.
+
+        Parameters
+        ----------
+        uri : str
+            The file URI.
+
+        Returns
+        -------
+        BinaryIO
+            The file opened in binary read mode.
+        """
+
+        return self.get_file_path(self.get_path(uri)).open("rb")
+
+    def get_signature(
+            self,
+            path: str,
+            expires: int,
+            method: str
+        ) -> str:
+        """
+        Computes the HMAC-SHA256 signature granting access to a file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the file in the storage.
+        expires : int
+            The expiration time of the access, as a Unix timestamp.
+        method : str
+            The HTTP method allowed.
+
+        Returns
+        -------
+        str
+            The hex signature.
+        """
+
+        message = f"{method}\n{path}\n{expires}".encode("utf-8")
+
+        return hmac.new(self.secret_key, message, hashlib.sha256).hexdigest()
+
+    def sign_url(
+            self,
+            uri: str,
+            expiration: timedelta,
+            method: str
+        ) -> str:
+        """
+        Signs a URL of the `storage` router granting temporary access to a file.
+
+        Parameters
+        ----------
+        uri : str
+            The file URI.
+        expiration : timedelta
+            The validity period of the signed URL.
+        method : str
+            The HTTP method allowed by the signed URL.
+
+        Returns
+        -------
+        str
+            The signed URL for accessing the file.
+        """
+
+        path = self.get_path(uri)
+        expires = int(time.time() + expiration.total_seconds())
+
+        query = urlencode(
+            {
+                "expires": expires,
+                "signature": self.get_signature(path, expires=expires, method=method)
+            }
+        )
+
+        return f"{self.base_url}/{quote(path)}?{query}"
+
+    def verify_signature(
+            self,
+            path: str,
+            expires: int,
+            method: str,
+            signature: str
+        ) -> bool:
+        """
+        Checks the signature of a signed URL.
+
+        Parameters
+        ----------
+        path : str
+            The path of the requested file in the storage.
+        expires : int
+            The expiration time of the URL, as a Unix timestamp.
+        method : str
+            The HTTP method of the request.
+        signature : str
+            The signature of the URL.
+
+        Returns
+        -------
+        bool
+            Whether the URL was signed for this path and method and has not expired.
+        """
+
+        if expires < time.time():
+            return False
+
+        expected = self.get_signature(path, expires=expires, method=method)
+
+        return hmac.compare_digest(expected, signature)
+
+    def delete(
+            self,
+            uri: str
+        ) -> None:
+        """
+        Deletes a file of the storage directory, a file already deleted being ignored.
+
+        Parameters
+        ----------
+        uri : str
+            The file URI.
+        """
+
+        self.get_file_path(self.get_path(uri)).unlink(missing_ok=True)
+
+        self.invalidate_signed_urls(uri)
+
+    def delete_directory(
+            self,
+            directory_path: str
+        ) -> dict[str, Exception]:
+        """
+        Deletes all files within a directory of the storage directory.
+
+        Parameters
+        ----------
+        directory_path : str
+            The directory path in the storage.
+
+        Returns
+        -------
+        dict
+            The error raised for each file that could not be deleted, by file name.
+        """
+
+        directory = self.get_file_path(directory_path)
+        if not directory.is_dir():
+            return {}
+
+        failures = {}
+        for file_path in directory.rglob("*"):
+
+            if file_path.is_dir():
+                continue
+
+            try:
+                file_path.unlink()
+                self.invalidate_signed_urls(file_path.as_uri())
+            except Exception as e:
+                failures[file_path.relative_to(self.root_dir).as_posix()] = e
+
+        if len(failures) == 0:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        return failures
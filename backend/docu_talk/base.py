@@ -11,3 +11,10 @@ class ChatBot:
     suggested_prompts: list
     access: str
     service: ChatBotService
+
+@dataclass
+class AccessDecision:
+    chatbot_id: str
+    user_id: str
+    role: str | None
+    is_public: bool
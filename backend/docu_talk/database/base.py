@@ -6,6 +6,9 @@ from pydantic import BaseModel
 
 class User(BaseModel):
     __tablename__ = "Users"
+    __indexes__ = [
+        {"keys": [("email", 1)], "unique": True}
+    ]
 
     id: str
     timestamp: datetime
@@ -18,6 +21,9 @@ class User(BaseModel):
 
 class Usage(BaseModel):
     __tablename__ = "Usages"
+    __indexes__ = [
+        {"keys": [("user_id", 1), ("timestamp", 1)]}
+    ]
 
     id: str
     timestamp: datetime
@@ -27,6 +33,20 @@ class Usage(BaseModel):
     qty: int
     price: float
 
+class WeeklyUsage(BaseModel):
+    __tablename__ = "WeeklyUsages"
+    __indexes__ = [
+        {"keys": [("user_id", 1), ("week_start", 1)], "unique": True}
+    ]
+
+    id: str
+    timestamp: datetime
+    user_id: str
+    week_start: datetime
+    qty: int
+    price: float
+    nb_usages: int
+
 class ServiceModels(BaseModel):
     __tablename__ = "ServiceModels"
 
@@ -38,6 +58,10 @@ class ServiceModels(BaseModel):
 
 class Chatbot(BaseModel):
     __tablename__ = "Chatbots"
+    __indexes__ = [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("access", 1)]}
+    ]
 
     id: str
     timestamp: datetime
@@ -82,6 +106,10 @@ class AskChatbotTokenCount(BaseModel):
 
 class Document(BaseModel):
     __tablename__ = "Documents"
+    __indexes__ = [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("chatbot_id", 1)]}
+    ]
 
     id: str
     timestamp: datetime
@@ -91,9 +119,58 @@ class Document(BaseModel):
     public_path: str
     uri: str
     nb_pages: int
+    nb_chars: Optional[int] = None
+    nb_empty_pages: Optional[int] = None
+    extraction_duration: Optional[float] = None
+    sha256: Optional[str] = None
+
+class Blob(BaseModel):
+    __tablename__ = "Blobs"
+    __indexes__ = [
+        {"keys": [("sha256", 1)], "unique": True}
+    ]
+
+    id: str
+    timestamp: datetime
+    sha256: str
+    nb_references: int
+    uri: Optional[str] = None
+    public_path: Optional[str] = None
+    size: Optional[int] = None
+
+class DocumentPage(BaseModel):
+    __tablename__ = "DocumentPages"
+    __indexes__ = [
+        {"keys": [("document_id", 1), ("page", 1)], "unique": True},
+        {"keys": [("chatbot_id", 1)]}
+    ]
+
+    id: str
+    timestamp: datetime
+    chatbot_id: str
+    document_id: str
+    page: int
+    text: str
+
+class ContextCache(BaseModel):
+    __tablename__ = "ContextCaches"
+    __indexes__ = [
+        {"keys": [("chatbot_id", 1), ("model", 1), ("documents_key", 1)]}
+    ]
+
+    id: str
+    timestamp: datetime
+    chatbot_id: str
+    model: str
+    documents_key: str
+    name: Optional[str]
+    expire_time: datetime
 
 class SuggestedPrompt(BaseModel):
     __tablename__ = "SuggestedPrompts"
+    __indexes__ = [
+        {"keys": [("chatbot_id", 1)]}
+    ]
 
     id: str
     timestamp: datetime
@@ -102,6 +179,10 @@ class SuggestedPrompt(BaseModel):
 
 class Access(BaseModel):
     __tablename__ = "Access"
+    __indexes__ = [
+        {"keys": [("chatbot_id", 1), ("user_id", 1)], "unique": True},
+        {"keys": [("user_id", 1)]}
+    ]
 
     id: str
     timestamp: datetime
@@ -111,21 +192,31 @@ class Access(BaseModel):
 
 class Conversation(BaseModel):
     __tablename__ = "Conversations"
+    __indexes__ = [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("chatbot_id", 1), ("user_id", 1), ("timestamp", -1), ("id", -1)]}
+    ]
 
     id: str
     timestamp: datetime
     title: str
     chatbot_id: str
     user_id: str
+    summary: Optional[str] = None
+    summary_until: Optional[datetime] = None
 
 class Message(BaseModel):
     __tablename__ = "Messages"
+    __indexes__ = [
+        {"keys": [("conversation_id", 1), ("timestamp", 1)]}
+    ]
 
     id: str
     timestamp: datetime
     conversation_id: str
     role: str
     content: str
+    kind: Literal["message", "sources"] = "message"
 
 class Feedback(BaseModel):
     __tablename__ = "Feedbacks"
@@ -135,4 +226,26 @@ class Feedback(BaseModel):
     user_id: str
     type: str
     title: str
-    description: str
\ No newline at end of file
+    description: str
+
+class Job(BaseModel):
+    __tablename__ = "Jobs"
+    __indexes__ = [
+        {"keys": [("id", 1)], "unique": True},
+        {"keys": [("status", 1), ("timestamp", 1)]}
+    ]
+
+    id: str
+    timestamp: datetime
+    type: Literal["create_chatbot"]
+    status: Literal["pending", "running", "completed", "failed"]
+    user_id: str
+    chatbot_id: str
+    model: str
+    documents: list[dict]
+    checkpoints: dict = {}
+    completed_stages: list[str] = []
+    nb_attempts: int = 0
+    worker_id: Optional[str] = None
+    heartbeat: Optional[datetime] = None
+    error: Optional[str] = None
@@ -1,36 +1,51 @@
+import asyncio
+import logging
+import os
 from datetime import datetime
-from typing import Union
+from typing import Literal, Union
+from uuid import uuid4
 
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, IndexModel, MongoClient, ReturnDocument
 
 from docu_talk.database.base import (
     Access,
     AskChatbotDuration,
     AskChatbotTokenCount,
+    Blob,
     Chatbot,
+    ContextCache,
     Conversation,
     CreateChatbotDuration,
     Document,
+    DocumentPage,
+    Job,
     Message,
     ServiceModels,
     SuggestedPrompt,
     Usage,
     User,
+    WeeklyUsage,
     Feedback
 )
 
+logger = logging.getLogger(__name__)
 
-class Database:
+
+class BaseDatabase:
     """
-    A class for managing database operations in the DocuTalk application.
+    Table definitions and record preparation shared by the database backends.
     """
 
     tables = [
         User,
         Usage,
+        WeeklyUsage,
         ServiceModels,
         Chatbot,
         Document,
+        Blob,
+        DocumentPage,
+        ContextCache,
         Access,
         SuggestedPrompt,
         CreateChatbotDuration,
@@ -38,9 +53,132 @@ class Database:
         AskChatbotTokenCount,
         Conversation,
         Message,
-        Feedback
+        Feedback,
+        Job
     ]
 
+    def prepare_data(
+            self,
+            table: str,
+            data: dict
+        ) -> dict:
+        """
+        Completes a record with its ID and timestamp and validates it against the
+        table model.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) the record is inserted into.
+        data : dict
+            The record to prepare.
+
+        Returns
+        -------
+        dict
+            The prepared record.
+        """
+
+        table_class = next(t for t in self.tables if t.__tablename__ == table)
+
+        if "id" not in data:
+            data["id"] = str(uuid4())
+        data["timestamp"] = datetime.now()
+
+        table_class(**data)
+
+        return data
+
+    def prepare_records(
+            self,
+            table: str,
+            data: list[dict]
+        ) -> list[dict]:
+        """
+        Prepares the records inserted into a table in a single round trip.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) the records are inserted into.
+        data : list of dict
+            The records to insert.
+
+        Returns
+        -------
+        list of dict
+            The prepared records.
+        """
+
+        logger.info(f"Inserting {len(data)} record(s) into table `{table}`")
+
+        return [self.prepare_data(table=table, data=record) for record in data]
+
+    def get_index_models(self) -> dict[str, list[IndexModel]]:
+        """
+        Builds the indexes declared with `__indexes__` on the table models.
+
+        Returns
+        -------
+        dict
+            The index models keyed by table name.
+        """
+
+        index_models = {}
+        for table_class in self.tables:
+
+            indexes = getattr(table_class, "__indexes__", [])
+            if len(indexes) == 0:
+                continue
+
+            index_models[table_class.__tablename__] = [
+                IndexModel(index["keys"], unique=index.get("unique", False))
+                for index in indexes
+            ]
+
+        return index_models
+
+    def plan_indexes(
+            self,
+            index_models: list[IndexModel],
+            existing_indexes: list[str]
+        ) -> tuple[list[IndexModel], list[str]]:
+        """
+        Compares the declared indexes of a table with its existing indexes.
+
+        Parameters
+        ----------
+        index_models : list of IndexModel
+            The declared indexes of the table.
+        existing_indexes : list of str
+            The names of the indexes existing in the database.
+
+        Returns
+        -------
+        tuple of (list of IndexModel, list of str)
+            The declared indexes missing from the database, and the names of the
+            existing indexes that are not declared.
+        """
+
+        declared_indexes = [model.document["name"] for model in index_models]
+
+        missing_indexes = [
+            model for model in index_models
+            if model.document["name"] not in existing_indexes
+        ]
+
+        extra_indexes = [
+            name for name in existing_indexes
+            if name not in declared_indexes and name != "_id_"
+        ]
+
+        return missing_indexes, extra_indexes
+
+class Database(BaseDatabase):
+    """
+    A class for managing database operations in the DocuTalk application.
+    """
+
     def __init__(
             self,
             uri: str,
@@ -122,20 +260,43 @@ class Database:
             The ID of the inserted record.
         """
 
-        table_class = next(t for t in self.tables if t.__tablename__ == table)
-
-        from uuid import uuid4
-        if "id" not in data:
-            data["id"] = str(uuid4())
-        data["timestamp"] = datetime.now()
-
-        table_class(**data)
+        [data] = self.prepare_records(table=table, data=[data])
 
-        print(f"Inserting a record into table `{table}`")
         self.database[table].insert_one(data)
 
         return data["id"]
 
+    def insert_many_data(
+            self,
+            table: str,
+            data: list[dict]
+        ) -> list[str]:
+        """
+        Inserts several records into the specified table in a single round trip and
+        returns their IDs.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to insert data into.
+        data : list of dict
+            The records to insert.
+
+        Returns
+        -------
+        list of str
+            The IDs of the inserted records.
+        """
+
+        if len(data) == 0:
+            return []
+
+        data = self.prepare_records(table=table, data=data)
+
+        self.database[table].insert_many(data)
+
+        return [record["id"] for record in data]
+
     def get_data(
             self,
             table: str,
@@ -173,7 +334,7 @@ class Database:
             cursor = cursor.sort(sort["column"], sort["direction"])
 
         if limit is not None:
-            cursor = cursor.limit(4)
+            cursor = cursor.limit(limit)
 
         documents = list(cursor)
 
@@ -182,6 +343,92 @@ class Database:
 
         return documents
 
+    def exists_data(
+            self,
+            table: str,
+            filter: dict
+        ) -> bool:
+        """
+        Checks whether a record matching the filter criteria exists, fetching at most
+        its internal ID.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to search.
+        filter : dict
+            The filter criteria.
+
+        Returns
+        -------
+        bool
+            True if a matching record exists, False otherwise.
+        """
+
+        document = self.database[table].find_one(filter, projection={"_id": 1})
+
+        return document is not None
+
+    def insert_data_if_absent(
+            self,
+            table: str,
+            filter: dict,
+            data: dict
+        ) -> bool:
+        """
+        Atomically inserts a record unless a record matching the filter criteria
+        already exists.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to insert data into.
+        filter : dict
+            The filter criteria identifying an existing record.
+        data : dict
+            The data to insert.
+
+        Returns
+        -------
+        bool
+            True if the record was inserted, False if it already existed.
+        """
+
+        data = self.prepare_data(table=table, data=data)
+
+        result = self.database[table].update_one(
+            filter=filter,
+            update={"$setOnInsert": data},
+            upsert=True
+        )
+
+        return result.upserted_id is not None
+
+    def aggregate_data(
+            self,
+            table: str,
+            pipeline: list[dict]
+        ) -> list:
+        """
+        Runs an aggregation pipeline on the specified table.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to aggregate.
+        pipeline : list of dict
+            The aggregation stages.
+
+        Returns
+        -------
+        list
+            A list of documents produced by the pipeline.
+        """
+
+        documents = list(self.database[table].aggregate(pipeline))
+
+        return documents
+
     def update_data(
             self,
             table: str,
@@ -214,6 +461,106 @@ class Database:
 
         return result
 
+    def increment_data(
+            self,
+            table: str,
+            filter: dict,
+            increments: dict
+        ):
+        """
+        Atomically increments fields of the record matching the filter criteria,
+        creating the record if it does not exist.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to update.
+        filter : dict
+            The filter criteria to locate the record to update.
+        increments : dict
+            The amounts to add to each field.
+
+        Returns
+        -------
+        pymongo.results.UpdateResult
+            The result of the update operation.
+        """
+
+        result = self.database[table].update_one(
+            filter=filter,
+            update={
+                "$inc": increments,
+                "$setOnInsert": {"id": str(uuid4()), "timestamp": datetime.now()}
+            },
+            upsert=True
+        )
+
+        return result
+
+    def find_and_update_data(
+            self,
+            table: str,
+            filter: dict,
+            updates: dict,
+            sort: dict | None = None
+        ) -> dict | None:
+        """
+        Atomically updates the first record matching the filter criteria, without
+        creating it, and returns it (e.g. to claim a record among concurrent callers).
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to update.
+        filter : dict
+            The filter criteria to locate the record to update.
+        updates : dict
+            The updates to apply to the record.
+        sort : dict or None, optional
+            The sort criteria, including column and direction, choosing the record
+            when several match (default is None).
+
+        Returns
+        -------
+        dict or None
+            The updated record, or None if no record matches.
+        """
+
+        record = self.database[table].find_one_and_update(
+            filter=filter,
+            update={"$set": updates},
+            sort=None if sort is None else [(sort["column"], sort["direction"])],
+            return_document=ReturnDocument.AFTER
+        )
+
+        return record
+
+    def find_and_delete_data(
+            self,
+            table: str,
+            filter: dict
+        ) -> dict | None:
+        """
+        Atomically deletes the first record matching the filter criteria and returns
+        it, so that a single caller among concurrent ones deletes it.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to delete data from.
+        filter : dict
+            The filter criteria to locate the record to delete.
+
+        Returns
+        -------
+        dict or None
+            The deleted record, or None if no record matches.
+        """
+
+        record = self.database[table].find_one_and_delete(filter=filter)
+
+        return record
+
     def delete_data(
             self,
             table: str,
@@ -238,3 +585,671 @@ class Database:
         result = self.database[table].delete_many(filter)
 
         return result
+
+    def ensure_indexes(self) -> dict[str, dict]:
+        """
+        Creates the indexes declared on the table models that are missing from the
+        database. Existing indexes are left untouched, so the operation is idempotent.
+
+        Returns
+        -------
+        dict
+            For each table, the names of the created indexes, of the undeclared indexes
+            found in the database and of the indexes that could not be created, with
+            the error.
+        """
+
+        report = {}
+        for table, index_models in self.get_index_models().items():
+
+            existing_indexes = list(self.database[table].index_information())
+
+            missing_indexes, extra_indexes = self.plan_indexes(
+                index_models=index_models,
+                existing_indexes=existing_indexes
+            )
+
+            report[table] = {"created": [], "extra": extra_indexes, "failed": {}}
+            for index_model in missing_indexes:
+
+                name = index_model.document["name"]
+                try:
+                    self.database[table].create_indexes([index_model])
+                    report[table]["created"].append(name)
+                except Exception as e:
+                    report[table]["failed"][name] = str(e)
+
+            logger.info(f"Indexes of table `{table}`: {report[table]}")
+
+        return report
+
+class AsyncDatabase(BaseDatabase):
+    """
+    A class for managing database operations in the DocuTalk application without
+    blocking the event loop, built on the asynchronous MongoDB driver.
+    """
+
+    def __init__(
+            self,
+            uri: str,
+            database_name: str
+        ) -> None:
+        """
+        Initializes the database connection.
+
+        Parameters
+        ----------
+        uri : str
+            The MongoDB connection URI.
+        database_name : str
+            The name of the database to connect to.
+        """
+
+        self.uri = uri
+        self.database_name = database_name
+
+        self.client = AsyncMongoClient(self.uri, uuidRepresentation="standard")
+        self.database = self.client[self.database_name]
+
+    async def disconnect(self) -> None:
+        """
+        Closes the database connection.
+        """
+
+        await self.client.close()
+
+    async def table_list(self) -> list:
+        """
+        Retrieves the list of collection names in the database.
+
+        Returns
+        -------
+        list
+            A list of collection names.
+        """
+
+        return await self.database.list_collection_names()
+
+    async def clear_database(
+            self,
+            collections: Union[list, None] = None
+        ) -> None:
+        """
+        Clears the database by dropping specified collections or all collections.
+
+        Parameters
+        ----------
+        collections : list or None, optional
+            A list of collections to drop. If None, all collections are dropped.
+        """
+
+        if collections is None:
+            collections = await self.database.list_collection_names()
+
+        for collection in collections:
+            await self.database[collection].drop()
+
+    async def insert_data(
+            self,
+            table: str,
+            data: dict
+        ) -> str:
+        """
+        Inserts a record into the specified table and returns its ID.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to insert data into.
+        data : dict
+            The data to insert.
+
+        Returns
+        -------
+        str
+            The ID of the inserted record.
+        """
+
+        [data] = self.prepare_records(table=table, data=[data])
+
+        await self.database[table].insert_one(data)
+
+        return data["id"]
+
+    async def insert_many_data(
+            self,
+            table: str,
+            data: list[dict]
+        ) -> list[str]:
+        """
+        Inserts several records into the specified table in a single round trip and
+        returns their IDs.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to insert data into.
+        data : list of dict
+            The records to insert.
+
+        Returns
+        -------
+        list of str
+            The IDs of the inserted records.
+        """
+
+        if len(data) == 0:
+            return []
+
+        data = self.prepare_records(table=table, data=data)
+
+        await self.database[table].insert_many(data)
+
+        return [record["id"] for record in data]
+
+    async def get_data(
+            self,
+            table: str,
+            filter: dict | None = None,
+            sort: dict | None = None,
+            limit: int | None = None,
+            get_first: bool = False
+        ) -> list | dict:
+        """
+        Retrieves data from a specified table based on filter criteria.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to retrieve data from.
+        filter : dict or None, optional
+            The filter criteria for retrieving data.
+        sort : dict or None, optional
+            The sort criteria, including column and direction (default is None).
+        limit : int or None, optional
+            The maximum number of records to retrieve (default is None).
+
+        Returns
+        -------
+        list
+            A list of documents matching the criteria.
+        """
+
+        if filter is None:
+            filter = {}
+
+        cursor = self.database[table].find(filter)
+
+        if sort is not None:
+            cursor = cursor.sort(sort["column"], sort["direction"])
+
+        if limit is not None:
+            cursor = cursor.limit(limit)
+
+        documents = await cursor.to_list(length=None)
+
+        if get_first:
+            return documents[0]
+
+        return documents
+
+    async def exists_data(
+            self,
+            table: str,
+            filter: dict
+        ) -> bool:
+        """
+        Checks whether a record matching the filter criteria exists, fetching at most
+        its internal ID.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to search.
+        filter : dict
+            The filter criteria.
+
+        Returns
+        -------
+        bool
+            True if a matching record exists, False otherwise.
+        """
+
+        document = await self.database[table].find_one(
+            filter,
+            projection={"_id": 1}
+        )
+
+        return document is not None
+
+    async def insert_data_if_absent(
+            self,
+            table: str,
+            filter: dict,
+            data: dict
+        ) -> bool:
+        """
+        Atomically inserts a record unless a record matching the filter criteria
+        already exists.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to insert data into.
+        filter : dict
+            The filter criteria identifying an existing record.
+        data : dict
+            The data to insert.
+
+        Returns
+        -------
+        bool
+            True if the record was inserted, False if it already existed.
+        """
+
+        data = self.prepare_data(table=table, data=data)
+
+        result = await self.database[table].update_one(
+            filter=filter,
+            update={"$setOnInsert": data},
+            upsert=True
+        )
+
+        return result.upserted_id is not None
+
+    async def aggregate_data(
+            self,
+            table: str,
+            pipeline: list[dict]
+        ) -> list:
+        """
+        Runs an aggregation pipeline on the specified table.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to aggregate.
+        pipeline : list of dict
+            The aggregation stages.
+
+        Returns
+        -------
+        list
+            A list of documents produced by the pipeline.
+        """
+
+        cursor = await self.database[table].aggregate(pipeline)
+        documents = await cursor.to_list(length=None)
+
+        return documents
+
+    async def update_data(
+            self,
+            table: str,
+            filter: dict,
+            updates: dict
+        ):
+        """
+        Updates a record in the specified table based on filter criteria.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to update.
+        filter : dict
+            The filter criteria to locate the record to update.
+        updates : dict
+            The updates to apply to the record.
+
+        Returns
+        -------
+        pymongo.results.UpdateResult
+            The result of the update operation.
+        """
+
+        result = await self.database[table].update_one(
+            filter=filter,
+            update={"$set": updates},
+            upsert=True
+        )
+
+        return result
+
+    async def increment_data(
+            self,
+            table: str,
+            filter: dict,
+            increments: dict
+        ):
+        """
+        Atomically increments fields of the record matching the filter criteria,
+        creating the record if it does not exist.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to update.
+        filter : dict
+            The filter criteria to locate the record to update.
+        increments : dict
+            The amounts to add to each field.
+
+        Returns
+        -------
+        pymongo.results.UpdateResult
+            The result of the update operation.
+        """
+
+        result = await self.database[table].update_one(
+            filter=filter,
+            update={
+                "$inc": increments,
+                "$setOnInsert": {"id": str(uuid4()), "timestamp": datetime.now()}
+            },
+            upsert=True
+        )
+
+        return result
+
+    async def find_and_update_data(
+            self,
+            table: str,
+            filter: dict,
+            updates: dict,
+            sort: dict | None = None
+        ) -> dict | None:
+        """
+        Atomically updates the first record matching the filter criteria, without
+        creating it, and returns it (e.g. to claim a record among concurrent callers).
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to update.
+        filter : dict
+            The filter criteria to locate the record to update.
+        updates : dict
+            The updates to apply to the record.
+        sort : dict or None, optional
+            The sort criteria, including column and direction, choosing the record
+            when several match (default is None).
+
+        Returns
+        -------
+        dict or None
+            The updated record, or None if no record matches.
+        """
+
+        record = await self.database[table].find_one_and_update(
+            filter=filter,
+            update={"$set": updates},
+            sort=None if sort is None else [(sort["column"], sort["direction"])],
+            return_document=ReturnDocument.AFTER
+        )
+
+        return record
+
+    async def find_and_delete_data(
+            self,
+            table: str,
+            filter: dict
+        ) -> dict | None:
+        """
+        Atomically deletes the first record matching the filter criteria and returns
+        it, so that a single caller among concurrent ones deletes it.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to delete data from.
+        filter : dict
+            The filter criteria to locate the record to delete.
+
+        Returns
+        -------
+        dict or None
+            The deleted record, or None if no record matches.
+        """
+
+        record = await self.database[table].find_one_and_delete(filter=filter)
+
+        return record
+
+    async def delete_data(
+            self,
+            table: str,
+            filter: dict
+        ):
+        """
+        Deletes records from the specified table based on filter criteria.
+
+        Parameters
+        ----------
+        table : str
+            The name of the table (collection) to delete data from.
+        filter : dict
+            The filter criteria for identifying records to delete.
+
+        Returns
+        -------
+        pymongo.results.DeleteResult
+            The result of the delete operation.
+        """
+
+        result = await self.database[table].delete_many(filter)
+
+        return result
+
+    async def ensure_indexes(self) -> dict[str, dict]:
+        """
+        Creates the indexes declared on the table models that are missing from the
+        database. Existing indexes are left untouched, so the operation is idempotent.
+
+        Returns
+        -------
+        dict
+            For each table, the names of the created indexes, of the undeclared indexes
+            found in the database and of the indexes that could not be created, with
+            the error.
+        """
+
+        report = {}
+        for table, index_models in self.get_index_models().items():
+
+            existing_indexes = list(await self.database[table].index_information())
+
+            missing_indexes, extra_indexes = self.plan_indexes(
+                index_models=index_models,
+                existing_indexes=existing_indexes
+            )
+
+            report[table] = {"created": [], "extra": extra_indexes, "failed": {}}
+            for index_model in missing_indexes:
+
+                name = index_model.document["name"]
+                try:
+                    await self.database[table].create_indexes([index_model])
+                    report[table]["created"].append(name)
+                except Exception as e:
+                    report[table]["failed"][name] = str(e)
+
+            logger.info(f"Indexes of table `{table}`: {report[table]}")
+
+        return report
+
+class ThreadedDatabase(BaseDatabase):
+    """
+    Exposes the awaitable interface of `AsyncDatabase` on top of the blocking
+    `Database`, each query being run in a worker thread.
+    """
+
+    def __init__(
+            self,
+            uri: str,
+            database_name: str
+        ) -> None:
+        """
+        Initializes the database connection.
+
+        Parameters
+        ----------
+        uri : str
+            The MongoDB connection URI.
+        database_name : str
+            The name of the database to connect to.
+        """
+
+        self.sync_db = Database(uri=uri, database_name=database_name)
+
+    async def disconnect(self) -> None:
+        """
+        Threaded counterpart of `Database.disconnect`.
+        """
+
+        await asyncio.to_thread(self.sync_db.disconnect)
+
+    async def table_list(self) -> list:
+        """
+        Threaded counterpart of `Database.table_list`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.table_list)
+
+    async def clear_database(self, *args, **kwargs) -> None:
+        """
+        Threaded counterpart of `Database.clear_database`.
+        """
+
+        await asyncio.to_thread(self.sync_db.clear_database, *args, **kwargs)
+
+    async def insert_data(self, *args, **kwargs) -> str:
+        """
+        Threaded counterpart of `Database.insert_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.insert_data, *args, **kwargs)
+
+    async def insert_many_data(self, *args, **kwargs) -> list[str]:
+        """
+        Threaded counterpart of `Database.insert_many_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.insert_many_data, *args, **kwargs)
+
+    async def get_data(self, *args, **kwargs) -> list | dict:
+        """
+        Threaded counterpart of `Database.get_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.get_data, *args, **kwargs)
+
+    async def exists_data(self, *args, **kwargs) -> bool:
+        """
+        Threaded counterpart of `Database.exists_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.exists_data, *args, **kwargs)
+
+    async def insert_data_if_absent(self, *args, **kwargs) -> bool:
+        """
+        Threaded counterpart of `Database.insert_data_if_absent`.
+        """
+
+        return await asyncio.to_thread(
+            self.sync_db.insert_data_if_absent, *args, **kwargs
+        )
+
+    async def aggregate_data(self, *args, **kwargs) -> list:
+        """
+        Threaded counterpart of `Database.aggregate_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.aggregate_data, *args, **kwargs)
+
+    async def update_data(self, *args, **kwargs):
+        """
+        Threaded counterpart of `Database.update_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.update_data, *args, **kwargs)
+
+    async def increment_data(self, *args, **kwargs):
+        """
+        Threaded counterpart of `Database.increment_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.increment_data, *args, **kwargs)
+
+    async def find_and_update_data(self, *args, **kwargs) -> dict | None:
+        """
+        Threaded counterpart of `Database.find_and_update_data`.
+        """
+
+        return await asyncio.to_thread(
+            self.sync_db.find_and_update_data, *args, **kwargs
+        )
+
+    async def find_and_delete_data(self, *args, **kwargs) -> dict | None:
+        """
+        Threaded counterpart of `Database.find_and_delete_data`.
+        """
+
+        return await asyncio.to_thread(
+            self.sync_db.find_and_delete_data, *args, **kwargs
+        )
+
+    async def delete_data(self, *args, **kwargs):
+        """
+        Threaded counterpart of `Database.delete_data`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.delete_data, *args, **kwargs)
+
+    async def ensure_indexes(self) -> dict[str, dict]:
+        """
+        Threaded counterpart of `Database.ensure_indexes`.
+        """
+
+        return await asyncio.to_thread(self.sync_db.ensure_indexes)
+
+def get_database(
+        uri: str,
+        database_name: str,
+        backend: Literal["async", "threaded"] | None = None
+    ) -> AsyncDatabase | ThreadedDatabase:
+    """
+    Instantiates the awaitable database backend selected by the settings.
+
+    Parameters
+    ----------
+    uri : str
+        The MongoDB connection URI.
+    database_name : str
+        The name of the database to connect to.
+    backend : {'async', 'threaded'} or None, optional
+        The backend to use: the asynchronous MongoDB driver ('async') or the blocking
+        driver run in worker threads ('threaded'). Default is None, fetched from the
+        `MONGO_DB_BACKEND` environment variable, falling back to 'async'.
+
+    Returns
+    -------
+    AsyncDatabase or ThreadedDatabase
+        The database backend.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown.
+    """
+
+    if backend is None:
+        backend = os.getenv("MONGO_DB_BACKEND", "async")
+
+    if backend == "async":
+        return AsyncDatabase(uri=uri, database_name=database_name)
+    elif backend == "threaded":
+        return ThreadedDatabase(uri=uri, database_name=database_name)
+    else:
+        raise ValueError(
+            f"Unknown database backend `{backend}`. Expected 'async' or 'threaded'."
+        )
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+from docu_talk.agents.storage import BaseStorageManager
+from docu_talk.docu_talk import DocuTalk
+
+
+def download(
+        storage_manager: BaseStorageManager,
+        uri: str
+    ) -> str:
+    """
+    Streams a stored document to a temporary file, so that it is never held in
+    memory as a whole.
+
+    Parameters
+    ----------
+    storage_manager : BaseStorageManager
+        The storage the document is read from.
+    uri : str
+        The URI of the document.
+
+    Returns
+    -------
+    str
+        The path of the temporary file, to be removed by the caller.
+    """
+
+    with (
+        storage_manager.open(uri) as source,
+        tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f
+    ):
+        shutil.copyfileobj(source, f)
+
+    return f.name
+
+
+async def main() -> None:
+    """
+    Extracts the page text of the documents uploaded before text extraction was
+    introduced.
+    """
+
+    load_dotenv()
+
+    docu_talk = DocuTalk()
+
+    documents = await docu_talk.db.get_data(
+        table="Documents",
+        filter={"nb_chars": None}
+    )
+
+    print(f"{len(documents)} documents to extract")
+
+    for document in documents:
+
+        pdf_path = await asyncio.to_thread(
+            download,
+            storage_manager=docu_talk.storage_manager,
+            uri=document["uri"]
+        )
+
+        try:
+            pages, stats = await asyncio.to_thread(
+                docu_talk.extract_document_pages,
+                pdf=pdf_path
+            )
+        finally:
+            os.remove(pdf_path)
+
+        # Pages of an interrupted run are replaced
+        await docu_talk.db.delete_data(
+            table="DocumentPages",
+            filter={"document_id": document["id"]}
+        )
+
+        await docu_talk.store_document_pages(
+            chatbot_id=document["chatbot_id"],
+            document_id=document["id"],
+            pages=pages
+        )
+
+        await docu_talk.db.update_data(
+            table="Documents",
+            filter={"id": document["id"]},
+            updates=stats
+        )
+
+    await docu_talk.db.disconnect()
+
+if __name__ == "__main__":
+
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+from docu_talk.database.database import Database
+
+
+def compute_weekly_usages(db: Database) -> dict[tuple, dict]:
+    """
+    Recomputes the weekly usage counters from the `Usages` table.
+
+    Parameters
+    ----------
+    db : Database
+        The database connection.
+
+    Returns
+    -------
+    dict
+        The counters (qty, price, nb_usages) keyed by (user_id, week_start).
+    """
+
+    buckets = db.aggregate_data(
+        table="Usages",
+        pipeline=[
+            {
+                "$group": {
+                    "_id": {
+                        "user_id": "$user_id",
+                        "week_start": {
+                            "$dateTrunc": {
+                                "date": "$timestamp",
+                                "unit": "week",
+                                "startOfWeek": "monday"
+                            }
+                        }
+                    },
+                    "qty": {"$sum": "$qty"},
+                    "price": {"$sum": "$price"},
+                    "nb_usages": {"$sum": 1}
+                }
+            }
+        ]
+    )
+
+    weekly_usages = {
+        (b["_id"]["user_id"], b["_id"]["week_start"]): {
+            "qty": b["qty"],
+            "price": b["price"],
+            "nb_usages": b["nb_usages"]
+        }
+        for b in buckets
+    }
+
+    return weekly_usages
+
+def backfill(db: Database) -> None:
+    """
+    Writes the weekly usage counters recomputed from the `Usages` table. Existing
+    counters are overwritten, so the job should run before `store_usage` starts
+    incrementing them.
+
+    Parameters
+    ----------
+    db : Database
+        The database connection.
+    """
+
+    weekly_usages = compute_weekly_usages(db)
+
+    for (user_id, week_start), counters in weekly_usages.items():
+
+        db.database["WeeklyUsages"].update_one(
+            filter={"user_id": user_id, "week_start": week_start},
+            update={
+                "$set": counters,
+                "$setOnInsert": {"id": str(uuid4()), "timestamp": datetime.now()}
+            },
+            upsert=True
+        )
+
+    print(f"{len(weekly_usages)} weekly usage counters written")
+
+def check(
+        db: Database,
+        tolerance: float = 1e-9
+    ) -> bool:
+    """
+    Compares the weekly usage counters with the `Usages` table.
+
+    Parameters
+    ----------
+    db : Database
+        The database connection.
+    tolerance : float, optional
+        The tolerated difference on prices (default is 1e-9).
+
+    Returns
+    -------
+    bool
+        True if the counters are consistent, False otherwise.
+    """
+
+    expected = compute_weekly_usages(db)
+
+    actual = {
+        (b["user_id"], b["week_start"]): b
+        for b in db.get_data(table="WeeklyUsages")
+    }
+
+    inconsistencies = []
+    for key in expected.keys() | actual.keys():
+
+        expected_counters = expected.get(key, {"qty": 0, "price": 0, "nb_usages": 0})
+        actual_counters = actual.get(key, {"qty": 0, "price": 0, "nb_usages": 0})
+
+        if (
+            expected_counters["qty"] != actual_counters["qty"]
+            or expected_counters["nb_usages"] != actual_counters["nb_usages"]
+            or abs(expected_counters["price"] - actual_counters["price"]) > tolerance
+        ):
+            inconsistencies.append((key, expected_counters, actual_counters))
+
+    for (user_id, week_start), expected_counters, actual_counters in inconsistencies:
+        print(
+            f"{user_id} - week of {week_start.date()}: expected "
+            f"{expected_counters}, found {actual_counters}"
+        )
+
+    print(f"{len(inconsistencies)} inconsistent weekly usage counters")
+
+    return len(inconsistencies) == 0
+
+if __name__ == "__main__":
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="Backfill or check the weekly usage counters"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only compare the counters with the Usages table"
+    )
+    args = parser.parse_args()
+
+    db = Database(
+        uri=os.getenv("MONGO_DB_URI"),
+        database_name=os.getenv("MONGO_DB_NAME")
+    )
+
+    if args.check:
+        consistent = check(db)
+        sys.exit(0 if consistent else 1)
+    else:
+        backfill(db)
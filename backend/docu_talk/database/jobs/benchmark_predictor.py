@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+from docu_talk.agents.predictor.predictor import Predictor, metrics
+
+NB_CALLS = 1_000
+
+def time_calls(predict, data: dict) -> float:
+    """
+    Returns the average duration of a prediction, in milliseconds.
+    """
+
+    predict(data)
+
+    start = time.perf_counter()
+    for _ in range(NB_CALLS):
+        predict(data)
+
+    return (time.perf_counter() - start) / NB_CALLS * 1000
+
+def main() -> None:
+
+    load_dotenv()
+
+    predictor = Predictor()
+
+    data = {
+        "nb_documents": 5,
+        "total_pages": 120,
+        "model": "gemini-2.0-flash-001",
+        "timestamp": datetime.now()
+    }
+
+    for metric in metrics:
+
+        model = predictor.models[metric]
+
+        # The previous path: a one-row DataFrame preprocessed on every call
+        def pandas_predict(data: dict, model=model, metric=metric) -> float:
+            df = pd.DataFrame([data])
+            df["model"] = df["model"].astype("category").cat.codes
+            df["timestamp"] = pd.to_datetime(df["timestamp"]).astype(int) / 10**9
+            df = df[predictor.schemas[metric].features]
+            return model.predict(X=df)[0]
+
+        def numpy_predict(data: dict, metric=metric) -> float:
+            return predictor.predict(metric=metric, data=data)
+
+        pandas_duration = time_calls(pandas_predict, data)
+        numpy_duration = time_calls(numpy_predict, data)
+
+        print(f"{metric}:")
+        print(f"  pandas path: {pandas_duration:.3f} ms/call")
+        print(f"  NumPy path: {numpy_duration:.3f} ms/call")
+        print(f"  speedup: {pandas_duration / numpy_duration:.1f}x")
+        print(f"  predictions: {pandas_predict(data):.3f} / {numpy_predict(data):.3f}")
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+from docu_talk.database.database import AsyncDatabase
+
+NB_USERS = 100_000
+NB_LOOKUPS = 50
+
+async def time_lookups(lookup, emails: list[str]) -> float:
+    """
+    Returns the average duration of a user lookup, in milliseconds.
+    """
+
+    start = time.perf_counter()
+    for email in emails:
+        await lookup(email)
+
+    return (time.perf_counter() - start) / len(emails) * 1000
+
+async def main() -> None:
+
+    load_dotenv()
+
+    # Seeds a dedicated database, dropped at the end of the benchmark
+    db = AsyncDatabase(
+        uri=os.getenv("MONGO_DB_URI"),
+        database_name=f"{os.getenv('MONGO_DB_NAME')}_benchmark"
+    )
+
+    await db.clear_database(collections=["Users"])
+
+    users = [
+        {
+            "id": str(uuid4()),
+            "timestamp": datetime.now(),
+            "email": f"user-{i}@example.com",
+            "first_name": "User",
+            "last_name": str(i),
+            "friendly_name": "User",
+            "password_hash": "not-a-hash",
+            "period_dollar_amount": 0.25,
+            "terms_of_use_displayed": False,
+            "is_guest": False
+        }
+        for i in range(NB_USERS)
+    ]
+
+    for i in range(0, NB_USERS, 10_000):
+        await db.database["Users"].insert_many(users[i:i + 10_000])
+
+    await db.ensure_indexes()
+
+    step = NB_USERS // NB_LOOKUPS
+    emails = [f"user-{i * step}@example.com" for i in range(NB_LOOKUPS)]
+    emails[-1] = "unknown@example.com"
+
+    async def full_scan(email: str) -> bool:
+        data = await db.get_data(table="Users", filter={})
+        return email in [user["email"] for user in data]
+
+    async def indexed_lookup(email: str) -> bool:
+        return await db.exists_data(table="Users", filter={"email": email})
+
+    full_scan_duration = await time_lookups(full_scan, emails[:5])
+    indexed_lookup_duration = await time_lookups(indexed_lookup, emails)
+
+    print(f"Users: {NB_USERS}")
+    print(f"get_users() membership test: {round(full_scan_duration, 2)} ms/login")
+    print(f"user_exists() indexed lookup: {round(indexed_lookup_duration, 2)} ms/login")
+
+    await db.clear_database()
+    await db.disconnect()
+
+if __name__ == "__main__":
+
+    asyncio.run(main())
@@ -1,13 +1,28 @@
+import asyncio
+import logging
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
-from docu_talk.agents import ChatBotService, GoogleCloudStorageManager, Predictor
-from docu_talk.base import ChatBot
-from docu_talk.database.database import Database
+from docu_talk.agents import (
+    BM25Index,
+    ChatBotService,
+    HistoryPolicy,
+    Predictor,
+    get_context_cache_manager,
+    get_storage_manager,
+)
+from docu_talk.base import AccessDecision, ChatBot
+from docu_talk.database.database import get_database
+from docu_talk.exceptions import BatchUploadError
 from utils.auth import hash_password, verify_password
+from utils.cache import TTLCache
+from utils.file_io import get_pdf_pages_text
+from utils.misc import decode_cursor, encode_cursor, get_start_of_week
 
+logger = logging.getLogger(__name__)
 
 class DocuTalk:
     """
@@ -15,27 +30,302 @@ class DocuTalk:
     DocuTalk application.
     """
 
+    cache_maxsize = 1024
+    cache_ttl = 300
+    access_cache_maxsize = 4096
+    access_cache_ttl = 60
+    retrieval_index_maxsize = 64
+    retrieval_index_ttl = 3600
+
     def __init__(self) -> None:
         """
         Initializes the DocuTalk instance with storage, database, and prediction
         services.
         """
 
-        self.storage_manager = GoogleCloudStorageManager(
-            project_id=os.getenv("GCP_PROJECT_ID"),
-            bucket_name=os.getenv("GOOGLE_CLOUD_STORAGE_BUCKET")
-        )
+        # Google Cloud Storage, or a local directory when selected by the
+        # `STORAGE_BACKEND` environment variable
+        self.storage_manager = get_storage_manager()
 
-        self.db = Database(
+        self.db = get_database(
             uri=os.getenv("MONGO_DB_URI"),
-            database_name=os.getenv("MONGO_DB_NAME")
+            database_name=os.getenv("MONGO_DB_NAME"),
+            backend=os.getenv("MONGO_DB_BACKEND")
+        )
+
+        self.predictor = Predictor(db=self.db)
+
+        # Shares one cache of each chatbot's documents across turns and users, when
+        # enabled by the `CONTEXT_CACHE_BACKEND` environment variable
+        self.context_cache = get_context_cache_manager(db=self.db)
+
+        # Chatbot metadata, documents and prompts are read on every message but
+        # rarely change: writes going through this class invalidate the entries
+        self.cache = TTLCache(maxsize=self.cache_maxsize, ttl=self.cache_ttl)
+
+        # Access decisions are small and numerous while BM25 indexes are large and
+        # few: separate caches keep either from evicting the other
+        self.access_cache = TTLCache(
+            maxsize=self.access_cache_maxsize,
+            ttl=self.access_cache_ttl
+        )
+        self.retrieval_indexes = TTLCache(
+            maxsize=self.retrieval_index_maxsize,
+            ttl=self.retrieval_index_ttl
         )
 
-        self.predictor = Predictor()
+        # Keeps the tasks run in the background referenced until they complete
+        self.background_tasks: set[asyncio.Task] = set()
+
+    async def get_models(self) -> list[dict]:
+        """
+        Retrieves the available service models, refreshed from the database once the
+        cache entry expires.
+
+        Returns
+        -------
+        list of dict
+            A list of service models with their pricing.
+        """
+
+        models = self.cache.get("models")
+
+        if models is None:
+            models = await self.db.get_data(table="ServiceModels")
+            self.cache.set("models", models)
+
+        return models
+
+    async def get_chatbot_data(
+            self,
+            chatbot_id: str
+        ) -> dict[str, Any] | None:
+        """
+        Retrieves a chatbot with its documents and suggested prompts, through the
+        cache.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+
+        Returns
+        -------
+        dict or None
+            A dictionary with the `chatbot`, `documents` and `suggested_prompts` keys,
+            or None if the chatbot does not exist. The returned data is shared with the
+            cache and should not be mutated.
+        """
+
+        key = ("chatbot", chatbot_id)
 
-        self.models = self.db.get_data(table="ServiceModels")
+        chatbot_data = self.cache.get(key)
 
-    def get_users(self) -> list[str]:
+        if chatbot_data is None:
+
+            chatbots, documents, suggested_prompts = await asyncio.gather(
+                self.db.get_data(table="Chatbots", filter={"id": chatbot_id}),
+                self.db.get_data(table="Documents", filter={"chatbot_id": chatbot_id}),
+                self.db.get_data(
+                    table="SuggestedPrompts",
+                    filter={"chatbot_id": chatbot_id}
+                )
+            )
+
+            if len(chatbots) == 0:
+                return None
+
+            chatbot_data = {
+                "chatbot": chatbots[0],
+                "documents": documents,
+                "suggested_prompts": suggested_prompts
+            }
+
+            self.cache.set(key, chatbot_data)
+
+        return chatbot_data
+
+    async def get_retrieval_index(
+            self,
+            chatbot_id: str
+        ) -> BM25Index:
+        """
+        Retrieves the BM25 index of a chatbot's document pages, through the cache.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+
+        Returns
+        -------
+        BM25Index
+            The index, shared with the cache.
+        """
+
+        index = self.retrieval_indexes.get(chatbot_id)
+
+        if index is None:
+
+            pages = await self.db.get_data(
+                table="DocumentPages",
+                filter={"chatbot_id": chatbot_id}
+            )
+
+            index = await asyncio.to_thread(self.build_retrieval_index, pages=pages)
+
+            # Documents added or removed by this instance update the index in place
+            self.retrieval_indexes.set(chatbot_id, index)
+
+        return index
+
+    def build_retrieval_index(
+            self,
+            pages: list[dict]
+        ) -> BM25Index:
+        """
+        Builds a BM25 index of document pages.
+
+        Parameters
+        ----------
+        pages : list of dict
+            The `DocumentPages` records to index.
+
+        Returns
+        -------
+        BM25Index
+            The index.
+        """
+
+        document_pages = {}
+        for page in pages:
+            document_pages.setdefault(page["document_id"], []).append(page)
+
+        index = BM25Index()
+        for document_id, pages in document_pages.items():
+            index.add_document(document_id=document_id, pages=pages)
+
+        return index
+
+    async def select_document_ids(
+            self,
+            chatbot_id: str,
+            query: str,
+            top_k: int = 5
+        ) -> list[str] | None:
+        """
+        Selects the documents of a chatbot relevant to a query, so that only those are
+        sent to the model.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        query : str
+            The query, e.g. the user's question.
+        top_k : int, optional
+            The maximum number of ranked documents to select (default is 5).
+
+        Returns
+        -------
+        list of str or None
+            The identifiers of the selected documents, or None if all the documents
+            should be sent: the chatbot has no more than `top_k` documents, or no
+            document matches the query. Documents without extracted text cannot be
+            ranked and are always selected.
+        """
+
+        chatbot_data = await self.get_chatbot_data(chatbot_id)
+
+        document_ids = [document["id"] for document in chatbot_data["documents"]]
+        if len(document_ids) <= top_k:
+            return None
+
+        index = await self.get_retrieval_index(chatbot_id)
+
+        # A cached index may still hold documents removed by another instance
+        selected_ids = [
+            document_id
+            for document_id in index.select_documents(query, top_k=top_k)
+            if document_id in document_ids
+        ]
+
+        if len(selected_ids) == 0:
+            return None
+
+        unindexed_ids = [
+            document_id for document_id in document_ids
+            if document_id not in index.document_ids
+        ]
+
+        return selected_ids + unindexed_ids
+
+    def invalidate_chatbot_cache(
+            self,
+            chatbot_id: str
+        ) -> None:
+        """
+        Removes a chatbot's data from the cache after it was modified.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        """
+
+        self.cache.invalidate(("chatbot", chatbot_id))
+
+    async def invalidate_context_cache(
+            self,
+            chatbot_id: str
+        ) -> None:
+        """
+        Deletes the context caches of a chatbot's documents after its document set
+        changed.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        """
+
+        if self.context_cache is not None:
+            await self.context_cache.invalidate(chatbot_id)
+
+    def get_cache_stats(self) -> dict[str, dict[str, int | float]]:
+        """
+        Retrieves the hit and miss counters of the caches.
+
+        Returns
+        -------
+        dict
+            The number of entries, hits and misses, and the hit rate, by cache.
+        """
+
+        return {
+            "chatbots": self.cache.get_stats(),
+            "access": self.access_cache.get_stats(),
+            "retrieval_indexes": self.retrieval_indexes.get_stats()
+        }
+
+    async def log_cache_stats_forever(
+            self,
+            interval: float = 600
+        ) -> None:
+        """
+        Logs the counters of the caches periodically, until cancelled.
+
+        Parameters
+        ----------
+        interval : float, optional
+            The time between two logs, in seconds (default is 600).
+        """
+
+        while True:
+            await asyncio.sleep(interval)
+            logger.info(f"Cache stats: {self.get_cache_stats()}")
+
+    async def get_users(self) -> list[str]:
         """
         Retrieves all registered users.
 
@@ -45,7 +335,7 @@ class DocuTalk:
             A list of user emails.
         """
 
-        data = self.db.get_data(
+        data = await self.db.get_data(
             table="Users",
             filter={}
         )
@@ -54,7 +344,7 @@ class DocuTalk:
 
         return users
 
-    def get_chatbot_users(
+    async def get_chatbot_users(
             self,
             chatbot_id: str
         ) -> list[str]:
@@ -72,7 +362,7 @@ class DocuTalk:
             A list of user IDs.
         """
 
-        access = self.db.get_data(
+        access = await self.db.get_data(
             table="Access",
             filter={"chatbot_id": chatbot_id}
         )
@@ -81,7 +371,30 @@ class DocuTalk:
 
         return chatbot_users
 
-    def create_user(
+    async def user_exists(
+            self,
+            email: str
+        ) -> bool:
+        """
+        Checks whether a user is registered, using the unique index on emails.
+
+        Parameters
+        ----------
+        email : str
+            The user's email address.
+
+        Returns
+        -------
+        bool
+            True if the user exists, False otherwise.
+        """
+
+        return await self.db.exists_data(
+            table="Users",
+            filter={"email": email}
+        )
+
+    async def get_user_data(
             self,
             first_name: str,
             last_name: str,
@@ -89,9 +402,9 @@ class DocuTalk:
             period_dollar_amount: float,
             password: str,
             is_guest: bool = False
-        ) -> str:
+        ) -> dict[str, Any]:
         """
-        Creates a new user and returns their generated password.
+        Builds the record of a new user.
 
         Parameters
         ----------
@@ -103,38 +416,139 @@ class DocuTalk:
             The user's email address.
         period_dollar_amount : float
             The subscription or period dollar amount for the user.
+        password : str
+            The user's password.
         is_guest : bool, optional
             Whether the user is a guest (default is False).
 
         Returns
         -------
-        str
-            The generated password for the user.
+        dict
+            The user record, with the hashed password.
         """
 
-        password_hash = hash_password(password)
+        password_hash = await asyncio.to_thread(hash_password, password)
 
         friendly_name = first_name
         if len(last_name) > 0:
             friendly_name += " " + last_name[0].upper() + "."
 
-        self.db.insert_data(
+        data = {
+            "email": email,
+            "first_name": first_name,
+            "last_name": last_name,
+            "friendly_name": friendly_name,
+            "password_hash": password_hash,
+            "period_dollar_amount": period_dollar_amount,
+            "terms_of_use_displayed": False,
+            "is_guest": is_guest
+        }
+
+        return data
+
+    async def create_user(
+            self,
+            first_name: str,
+            last_name: str,
+            email: str,
+            period_dollar_amount: float,
+            password: str,
+            is_guest: bool = False
+        ) -> str:
+        """
+        Creates a new user and returns their generated password.
+
+        Parameters
+        ----------
+        first_name : str
+            The user's first name.
+        last_name : str
+            The user's last name.
+        email : str
+            The user's email address.
+        period_dollar_amount : float
+            The subscription or period dollar amount for the user.
+        is_guest : bool, optional
+            Whether the user is a guest (default is False).
+
+        Returns
+        -------
+        str
+            The generated password for the user.
+        """
+
+        data = await self.get_user_data(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            period_dollar_amount=period_dollar_amount,
+            password=password,
+            is_guest=is_guest
+        )
+
+        await self.db.insert_data(
             table="Users",
-            data={
-                "email": email,
-                "first_name": first_name,
-                "last_name": last_name,
-                "friendly_name": friendly_name,
-                "password_hash": password_hash,
-                "period_dollar_amount": period_dollar_amount,
-                "terms_of_use_displayed": False,
-                "is_guest": is_guest
-            }
+            data=data
         )
 
         return password
 
-    def check_login(
+    async def get_or_create_user(
+            self,
+            first_name: str,
+            last_name: str,
+            email: str,
+            period_dollar_amount: float,
+            password: str,
+            is_guest: bool = False
+        ) -> bool:
+        """
+        Creates a user unless they are already registered. The creation is an atomic
+        upsert, so concurrent logins of a new user create a single record.
+
+        Parameters
+        ----------
+        first_name : str
+            The user's first name.
+        last_name : str
+            The user's last name.
+        email : str
+            The user's email address.
+        period_dollar_amount : float
+            The subscription or period dollar amount for the user.
+        password : str
+            The password to set if the user is created.
+        is_guest : bool, optional
+            Whether the user is a guest (default is False).
+
+        Returns
+        -------
+        bool
+            True if the user was created, False if they already existed.
+        """
+
+        # Cheap indexed lookup first, so that returning users skip password hashing
+        if await self.user_exists(email):
+            return False
+
+        data = await self.get_user_data(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            period_dollar_amount=period_dollar_amount,
+            password=password,
+            is_guest=is_guest
+        )
+
+        created = await self.db.insert_data_if_absent(
+            table="Users",
+            filter={"email": email},
+            data=data
+        )
+
+        return created
+
+    async def check_login(
             self,
             email: str,
             password: str
@@ -155,24 +569,26 @@ class DocuTalk:
             True if credentials are valid, False otherwise.
         """
 
-        data = self.db.get_data(
+        data = await self.db.get_data(
             table="Users",
             filter={"email": email}
         )
 
         if len(data) == 0:
             return False
-        elif not verify_password(password, data[0]["password_hash"]):
+        elif not await asyncio.to_thread(
+            verify_password, password, data[0]["password_hash"]
+        ):
             return False
         else:
             return True
 
-    def get_user_accesses(
+    async def get_user_accesses(
             self,
             user_id: str
         ) -> dict[str, str]:
 
-        accesses_data = self.db.get_data(
+        accesses_data = await self.db.get_data(
             table="Access",
             filter={"user_id": user_id}
         )
@@ -181,7 +597,84 @@ class DocuTalk:
 
         return accesses
 
-    def get_user_chatbots(
+    async def get_access_decision(
+            self,
+            chatbot_id: str,
+            user_id: str,
+            use_cache: bool = True
+        ) -> AccessDecision | None:
+        """
+        Retrieves the role of a user on a chatbot and whether the chatbot is public.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        user_id : str
+            The user's unique identifier.
+        use_cache : bool, optional
+            Whether a cached decision can be returned (default is True). The decision
+            is stored in the cache in any case.
+
+        Returns
+        -------
+        AccessDecision or None
+            The access decision, or None if the chatbot does not exist.
+        """
+
+        key = (chatbot_id, user_id)
+
+        if use_cache:
+            decision = self.access_cache.get(key)
+            if decision is not None:
+                return decision
+
+        accesses = await self.db.get_data(
+            table="Access",
+            filter={"chatbot_id": chatbot_id, "user_id": user_id},
+            limit=1
+        )
+
+        chatbot_data = await self.get_chatbot_data(chatbot_id)
+
+        if chatbot_data is None:
+            return None
+
+        decision = AccessDecision(
+            chatbot_id=chatbot_id,
+            user_id=user_id,
+            role=accesses[0]["role"] if len(accesses) > 0 else None,
+            is_public=chatbot_data["chatbot"]["access"] == "public"
+        )
+
+        self.access_cache.set(key, decision)
+
+        return decision
+
+    def invalidate_access_cache(
+            self,
+            chatbot_id: str | None = None,
+            user_id: str | None = None
+        ) -> None:
+        """
+        Removes access decisions from the cache after accesses were modified.
+
+        Parameters
+        ----------
+        chatbot_id : str or None, optional
+            The chatbot whose decisions are removed (default is None, all chatbots).
+        user_id : str or None, optional
+            The user whose decisions are removed (default is None, all users).
+        """
+
+        self.access_cache.invalidate_where(
+            lambda key: (
+                (chatbot_id is None or key[0] == chatbot_id)
+                and (user_id is None or key[1] == user_id)
+            )
+        )
+
+    async def get_user_chatbots(
             self,
             user_id: str
         ) -> list[dict]:
@@ -195,16 +688,16 @@ class DocuTalk:
 
         Returns
         -------
-        dict
-            A dictionary of chatbot data keyed by chatbot IDs.
+        list of dict
+            A list of chatbots with their suggested prompts, documents and accesses.
         """
 
-        accesses = self.db.get_data(
+        accesses = await self.db.get_data(
             table="Access",
             filter={"user_id": user_id}
         )
 
-        chatbots = self.db.get_data(
+        chatbots = await self.db.get_data(
             table="Chatbots",
             filter={
                 "$or": [
@@ -214,7 +707,18 @@ class DocuTalk:
             }
         )
 
-        user_chatbots = []
+        # Related data of all the chatbots is fetched at once and joined in memory,
+        # so that the number of queries does not depend on the number of chatbots
+        chatbot_ids = [chatbot["id"] for chatbot in chatbots]
+        chatbot_filter = {"chatbot_id": {"$in": chatbot_ids}}
+
+        suggested_prompts, documents, chatbot_accesses = await asyncio.gather(
+            self.db.get_data(table="SuggestedPrompts", filter=chatbot_filter),
+            self.db.get_data(table="Documents", filter=chatbot_filter),
+            self.db.get_data(table="Access", filter=chatbot_filter)
+        )
+
+        user_chatbots = {}
         for chatbot in chatbots:
 
             if chatbot["access"] != "public":
@@ -224,51 +728,43 @@ class DocuTalk:
             else:
                 chatbot["user_role"] = "User"
 
-            suggested_prompts = self.db.get_data(
-                table="SuggestedPrompts",
-                filter={"chatbot_id": chatbot["id"]}
-            )
+            chatbot["suggested_prompts"] = []
+            chatbot["documents"] = []
+            chatbot["accesses"] = []
 
-            chatbot["suggested_prompts"] = [p["prompt"] for p in suggested_prompts]
+            user_chatbots[chatbot["id"]] = chatbot
 
-            documents = self.db.get_data(
-                table="Documents",
-                filter={"chatbot_id": chatbot["id"]}
+        for suggested_prompt in suggested_prompts:
+            user_chatbots[suggested_prompt["chatbot_id"]]["suggested_prompts"].append(
+                suggested_prompt["prompt"]
             )
 
-            chatbot["documents"] = []
-            for document in documents:
-                chatbot["documents"].append(
-                    {
-                        "id": document["id"],
-                        "created_by": document["created_by"],
-                        "filename": document["filename"],
-                        "public_path": document["public_path"],
-                        "uri": document["uri"],
-                        "nb_pages": document["nb_pages"]
-                    }
-                )
-
-            chatbot_accesses = self.db.get_data(
-                table="Access",
-                filter={"chatbot_id": chatbot["id"]}
+        for document in documents:
+            user_chatbots[document["chatbot_id"]]["documents"].append(
+                {
+                    "id": document["id"],
+                    "created_by": document["created_by"],
+                    "filename": document["filename"],
+                    "public_path": document["public_path"],
+                    "uri": document["uri"],
+                    "nb_pages": document["nb_pages"]
+                }
             )
 
-            chatbot["accesses"] = []
-            for chatbot_access in chatbot_accesses:
-                chatbot["accesses"].append(
-                    {
-                        "id": chatbot_access["id"],
-                        "user_id": chatbot_access["user_id"],
-                        "role": chatbot_access["role"]
-                    }
-                )
+        for chatbot_access in chatbot_accesses:
+            user_chatbots[chatbot_access["chatbot_id"]]["accesses"].append(
+                {
+                    "id": chatbot_access["id"],
+                    "user_id": chatbot_access["user_id"],
+                    "role": chatbot_access["role"]
+                }
+            )
 
-            user_chatbots.append(chatbot)
+        user_chatbots = list(user_chatbots.values())
 
         return user_chatbots
 
-    def get_user(
+    async def get_user(
             self,
             email: str
         ) -> dict[str, Any]:
@@ -286,172 +782,552 @@ class DocuTalk:
             A dictionary containing user details and their chatbots.
         """
 
-        data = self.db.get_data(
+        data = await self.db.get_data(
             table="Users",
             filter={"email": email}
         )
 
-        user = data[0]
-        user.pop("_id")
-        user["chatbots"] = self.get_user_chatbots(email)
+        user = data[0]
+        user.pop("_id")
+        user["chatbots"] = await self.get_user_chatbots(email)
+
+        return user
+
+    async def delete_user(
+            self,
+            user_id: str
+        ) -> None:
+        """
+        Deletes a user and their associated data.
+
+        Parameters
+        ----------
+        user_id : str
+            The unique identifier of the user to be deleted.
+        """
+
+        await self.db.delete_data(
+            table="Users",
+            filter={"email": user_id}
+        )
+
+        await self.db.delete_data(
+            table="Access",
+            filter={"user_id": user_id}
+        )
+
+        self.invalidate_access_cache(user_id=user_id)
+
+    async def add_documents(
+            self,
+            chatbot_id: str,
+            created_by: str,
+            documents: list
+        )-> None:
+        """
+        Adds documents to a chatbot, all or none of them being added.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        created_by : str
+            The user who created the documents.
+        documents : list
+            A list of document data, with their `filename`, local `path`, `sha256`
+            digest and `nb_pages`.
+
+        Raises
+        ------
+        BatchUploadError
+            If a document could not be uploaded.
+        """
+
+        documents = await self.prepare_documents(documents)
+
+        await self.db.insert_many_data(
+            table="Documents",
+            data=[
+                {
+                    "id": document["id"],
+                    "chatbot_id": chatbot_id,
+                    "created_by": created_by,
+                    "filename": document["filename"],
+                    "public_path": document["public_path"],
+                    "uri": document["uri"],
+                    "nb_pages": document["nb_pages"],
+                    "nb_chars": document["nb_chars"],
+                    "nb_empty_pages": document["nb_empty_pages"],
+                    "extraction_duration": document["extraction_duration"],
+                    "sha256": document["sha256"]
+                }
+                for document in documents
+            ]
+        )
+
+        index = self.retrieval_indexes.get(chatbot_id)
+
+        for document in documents:
+
+            await self.store_document_pages(
+                chatbot_id=chatbot_id,
+                document_id=document["id"],
+                pages=document["pages"]
+            )
+
+            if index is not None:
+                index.add_document(
+                    document_id=document["id"],
+                    pages=[
+                        {"page": page, "text": text}
+                        for page, text in enumerate(document["pages"], start=1)
+                    ]
+                )
+
+        self.invalidate_chatbot_cache(chatbot_id)
+        await self.invalidate_context_cache(chatbot_id)
+
+    async def remove_document(
+            self,
+            chatbot_id: str,
+            filename: str
+        ) -> None:
+        """
+        Removes a document from a chatbot.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        filename : str
+            The name of the document file to be removed.
+        """
+
+        documents = await self.db.get_data(
+            table="Documents",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+        document = next(d for d in documents if d["filename"] == filename)
+
+        if document.get("sha256") is not None:
+            await self.release_blobs([document["sha256"]])
+        else:
+            await asyncio.to_thread(
+                self.storage_manager.delete,
+                uri=document["uri"]
+            )
+
+        await self.db.delete_data(
+            table="DocumentPages",
+            filter={"document_id": document["id"]}
+        )
+
+        index = self.retrieval_indexes.get(chatbot_id)
+        if index is not None:
+            index.remove_document(document["id"])
+
+        await self.db.delete_data(
+            table="Documents",
+            filter={"chatbot_id": chatbot_id, "filename": filename}
+        )
+
+        self.invalidate_chatbot_cache(chatbot_id)
+        await self.invalidate_context_cache(chatbot_id)
+
+    async def get_filenames(
+            self,
+            chatbot_id: str
+        ) -> list[str]:
+        """
+        Retrieves filenames of documents associated with a chatbot.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+
+        Returns
+        -------
+        list of str
+            A list of filenames.
+        """
+
+        documents = await self.db.get_data(
+            table="Documents",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+        filenames = [document["filename"] for document in documents]
+
+        return filenames
+
+    def extract_document_pages(
+            self,
+            pdf: bytes | str
+        ) -> tuple[list[str], dict[str, int | float]]:
+        """
+        Extracts the text of each page of a document.
+
+        Parameters
+        ----------
+        pdf : bytes or str
+            The binary content of the PDF document, or its local path.
+
+        Returns
+        -------
+        tuple of (list of str, dict)
+            The text of each page, and the extraction stats: the number of extracted
+            characters, the number of pages without text and the extraction duration
+            in seconds.
+        """
+
+        start_time = time.perf_counter()
+
+        pages = get_pdf_pages_text(pdf)
+
+        stats = {
+            "nb_chars": sum(len(page) for page in pages),
+            "nb_empty_pages": sum(1 for page in pages if len(page) == 0),
+            "extraction_duration": round(time.perf_counter() - start_time, 3)
+        }
+
+        return pages, stats
+
+    async def store_document_pages(
+            self,
+            chatbot_id: str,
+            document_id: str,
+            pages: list[str]
+        ) -> None:
+        """
+        Stores the extracted text of a document, one record per page with text.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        document_id : str
+            The document's unique identifier.
+        pages : list of str
+            The text of each page, in page order.
+        """
+
+        await self.db.insert_many_data(
+            table="DocumentPages",
+            data=[
+                {
+                    "chatbot_id": chatbot_id,
+                    "document_id": document_id,
+                    "page": page,
+                    "text": text
+                }
+                for page, text in enumerate(pages, start=1)
+                if len(text) > 0
+            ]
+        )
+
+    async def get_document_totals(
+            self,
+            chatbot_ids: list[str]
+        ) -> dict[str, dict[str, int]]:
+        """
+        Counts the documents and pages of several chatbots in a single query.
+
+        Parameters
+        ----------
+        chatbot_ids : list of str
+            The chatbots' unique identifiers.
+
+        Returns
+        -------
+        dict
+            The `nb_documents` and `total_pages` of each chatbot, by chatbot
+            identifier. Chatbots without documents have zero totals.
+        """
+
+        groups = await self.db.aggregate_data(
+            table="Documents",
+            pipeline=[
+                {"$match": {"chatbot_id": {"$in": chatbot_ids}}},
+                {
+                    "$group": {
+                        "_id": "$chatbot_id",
+                        "nb_documents": {"$sum": 1},
+                        "total_pages": {"$sum": "$nb_pages"}
+                    }
+                }
+            ]
+        )
+
+        totals = {
+            chatbot_id: {"nb_documents": 0, "total_pages": 0}
+            for chatbot_id in chatbot_ids
+        }
+        for group in groups:
+            totals[group["_id"]] = {
+                "nb_documents": group["nb_documents"],
+                "total_pages": group["total_pages"]
+            }
+
+        return totals
+
+    async def get_document_pages(
+            self,
+            chatbot_id: str,
+            document_ids: list[str] | None = None
+        ) -> list[dict]:
+        """
+        Retrieves the extracted text of a chatbot's document pages.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        document_ids : list of str or None, optional
+            The documents to retrieve the pages of (default is None, all documents).
+
+        Returns
+        -------
+        list of dict
+            The `DocumentPages` records.
+        """
+
+        filter = {"chatbot_id": chatbot_id}
+        if document_ids is not None:
+            filter["document_id"] = {"$in": document_ids}
+
+        pages = await self.db.get_data(table="DocumentPages", filter=filter)
+
+        return pages
+
+    async def acquire_blobs(
+            self,
+            documents: list
+        ) -> list:
+        """
+        Stores documents by content, each distinct content being uploaded once and
+        shared by all the documents holding it. Each document takes a reference on
+        the blob of its content, to be released with `release_blobs`.
+
+        Parameters
+        ----------
+        documents : list
+            A list of document data, with their local `path` and `sha256` digest.
+
+        Returns
+        -------
+        list
+            The documents, completed with the `uri` and `public_path` of their blob.
+
+        Raises
+        ------
+        BatchUploadError
+            If a blob could not be uploaded, the references taken being released. Its
+            `failures` map the index of each document whose blob failed to its error.
+        """
+
+        for document in documents:
+            await self.db.increment_data(
+                table="Blobs",
+                filter={"sha256": document["sha256"]},
+                increments={"nb_references": 1}
+            )
+
+        blobs = await self.db.get_data(
+            table="Blobs",
+            filter={"sha256": {"$in": [d["sha256"] for d in documents]}}
+        )
+        blobs = {blob["sha256"]: blob for blob in blobs}
+
+        # Blobs without URI are new, or still being uploaded by another request, in
+        # which case both uploads write the same content to the same path. The path
+        # is unique to the record, so that a blob deleted and stored again is never
+        # deleted by the release of the previous record.
+        uploads = {}
+        for document in documents:
+            if blobs[document["sha256"]].get("uri") is None:
+                uploads.setdefault(document["sha256"], document)
+
+        try:
+            paths = await asyncio.to_thread(
+                self.storage_manager.save_many_from_filenames,
+                files=[
+                    (
+                        document["path"],
+                        f"docu-talk/blobs/{sha256}-{blobs[sha256]['id']}.pdf"
+                    )
+                    for sha256, document in uploads.items()
+                ]
+            )
+        except BatchUploadError as e:
+            await self.release_blobs([d["sha256"] for d in documents])
+            hashes = list(uploads)
+            failed = {hashes[index]: error for index, error in e.failures.items()}
+            failures = {
+                index: failed[document["sha256"]]
+                for index, document in enumerate(documents)
+                if document["sha256"] in failed
+            }
+            raise BatchUploadError(failures=failures, message=e.message) from e
+
+        uploaded = zip(uploads.items(), paths, strict=True)
+        for (sha256, document), (uri, public_path) in uploaded:
+
+            blobs[sha256].update({"uri": uri, "public_path": public_path})
+
+            await self.db.update_data(
+                table="Blobs",
+                filter={"sha256": sha256},
+                updates={
+                    "uri": uri,
+                    "public_path": public_path,
+                    "size": document["size"]
+                }
+            )
+
+        for document in documents:
+            blob = blobs[document["sha256"]]
+            document["uri"], document["public_path"] = blob["uri"], blob["public_path"]
 
-        return user
+        return documents
 
-    def delete_user(
+    async def release_blobs(
             self,
-            user_id: str
+            hashes: list[str]
         ) -> None:
         """
-        Deletes a user and their associated data.
+        Releases one reference on the blob of each given content, deleting the blobs
+        no longer referenced.
 
         Parameters
         ----------
-        user_id : str
-            The unique identifier of the user to be deleted.
+        hashes : list of str
+            The SHA-256 digest of each released document's content.
         """
 
-        self.db.delete_data(
-            table="Users",
-            filter={"email": user_id}
-        )
-
-        self.db.delete_data(
-            table="Access",
-            filter={"user_id": user_id}
-        )
-
-    def add_document(
-            self,
-            chatbot_id: str,
-            created_by: str,
-            filename: str,
-            pdf_bytes: bytes,
-            nb_pages: int
-        )-> None:
-        """
-        Adds a document to a chatbot.
+        for sha256 in hashes:
 
-        Parameters
-        ----------
-        chatbot_id : str
-            The chatbot's unique identifier.
-        created_by : str
-            The user who created the document.
-        filename : str
-            The name of the document file.
-        pdf_bytes : bytes
-            The binary content of the PDF document.
-        nb_pages : int
-            The number of pages in the document.
-        """
+            await self.db.increment_data(
+                table="Blobs",
+                filter={"sha256": sha256},
+                increments={"nb_references": -1}
+            )
 
-        uri, public_path = self.storage_manager.save_from_file(
-            file=pdf_bytes,
-            gcs_path=f"docu-talk/chatbots/{chatbot_id}/{str(uuid4())}.pdf"
-        )
+            # A blob referenced again in the meantime is not deleted, and a blob
+            # stored again afterwards is stored under another path
+            blob = await self.db.find_and_delete_data(
+                table="Blobs",
+                filter={"sha256": sha256, "nb_references": {"$lte": 0}}
+            )
 
-        self.db.insert_data(
-            table="Documents",
-            data={
-                "chatbot_id": chatbot_id,
-                "created_by": created_by,
-                "filename": filename,
-                "public_path": public_path,
-                "uri": uri,
-                "nb_pages": nb_pages
-            }
-        )
+            if blob is not None and blob.get("uri") is not None:
+                await asyncio.to_thread(self.storage_manager.delete, uri=blob["uri"])
 
-    def remove_document(
+    async def get_documents_size(
             self,
-            chatbot_id: str,
-            filename: str
-        ) -> None:
+            documents: list[dict]
+        ) -> int:
         """
-        Removes a document from a chatbot.
+        Computes the total size of stored documents from the blobs holding their
+        content.
 
         Parameters
         ----------
-        chatbot_id : str
-            The chatbot's unique identifier.
-        filename : str
-            The name of the document file to be removed.
+        documents : list of dict
+            The documents, with their `sha256` digest.
+
+        Returns
+        -------
+        int
+            The total size of the documents, in bytes. Documents stored before their
+            content was hashed are not counted, their size being unknown.
         """
 
-        documents = self.db.get_data(
-            table="Documents",
-            filter={"chatbot_id": chatbot_id}
-        )
+        hashes = [d["sha256"] for d in documents if d.get("sha256") is not None]
 
-        uri = next(d["uri"] for d in documents if d["filename"] == filename)
+        if len(hashes) == 0:
+            return 0
 
-        self.storage_manager.delete_from_gcs(
-            uri=uri
+        blobs = await self.db.get_data(
+            table="Blobs",
+            filter={"sha256": {"$in": list(set(hashes))}}
         )
+        sizes = {blob["sha256"]: blob.get("size", 0) for blob in blobs}
 
-        self.db.delete_data(
-            table="Documents",
-            filter={"chatbot_id": chatbot_id, "filename": filename}
-        )
+        # Documents sharing their content each count towards the chatbot size
+        return sum(sizes.get(sha256, 0) for sha256 in hashes)
 
-    def get_filenames(
+    async def prepare_documents(
             self,
-            chatbot_id: str
-        ) -> list[str]:
+            documents: list
+        ) -> list:
         """
-        Retrieves filenames of documents associated with a chatbot.
+        Stores documents by content and extracts their text.
 
         Parameters
         ----------
-        chatbot_id : str
-            The chatbot's unique identifier.
+        documents : list
+            A list of document data, with their `filename`, local `path`, `sha256`
+            digest and `nb_pages`.
 
         Returns
         -------
-        list of str
-            A list of filenames.
+        list
+            The documents, completed with their `id`, `uri`, `public_path`, extracted
+            `pages` and extraction stats.
+
+        Raises
+        ------
+        BatchUploadError
+            If a document could not be uploaded, none of them being kept.
         """
 
-        documents = self.db.get_data(
-            table="Documents",
-            filter={"chatbot_id": chatbot_id}
+        acquisition, extractions = await asyncio.gather(
+            self.acquire_blobs(documents),
+            asyncio.gather(
+                *[
+                    asyncio.to_thread(self.extract_document_pages, pdf=document["path"])
+                    for document in documents
+                ]
+            ),
+            return_exceptions=True
         )
 
-        filenames = [document["filename"] for document in documents]
+        if isinstance(acquisition, BaseException):
+            raise acquisition
 
-        return filenames
+        if isinstance(extractions, BaseException):
+            await self.release_blobs([d["sha256"] for d in documents])
+            raise extractions
 
-    def get_chatbot_service(
+        for document, (pages, stats) in zip(documents, extractions, strict=True):
+            document["id"] = str(uuid4())
+            document["pages"] = pages
+            document.update(stats)
+
+        return documents
+
+    async def get_chatbot_service(
             self,
-            chatbot_id: str,
             documents: list,
         ) -> ChatBotService:
         """
-        Retrieves a chatbot service for a specific chatbot and its documents.
+        Retrieves a chatbot service for a set of documents, after storing the
+        documents and extracting their text.
 
         Parameters
         ----------
-        chatbot_id : str
-            The chatbot's unique identifier.
         documents : list
             A list of document data.
 
         Returns
         -------
         ChatBotService
-            An instance of ChatBotService configured for the chatbot.
+            An instance of ChatBotService configured for the documents.
         """
 
-        for document in documents:
-
-            document["id"] = str(uuid4())
-
-            uri, public_path = self.storage_manager.save_from_file(
-                file=document["bytes"],
-                gcs_path=f"docu-talk/chatbots/{chatbot_id}/{document['id']}.pdf"
-            )
-
-            document["uri"], document["public_path"] = uri, public_path
+        documents = await self.prepare_documents(documents)
 
         chatbot_service = ChatBotService(
             documents=documents,
@@ -460,7 +1336,7 @@ class DocuTalk:
 
         return chatbot_service
 
-    def create_chatbot(
+    async def create_chatbot(
             self,
             chatbot_id: str,
             created_by: str,
@@ -494,7 +1370,7 @@ class DocuTalk:
             A list of suggested prompts for the chatbot.
         """
 
-        chatbot_id = self.db.insert_data(
+        chatbot_id = await self.db.insert_data(
             table="Chatbots",
             data={
                 "id": chatbot_id,
@@ -508,7 +1384,7 @@ class DocuTalk:
 
         for prompt in suggested_prompts:
 
-            self.db.insert_data(
+            await self.db.insert_data(
                 table="SuggestedPrompts",
                 data={
                     "chatbot_id": chatbot_id,
@@ -518,30 +1394,46 @@ class DocuTalk:
 
         for document in documents:
 
-            self.db.insert_data(
+            await self.db.insert_data(
                 table="Documents",
                 data={
+                    "id": document["id"],
                     "chatbot_id": chatbot_id,
                     "created_by": created_by,
                     "filename": document["filename"],
                     "public_path": document["public_path"],
                     "uri": document["uri"],
-                    "nb_pages": document["nb_pages"]
+                    "nb_pages": document["nb_pages"],
+                    "nb_chars": document["nb_chars"],
+                    "nb_empty_pages": document["nb_empty_pages"],
+                    "extraction_duration": document["extraction_duration"],
+                    "sha256": document.get("sha256")
                 }
             )
 
-        self.share_chatbot(
+            # Pages are already stored for the documents prepared by a job
+            if "pages" in document:
+                await self.store_document_pages(
+                    chatbot_id=chatbot_id,
+                    document_id=document["id"],
+                    pages=document["pages"]
+                )
+
+        await self.share_chatbot(
             chatbot_id=chatbot_id,
             user_id=created_by,
             role="Admin"
         )
 
-    def update_chatbot(
+        self.invalidate_chatbot_cache(chatbot_id)
+
+    async def update_chatbot(
             self,
             chatbot_id: str,
             title: str | None = None,
             description: str | None = None,
-            icon: bytes | None = None
+            icon: bytes | None = None,
+            access: str | None = None
         ) -> None:
         """
         Updates a chatbot's details.
@@ -556,6 +1448,8 @@ class DocuTalk:
             The new description for the chatbot.
         icon : bytes, optional
             The new icon for the chatbot.
+        access : str, optional
+            The new access level of the chatbot.
         """
 
         updates = {}
@@ -565,16 +1459,54 @@ class DocuTalk:
             updates["description"] = description
         if icon is not None:
             updates["icon"] = icon
+        if access is not None:
+            updates["access"] = access
 
-        self.db.update_data(
+        await self.db.update_data(
             table="Chatbots",
             filter={"id": chatbot_id},
             updates=updates
         )
 
-    def delete_chatbot(
+        self.invalidate_chatbot_cache(chatbot_id)
+
+        if access is not None:
+            self.invalidate_access_cache(chatbot_id=chatbot_id)
+
+    async def delete_chatbot_files(
             self,
-            chatbot_id: str
+            chatbot_id: str,
+            hashes: list[str]
+        ) -> None:
+        """
+        Deletes the files of a deleted chatbot from the storage.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        hashes : list of str
+            The SHA-256 digest of each of the chatbot's documents.
+        """
+
+        try:
+            await self.release_blobs(hashes)
+
+            # Holds the documents uploaded before content addressing
+            failures = await asyncio.to_thread(
+                self.storage_manager.delete_directory,
+                directory_path=f"docu-talk/chatbots/{chatbot_id}"
+            )
+            for name, error in failures.items():
+                logger.warning(f"Failed to delete {name}: {error}")
+
+        except Exception:
+            logger.exception(f"Failed to delete the files of chatbot {chatbot_id}")
+
+    async def delete_chatbot(
+            self,
+            chatbot_id: str,
+            wait_for_files: bool = True
         ) -> None:
         """
         Deletes a chatbot and its associated data.
@@ -583,40 +1515,67 @@ class DocuTalk:
         ----------
         chatbot_id : str
             The unique identifier for the chatbot to be deleted.
+        wait_for_files : bool, optional
+            Whether to wait for the chatbot's files to be deleted from the storage,
+            rather than deleting them in the background (default is True).
         """
 
-        self.db.delete_data(
+        await self.db.delete_data(
             table="Chatbots",
             filter={"id": chatbot_id}
         )
 
-        self.db.delete_data(
+        await self.db.delete_data(
             table="Access",
             filter={"chatbot_id": chatbot_id}
         )
 
-        self.db.delete_data(
+        await self.db.delete_data(
             table="SuggestedPrompts",
             filter={"chatbot_id": chatbot_id}
         )
 
-        self.storage_manager.delete_directory_from_gcs(
-            directory_path=f"docu-talk/chatbots/{chatbot_id}"
+        documents = await self.db.get_data(
+            table="Documents",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+        delete_files = self.delete_chatbot_files(
+            chatbot_id=chatbot_id,
+            hashes=[d["sha256"] for d in documents if d.get("sha256") is not None]
         )
 
-        self.db.delete_data(
+        if wait_for_files:
+            await delete_files
+        else:
+            task = asyncio.create_task(delete_files)
+            self.background_tasks.add(task)
+            task.add_done_callback(self.background_tasks.discard)
+
+        await self.db.delete_data(
             table="Documents",
             filter={"chatbot_id": chatbot_id}
         )
 
-    def share_chatbot(
+        await self.db.delete_data(
+            table="DocumentPages",
+            filter={"chatbot_id": chatbot_id}
+        )
+
+        self.retrieval_indexes.invalidate(chatbot_id)
+        self.invalidate_chatbot_cache(chatbot_id)
+        self.invalidate_access_cache(chatbot_id=chatbot_id)
+        await self.invalidate_context_cache(chatbot_id)
+
+    async def share_chatbot(
             self,
             chatbot_id: str,
             user_id: str,
             role: str
         ) -> None:
         """
-        Shares a chatbot with a user by assigning a role.
+        Shares a chatbot with a user by assigning a role. If the user already has
+        access to the chatbot, their role is updated.
 
         Parameters
         ----------
@@ -628,7 +1587,25 @@ class DocuTalk:
             The role to assign to the user (e.g., 'Admin', 'User').
         """
 
-        self.db.insert_data(
+        # (chatbot_id, user_id) is unique in the Access table
+        existing_accesses = await self.db.get_data(
+            table="Access",
+            filter={"chatbot_id": chatbot_id, "user_id": user_id}
+        )
+
+        if len(existing_accesses) > 0:
+
+            await self.db.update_data(
+                table="Access",
+                filter={"chatbot_id": chatbot_id, "user_id": user_id},
+                updates={"role": role}
+            )
+
+            self.invalidate_access_cache(chatbot_id=chatbot_id, user_id=user_id)
+
+            return
+
+        await self.db.insert_data(
             table="Access",
             data={
                 "chatbot_id": chatbot_id,
@@ -637,7 +1614,9 @@ class DocuTalk:
             }
         )
 
-    def remove_access_chatbot(
+        self.invalidate_access_cache(chatbot_id=chatbot_id, user_id=user_id)
+
+    async def remove_access_chatbot(
             self,
             chatbot_id: str,
             user_id: str
@@ -653,7 +1632,7 @@ class DocuTalk:
             The user's unique identifier.
         """
 
-        self.db.delete_data(
+        await self.db.delete_data(
             table="Access",
             filter={
                 "chatbot_id": chatbot_id,
@@ -661,9 +1640,12 @@ class DocuTalk:
             }
         )
 
-    def start_chat(
+        self.invalidate_access_cache(chatbot_id=chatbot_id, user_id=user_id)
+
+    async def start_chat(
             self,
-            chatbot_id: str
+            chatbot_id: str,
+            history_policy: HistoryPolicy | None = None
         ) -> ChatBot:
         """
         Starts a chat session with a chatbot.
@@ -672,6 +1654,9 @@ class DocuTalk:
         ----------
         chatbot_id : str
             The chatbot's unique identifier.
+        history_policy : HistoryPolicy or None, optional
+            The policy bounding the conversation history sent with each request
+            (default is None, the default policy).
 
         Returns
         -------
@@ -679,26 +1664,20 @@ class DocuTalk:
             An instance of ChatBot configured for the chat session.
         """
 
-        data = self.db.get_data(
-            table="Chatbots",
-            filter={"id": chatbot_id}
-        )
-
-        desc = data[0]
+        chatbot_data = await self.get_chatbot_data(chatbot_id)
 
-        documents = self.db.get_data(
-            table="Documents",
-            filter={"chatbot_id": chatbot_id}
-        )
+        desc = chatbot_data["chatbot"]
 
-        suggested_prompts = self.db.get_data(
-            table="SuggestedPrompts",
-            filter={"chatbot_id": chatbot_id}
-        )
+        # Copies, so that the chat session cannot alter the cached data
+        documents = [dict(d) for d in chatbot_data["documents"]]
+        suggested_prompts = list(chatbot_data["suggested_prompts"])
 
         service = ChatBotService(
             documents=documents,
-            storage_manager=self.storage_manager
+            storage_manager=self.storage_manager,
+            chatbot_id=chatbot_id,
+            context_cache=self.context_cache,
+            history_policy=history_policy
         )
 
         chatbot = ChatBot(
@@ -712,12 +1691,275 @@ class DocuTalk:
 
         return chatbot
 
-    def get_consumed_price(
+    async def get_conversations(
+            self,
+            chatbot_id: str,
+            user_id: str,
+            limit: int = 20,
+            cursor: str | None = None,
+            last_messages: int | None = None
+        ) -> tuple[list[dict], str | None]:
+        """
+        Retrieves a page of a user's conversations with a chatbot, most recent first,
+        together with their messages, in a single aggregation.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        user_id : str
+            The user's unique identifier.
+        limit : int, optional
+            The maximum number of conversations to retrieve (default is 20).
+        cursor : str or None, optional
+            The cursor returned with the previous page (default is None, first page).
+        last_messages : int or None, optional
+            If set, only the last N messages of each conversation are retrieved
+            (default is None, all messages).
+
+        Returns
+        -------
+        tuple of (list of dict, str or None)
+            The conversations with their messages in chronological order, and the
+            cursor of the next page (None if this is the last page).
+
+        Raises
+        ------
+        ValueError
+            If the cursor is malformed.
+        """
+
+        match = {"chatbot_id": chatbot_id, "user_id": user_id}
+
+        if cursor is not None:
+            timestamp, conversation_id = decode_cursor(cursor)
+            match["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": conversation_id}}
+            ]
+
+        messages_pipeline = [
+            {"$match": {"$expr": {"$eq": ["$conversation_id", "$$conversation_id"]}}},
+            {"$sort": {"timestamp": 1 if last_messages is None else -1}},
+        ]
+
+        if last_messages is not None:
+            messages_pipeline.append({"$limit": last_messages})
+
+        messages_pipeline.append(
+            {"$project": {"_id": 0, "id": 1, "role": 1, "content": 1, "timestamp": 1}}
+        )
+
+        # One extra conversation is fetched to know whether a next page exists
+        conversations = await self.db.aggregate_data(
+            table="Conversations",
+            pipeline=[
+                {"$match": match},
+                {"$sort": {"timestamp": -1, "id": -1}},
+                {"$limit": limit + 1},
+                {
+                    "$lookup": {
+                        "from": "Messages",
+                        "let": {"conversation_id": "$id"},
+                        "pipeline": messages_pipeline,
+                        "as": "messages"
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0, "id": 1, "title": 1, "timestamp": 1, "messages": 1
+                    }
+                }
+            ]
+        )
+
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            next_cursor = encode_cursor(
+                timestamp=conversations[-1]["timestamp"],
+                id=conversations[-1]["id"]
+            )
+
+        if last_messages is not None:
+            for conversation in conversations:
+                conversation["messages"].reverse()
+
+        return conversations, next_cursor
+
+    async def submit_create_chatbot_job(
+            self,
+            chatbot_id: str,
+            user_id: str,
+            model: str,
+            documents: list
+        ) -> str:
+        """
+        Uploads the documents of a new chatbot and submits the job generating it, run
+        by a `JobWorker`.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        user_id : str
+            The ID of the user creating the chatbot.
+        model : str
+            The model used to generate the chatbot.
+        documents : list
+            A list of document data, with their `filename`, local `path`, `sha256`
+            digest and `nb_pages`.
+
+        Returns
+        -------
+        str
+            The job's unique identifier.
+        """
+
+        documents = await self.prepare_documents(documents)
+
+        for document in documents:
+
+            await self.store_document_pages(
+                chatbot_id=chatbot_id,
+                document_id=document["id"],
+                pages=document.pop("pages")
+            )
+
+            del document["path"]
+
+        job_id = await self.db.insert_data(
+            table="Jobs",
+            data={
+                "type": "create_chatbot",
+                "status": "pending",
+                "user_id": user_id,
+                "chatbot_id": chatbot_id,
+                "model": model,
+                "documents": documents,
+                "checkpoints": {},
+                "completed_stages": [],
+                "nb_attempts": 0
+            }
+        )
+
+        return job_id
+
+    async def get_job(
+            self,
+            job_id: str
+        ) -> dict | None:
+        """
+        Retrieves a job.
+
+        Parameters
+        ----------
+        job_id : str
+            The job's unique identifier.
+
+        Returns
+        -------
+        dict or None
+            The job, or None if it does not exist.
+        """
+
+        jobs = await self.db.get_data(
+            table="Jobs",
+            filter={"id": job_id},
+            limit=1
+        )
+
+        return jobs[0] if len(jobs) > 0 else None
+
+    async def get_conversation_history(
+            self,
+            conversation_id: str,
+            max_messages: int | None = None
+        ) -> tuple[str | None, list[dict]]:
+        """
+        Retrieves the summary of a conversation and the messages that followed it,
+        leaving out the source listings.
+
+        Parameters
+        ----------
+        conversation_id : str
+            The conversation's unique identifier.
+        max_messages : int or None, optional
+            The maximum number of messages to retrieve, the most recent ones being kept
+            (default is None, all messages).
+
+        Returns
+        -------
+        tuple of (str or None, list of dict)
+            The summary of the earlier messages (None if the conversation was never
+            summarized) and the following messages in chronological order.
+        """
+
+        conversations = await self.db.get_data(
+            table="Conversations",
+            filter={"id": conversation_id},
+            limit=1
+        )
+
+        summary, summary_until = None, None
+        if len(conversations) > 0:
+            summary = conversations[0].get("summary")
+            summary_until = conversations[0].get("summary_until")
+
+        filter = {"conversation_id": conversation_id, "kind": {"$ne": "sources"}}
+        if summary_until is not None:
+            filter["timestamp"] = {"$gt": summary_until}
+
+        messages = await self.db.get_data(
+            table="Messages",
+            filter=filter,
+            sort={"column": "timestamp", "direction": -1},
+            limit=max_messages
+        )
+
+        messages = [
+            {
+                "role": message["role"],
+                "content": message["content"],
+                "timestamp": message["timestamp"]
+            }
+            for message in reversed(messages)
+        ]
+
+        return summary, messages
+
+    async def update_conversation_summary(
+            self,
+            conversation_id: str,
+            summary: str,
+            summary_until: datetime
+        ) -> None:
+        """
+        Stores the running summary of a conversation.
+
+        Parameters
+        ----------
+        conversation_id : str
+            The conversation's unique identifier.
+        summary : str
+            The summary of the conversation messages up to `summary_until`.
+        summary_until : datetime
+            The timestamp of the last message folded into the summary.
+        """
+
+        await self.db.update_data(
+            table="Conversations",
+            filter={"id": conversation_id},
+            updates={"summary": summary, "summary_until": summary_until}
+        )
+
+    async def get_consumed_price(
             self,
             user_id: str
         ) -> float:
         """
-        Calculates the total usage cost for a user within the current week.
+        Retrieves the total usage cost for a user within the current week, read from
+        the weekly usage counters.
 
         Parameters
         ----------
@@ -730,32 +1972,29 @@ class DocuTalk:
             The total usage cost for the week.
         """
 
-        today = datetime.now()
-        start_of_week = (today - timedelta(days=today.weekday())).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        end_of_week = start_of_week + timedelta(days=7)
-
-        usages_data = self.db.get_data(
-            table="Usages",
+        # Kept up to date by `store_usage`, see the backfill job for older usages
+        weekly_usages = await self.db.get_data(
+            table="WeeklyUsages",
             filter={
                 "user_id": user_id,
-                "timestamp": {
-                    "$gte": start_of_week,
-                    "$lt": end_of_week
-                }
-            }
+                "week_start": get_start_of_week(datetime.now())
+            },
+            limit=1
         )
 
-        consumed_price = sum([usage["price"] for usage in usages_data])
+        if len(weekly_usages) == 0:
+            return 0
+
+        consumed_price = weekly_usages[0]["price"]
 
         return consumed_price
 
-    def store_usage(
+    async def store_usage(
             self,
             user_id: str,
             model_name: str,
-            qty: int
+            qty: int,
+            usage_id: str | None = None
         ) -> float:
         """
         Stores usage data for a user and calculates the associated cost.
@@ -768,6 +2007,10 @@ class DocuTalk:
             The name of the model used.
         qty : int
             The quantity of units consumed.
+        usage_id : str or None, optional
+            A unique identifier of the usage, making the call idempotent: a usage
+            already stored under this identifier is not counted again (default is
+            None).
 
         Returns
         -------
@@ -775,19 +2018,42 @@ class DocuTalk:
             The cost of the usage.
         """
 
+        models = await self.get_models()
+
         price_per_unit = next(
-            m["price_per_unit"] for m in self.models if m["name"] == model_name
+            m["price_per_unit"] for m in models if m["name"] == model_name
         )
         price = qty * price_per_unit
 
-        self.db.insert_data(
-            table="Usages",
-            data={
+        usage = {
+            "user_id": user_id,
+            "model": model_name,
+            "unit": "characters",
+            "qty": qty,
+            "price": price
+        }
+
+        if usage_id is None:
+            await self.db.insert_data(table="Usages", data=usage)
+        else:
+            inserted = await self.db.insert_data_if_absent(
+                table="Usages",
+                filter={"id": usage_id},
+                data={"id": usage_id, **usage}
+            )
+            if not inserted:
+                return price
+
+        await self.db.increment_data(
+            table="WeeklyUsages",
+            filter={
                 "user_id": user_id,
-                "model": model_name,
-                "unit": "characters",
+                "week_start": get_start_of_week(datetime.now())
+            },
+            increments={
                 "qty": qty,
-                "price": price
+                "price": price,
+                "nb_usages": 1
             }
         )
 
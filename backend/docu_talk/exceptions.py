@@ -16,8 +16,27 @@ class TooManyPagesError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class FileTooLargeError(Exception):
+
+    def __init__(self, message="An error has occurred"):
+        self.message = message
+        super().__init__(self.message)
+
 class BadOutputFormatError(Exception):
 
     def __init__(self, message="An error has occurred"):
         self.message = message
         super().__init__(self.message)
+
+class JobLeaseLostError(Exception):
+
+    def __init__(self, message="An error has occurred"):
+        self.message = message
+        super().__init__(self.message)
+
+class BatchUploadError(Exception):
+
+    def __init__(self, failures: dict, message="An error has occurred"):
+        self.failures = failures
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,432 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from docu_talk.agents import ChatBotService
+from docu_talk.docu_talk import DocuTalk
+from docu_talk.exceptions import JobLeaseLostError
+from utils.dag import Stage, run_stages
+
+logger = logging.getLogger(__name__)
+
+class JobWorker:
+    """
+    Runs the jobs of the `Jobs` table. Each job records a checkpoint after each stage,
+    so that a job whose worker stopped is resumed from its last completed stage by
+    another worker once its lease expires.
+    """
+
+    def __init__(
+            self,
+            docu_talk: DocuTalk,
+            max_concurrency: int = 4,
+            poll_interval: float = 1.0,
+            lease_duration: float = 60,
+            max_attempts: int = 3
+        ) -> None:
+        """
+        Initializes the worker.
+
+        Parameters
+        ----------
+        docu_talk : DocuTalk
+            The DocuTalk instance.
+        max_concurrency : int, optional
+            The maximum number of jobs run at once (default is 4).
+        poll_interval : float, optional
+            The delay between two polls of the `Jobs` table when idle, in seconds
+            (default is 1.0).
+        lease_duration : float, optional
+            The duration, in seconds, after which a running job whose worker stopped
+            sending heartbeats can be claimed by another worker (default is 60).
+        max_attempts : int, optional
+            The maximum number of attempts of a job before it fails (default is 3).
+        """
+
+        self.docu_talk = docu_talk
+        self.db = docu_talk.db
+
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.lease_duration = lease_duration
+        self.max_attempts = max_attempts
+
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.tasks: set[asyncio.Task] = set()
+
+    async def claim_job(self) -> dict | None:
+        """
+        Claims the oldest pending job, or a running job whose lease expired.
+
+        Returns
+        -------
+        dict or None
+            The claimed job, or None if there is no job to run.
+        """
+
+        now = datetime.now()
+        expiration = now - timedelta(seconds=self.lease_duration)
+
+        job = await self.db.find_and_update_data(
+            table="Jobs",
+            filter={
+                "$or": [
+                    {"status": "pending"},
+                    {"status": "running", "heartbeat": {"$lt": expiration}}
+                ]
+            },
+            updates={
+                "status": "running",
+                "worker_id": self.worker_id,
+                "heartbeat": now
+            },
+            sort={"column": "timestamp", "direction": 1}
+        )
+
+        return job
+
+    async def update_job(
+            self,
+            job: dict,
+            updates: dict
+        ) -> None:
+        """
+        Updates a job claimed by this worker.
+
+        Parameters
+        ----------
+        job : dict
+            The job.
+        updates : dict
+            The updates to apply to the job.
+
+        Raises
+        ------
+        JobLeaseLostError
+            If the job was claimed by another worker in the meantime.
+        """
+
+        updated_job = await self.db.find_and_update_data(
+            table="Jobs",
+            filter={"id": job["id"], "worker_id": self.worker_id},
+            updates=updates
+        )
+
+        if updated_job is None:
+            raise JobLeaseLostError(f"Job {job['id']} was claimed by another worker")
+
+    async def keep_alive(
+            self,
+            job: dict
+        ) -> None:
+        """
+        Renews the lease of a job until cancelled.
+
+        Parameters
+        ----------
+        job : dict
+            The job.
+        """
+
+        while True:
+            await asyncio.sleep(self.lease_duration / 3)
+            await self.update_job(job, {"heartbeat": datetime.now()})
+
+    async def run_forever(self) -> None:
+        """
+        Claims and runs jobs until cancelled.
+        """
+
+        logger.info(f"Job worker {self.worker_id} started")
+
+        try:
+            while True:
+
+                job = None
+                if len(self.tasks) < self.max_concurrency:
+                    job = await self.claim_job()
+
+                if job is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                task = asyncio.create_task(self.run_job(job))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+        finally:
+            # Interrupted jobs are resumed by another worker once their lease expires
+            for task in self.tasks:
+                task.cancel()
+
+    async def run_job(
+            self,
+            job: dict
+        ) -> None:
+        """
+        Runs a claimed job, and records its outcome. A job reclaimed after its last
+        attempt was interrupted is failed instead of run again.
+
+        Parameters
+        ----------
+        job : dict
+            The job.
+        """
+
+        keep_alive = asyncio.create_task(self.keep_alive(job))
+
+        try:
+
+            # The last attempt was interrupted before recording its outcome, e.g. by
+            # a worker crash, so that the job is failed and cleaned up
+            if job["nb_attempts"] >= self.max_attempts:
+                raise RuntimeError(
+                    f"Job {job['id']} was interrupted on its last attempt"
+                )
+
+            job["nb_attempts"] += 1
+            await self.update_job(job, {"nb_attempts": job["nb_attempts"]})
+
+            await self.run_create_chatbot(job)
+
+        except JobLeaseLostError as e:
+            logger.warning(str(e))
+
+        except Exception as e:
+
+            logger.exception(f"Job {job['id']} failed")
+
+            try:
+                await self.record_failure(job, error=e)
+            except JobLeaseLostError as lease_error:
+                # The job is retried by the worker that claimed it
+                logger.warning(str(lease_error))
+
+        finally:
+
+            keep_alive.cancel()
+
+            # A lost lease is also detected by the next update of the job
+            try:
+                await keep_alive
+            except asyncio.CancelledError:
+                pass
+            except JobLeaseLostError as e:
+                logger.warning(str(e))
+
+    async def record_failure(
+            self,
+            job: dict,
+            error: Exception
+        ) -> None:
+        """
+        Releases a failed job to be retried, or marks it failed and cleans up after it
+        once it has no attempt left.
+
+        Parameters
+        ----------
+        job : dict
+            The failed job.
+        error : Exception
+            The error the job failed with.
+
+        Raises
+        ------
+        JobLeaseLostError
+            If the job was claimed by another worker in the meantime.
+        """
+
+        if job["nb_attempts"] < self.max_attempts:
+            await self.update_job(job, {"status": "pending", "worker_id": None})
+        else:
+            await self.update_job(job, {"status": "failed", "error": str(error)})
+            await self.cleanup_create_chatbot(job)
+
+    def get_create_chatbot_stages(
+            self,
+            job: dict,
+            checkpoints: dict
+        ) -> list[Stage]:
+        """
+        Builds the stages generating a chatbot, the stages completed by a previous
+        attempt returning their checkpoint.
+
+        Parameters
+        ----------
+        job : dict
+            The `create_chatbot` job.
+        checkpoints : dict
+            The checkpoints of the completed stages, by stage name.
+
+        Returns
+        -------
+        list of Stage
+            The stages.
+        """
+
+        model = job["model"]
+
+        chatbot = ChatBotService(
+            documents=[dict(document) for document in job["documents"]],
+            storage_manager=self.docu_talk.storage_manager
+        )
+
+        async def generate_title_description() -> dict:
+            title, description = await chatbot.generate_title_description_async(
+                model=model
+            )
+            # Read right away, before another stage overwrites it
+            return {
+                "result": {"title": title, "description": description},
+                "usages": chatbot.last_usages
+            }
+
+        async def generate_icon(title_description: dict) -> dict:
+            icon = await chatbot.generate_icon_async(
+                description=title_description["result"]["description"],
+                model=model
+            )
+            return {"result": {"icon": icon}, "usages": chatbot.last_usages}
+
+        async def get_suggested_prompts() -> dict:
+            suggested_prompts = await chatbot.get_suggested_prompts_async(model=model)
+            return {
+                "result": {"suggested_prompts": suggested_prompts},
+                "usages": chatbot.last_usages
+            }
+
+        def restore(name: str):
+            async def run(*args) -> dict:
+                return checkpoints[name]
+            return run
+
+        # Only the icon depends on another stage, through the description
+        stages = [
+            Stage(name="title_description", run=generate_title_description),
+            Stage(
+                name="icon",
+                run=generate_icon,
+                dependencies=["title_description"]
+            ),
+            Stage(name="suggested_prompts", run=get_suggested_prompts)
+        ]
+
+        for stage in stages:
+            if stage.name in job["completed_stages"]:
+                stage.run = restore(stage.name)
+
+        return stages
+
+    async def reset_chatbot_records(
+            self,
+            chatbot_id: str
+        ) -> None:
+        """
+        Deletes the records left by an attempt interrupted while creating a chatbot.
+
+        Parameters
+        ----------
+        chatbot_id : str
+            The chatbot's unique identifier.
+        """
+
+        await self.db.delete_data(table="Chatbots", filter={"id": chatbot_id})
+        for table in ("SuggestedPrompts", "Documents", "Access"):
+            await self.db.delete_data(table=table, filter={"chatbot_id": chatbot_id})
+
+    async def run_create_chatbot(
+            self,
+            job: dict
+        ) -> None:
+        """
+        Generates a chatbot from its uploaded documents, skipping the stages completed
+        by a previous attempt.
+
+        Parameters
+        ----------
+        job : dict
+            The `create_chatbot` job.
+        """
+
+        model = job["model"]
+        checkpoints = dict(job["checkpoints"])
+        completed_stages = list(job["completed_stages"])
+
+        stages = self.get_create_chatbot_stages(job, checkpoints=checkpoints)
+
+        async for name, output in run_stages(stages):
+
+            if name in completed_stages:
+                continue
+
+            # Keyed by stage, so that a retried stage is not billed twice
+            price = await self.docu_talk.store_usage(
+                user_id=job["user_id"],
+                model_name=model,
+                qty=output["usages"]["qty"] * 4,
+                usage_id=f"{job['id']}-{name}"
+            )
+
+            checkpoints[name] = {"result": output["result"], "price": price}
+            completed_stages.append(name)
+
+            await self.update_job(
+                job,
+                {
+                    f"checkpoints.{name}": checkpoints[name],
+                    "completed_stages": completed_stages
+                }
+            )
+
+        results = {}
+        for checkpoint in checkpoints.values():
+            results.update(checkpoint["result"])
+
+        chatbot_id = job["chatbot_id"]
+        await self.reset_chatbot_records(chatbot_id)
+
+        await self.docu_talk.create_chatbot(
+            chatbot_id=chatbot_id,
+            created_by=job["user_id"],
+            title=results["title"],
+            description=results["description"],
+            icon=results["icon"],
+            access="private",
+            documents=job["documents"],
+            suggested_prompts=results["suggested_prompts"]
+        )
+
+        await self.update_job(job, {"status": "completed"})
+
+        await self.docu_talk.predictor.log_create_chatbot_metric(
+            duration=(datetime.now() - job["timestamp"]).total_seconds(),
+            nb_documents=len(job["documents"]),
+            total_pages=sum(d["nb_pages"] for d in job["documents"]),
+            model=model,
+            chatbot_id=chatbot_id
+        )
+
+    async def cleanup_create_chatbot(
+            self,
+            job: dict
+        ) -> None:
+        """
+        Releases the documents uploaded for a chatbot whose creation failed.
+
+        Parameters
+        ----------
+        job : dict
+            The failed `create_chatbot` job.
+        """
+
+        await self.docu_talk.release_blobs(
+            [d["sha256"] for d in job["documents"] if d.get("sha256") is not None]
+        )
+
+        await self.db.delete_data(
+            table="DocumentPages",
+            filter={"chatbot_id": job["chatbot_id"]}
+        )
@@ -1,17 +1,45 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from routers import auth, chatbot_settings, chatbots, create_chatbot
+from config.config import docu_talk
+from docu_talk.agents import LocalStorageManager
+from docu_talk.jobs import JobWorker
+from routers import auth, chatbot_settings, chatbots, create_chatbot, storage
 
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await docu_talk.db.ensure_indexes()
+
+    # Jobs can instead be run by dedicated workers (see worker.py)
+    worker = None
+    if os.getenv("RUN_JOB_WORKER", "true") == "true":
+        worker = asyncio.create_task(JobWorker(docu_talk).run_forever())
+
+    cache_stats_logger = asyncio.create_task(
+        docu_talk.log_cache_stats_forever(
+            interval=float(os.getenv("CACHE_STATS_INTERVAL", "600"))
+        )
+    )
+
+    yield
+
+    cache_stats_logger.cancel()
+
+    if worker is not None:
+        worker.cancel()
+
 app = FastAPI(
     title="DocuTalk API",
     description="Backend API for DocuTalk application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -46,6 +74,14 @@ app.include_router(
     tags=["Create Chatbot"]
 )
 
+# Serves the signed URLs of the local storage backend
+if isinstance(docu_talk.storage_manager, LocalStorageManager):
+    app.include_router(
+        router=storage.router,
+        prefix="/api/storage",
+        tags=["Storage"]
+    )
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to DocuTalk API"}
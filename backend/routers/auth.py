@@ -157,20 +157,18 @@ async def google_auth(google_token: GoogleToken):
     name = user_info.get("name", "")
     picture = user_info.get("picture", "")
 
-    existing_users = docu_talk.get_users()
-    if email not in existing_users:
-
-        password = generate_password()
-        first_name=user_info.get("given_name", name)
-        last_name=user_info.get("family_name", "")
-
-        docu_talk.create_user(
-            email=email,
-            first_name=user_info.get("given_name", ""),
-            last_name=last_name,
-            password=password,
-            period_dollar_amount=USER_PERIOD_DOLLAR_AMOUNT
-        )
+    first_name=user_info.get("given_name", name)
+    last_name=user_info.get("family_name", "")
+
+    created = await docu_talk.get_or_create_user(
+        email=email,
+        first_name=user_info.get("given_name", ""),
+        last_name=last_name,
+        password=generate_password(),
+        period_dollar_amount=USER_PERIOD_DOLLAR_AMOUNT
+    )
+
+    if created:
 
         mailing_bot.send_welcome_email(
             recipient=email,
@@ -226,18 +224,15 @@ async def microsoft_auth(
     first_name = user_data.get("givenName", name)
     last_name = user_data.get("surname", "")
 
-    existing_users = docu_talk.get_users()
-    if email not in existing_users:
+    created = await docu_talk.get_or_create_user(
+        email=email,
+        first_name=first_name,
+        last_name=last_name,
+        password=generate_password(),
+        period_dollar_amount=USER_PERIOD_DOLLAR_AMOUNT
+    )
 
-        password = generate_password()
-
-        docu_talk.create_user(
-            email=email,
-            first_name=first_name,
-            last_name=last_name,
-            password=password,
-            period_dollar_amount=USER_PERIOD_DOLLAR_AMOUNT
-        )
+    if created:
 
         mailing_bot.send_welcome_email(
             recipient=email,
@@ -286,7 +281,7 @@ async def login_for_access_token(
         If credentials are invalid.
     """
 
-    check = docu_talk.check_login(
+    check = await docu_talk.check_login(
         email=form_data.username,
         password=form_data.password
     )
@@ -332,14 +327,7 @@ async def signup(form_data: SignUpForm):
         If the user already exists.
     """
 
-    existing_users = docu_talk.get_users()
-    if form_data.email in existing_users:
-        raise HTTPException(
-            status_code=401,
-            detail="User already exists"
-        )
-
-    docu_talk.create_user(
+    created = await docu_talk.get_or_create_user(
         email=form_data.email,
         first_name=form_data.first_name,
         last_name=form_data.last_name,
@@ -347,6 +335,12 @@ async def signup(form_data: SignUpForm):
         period_dollar_amount=USER_PERIOD_DOLLAR_AMOUNT
     )
 
+    if not created:
+        raise HTTPException(
+            status_code=401,
+            detail="User already exists"
+        )
+
     mailing_bot.send_welcome_email(
         recipient=form_data.email,
         first_name=form_data.first_name,
@@ -392,21 +386,10 @@ async def get_user(
         User object containing personal details and associated chatbots.
     """
 
-    user = docu_talk.get_user(email=email)
-
-    users_data = docu_talk.db.get_data(
-        table="Users",
-        filter={"email": email}
-    )
-
-    user_data = users_data[0]
-
-    chatbots_data = docu_talk.get_user_chatbots(
-        user_id=email
-    )
+    user_data = await docu_talk.get_user(email=email)
 
     chatbots = []
-    for chatbot_data in chatbots_data:
+    for chatbot_data in user_data["chatbots"]:
         chatbot_data["icon"] = b64encode(chatbot_data["icon"]).decode("utf-8")
         chatbot = Chatbot.model_validate(chatbot_data)
         chatbots.append(chatbot)
@@ -435,7 +418,7 @@ async def get_remaining_credits(
         The total consumed price.
     """
 
-    consumed_price = docu_talk.get_consumed_price(
+    consumed_price = await docu_talk.get_consumed_price(
         user_id=email
     )
 
@@ -463,7 +446,7 @@ async def delete_account(
         A message confirming account deletion initiation.
     """
 
-    docu_talk.delete_user(
+    await docu_talk.delete_user(
         user_id=email
     )
 
@@ -489,7 +472,7 @@ async def set_terms_accepted(
         A message confirming acceptance of terms of use.
     """
 
-    docu_talk.db.update_data(
+    await docu_talk.db.update_data(
         table="Users",
         filter={"email": email},
         updates={"terms_of_use_displayed": True}
@@ -524,7 +507,7 @@ async def submit_feedback(
         A message confirming feedback submission.
     """
 
-    docu_talk.db.insert_data(
+    await docu_talk.db.insert_data(
         table="Feedbacks",
         data={
             "user_id": email,
@@ -3,6 +3,8 @@ from typing import List
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 
 from config.config import (
+    MAX_CHATBOT_BYTES,
+    MAX_DOCUMENT_BYTES,
     MAX_NB_DOC_PER_CHATBOT,
     MAX_NB_PAGES_PER_CHATBOT,
     check_user_access,
@@ -10,7 +12,12 @@ from config.config import (
     get_current_user,
     mailing_bot,
 )
-from utils.file_io import get_nb_pages_pdf
+from docu_talk.exceptions import (
+    BatchUploadError,
+    FileTooLargeError,
+    TooManyPagesError,
+)
+from utils.file_io import remove_spooled_files, spool_pdf_uploads
 
 router = APIRouter()
 
@@ -44,7 +51,7 @@ async def update_chatbot(
         A message confirming successful update.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
@@ -54,7 +61,7 @@ async def update_chatbot(
     if icon:
         icon_bytes = await icon.read()
 
-    docu_talk.update_chatbot(
+    await docu_talk.update_chatbot(
         chatbot_id=chatbot_id,
         title=title,
         description=description,
@@ -84,14 +91,16 @@ async def delete_chatbot(
         A message confirming successful deletion.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    docu_talk.delete_chatbot(
-        chatbot_id=chatbot_id
+    # Files are deleted from the storage after the response is sent
+    await docu_talk.delete_chatbot(
+        chatbot_id=chatbot_id,
+        wait_for_files=False
     )
 
     return {"message": "Chatbot deleted successfully"}
@@ -123,24 +132,21 @@ async def share_chatbot(
     None
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    docu_talk.share_chatbot(
+    await docu_talk.share_chatbot(
         chatbot_id=chatbot_id,
         user_id=user_email,
         role=role
     )
 
-    chatbot_data = docu_talk.db.get_data(
-        table="Chatbots",
-        filter={"id": chatbot_id}
-    )
+    chatbot_data = await docu_talk.get_chatbot_data(chatbot_id)
 
-    chatbot_name = chatbot_data[0]["title"]
+    chatbot_name = chatbot_data["chatbot"]["title"]
 
     mailing_bot.send_chatbot_shared_email(
         recipient=user_email,
@@ -172,13 +178,13 @@ async def remove_access_chatbot(
         A message confirming successful access removal.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    docu_talk.remove_access_chatbot(
+    await docu_talk.remove_access_chatbot(
         chatbot_id=chatbot_id,
         user_id=user_email
     )
@@ -206,16 +212,15 @@ async def request_for_public_sharing(
         A message confirming submission of the public sharing request.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    docu_talk.db.update_data(
-        table="Chatbots",
-        filter={"id": chatbot_id},
-        updates={"access": "pending_public_request"}
+    await docu_talk.update_chatbot(
+        chatbot_id=chatbot_id,
+        access="pending_public_request"
     )
 
     return {"message": "Public sharing request submitted successfully"}
@@ -241,23 +246,22 @@ async def add_documents(
     Raises
     ------
     HTTPException
-        If the maximum number of documents or pages per chatbot is exceeded.
+        If the maximum number of documents, pages or bytes per chatbot is exceeded.
 
     Returns
     -------
     None
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    existing_documents = docu_talk.db.get_data(
-        table="Documents",
-        filter={"chatbot_id": chatbot_id}
-    )
+    chatbot_data = await docu_talk.get_chatbot_data(chatbot_id)
+
+    existing_documents = chatbot_data["documents"]
 
     total_nb_documents = len(documents_files) + len(existing_documents)
     if total_nb_documents > MAX_NB_DOC_PER_CHATBOT:
@@ -267,38 +271,37 @@ async def add_documents(
             detail="You have reached the maximum number of documents per chatbot"
         )
 
-    total_pages = sum([d["nb_pages"] for d in existing_documents])
-    documents = []
-    for document in documents_files:
-
-        document_bytes = await document.read()
-        nb_pages = get_nb_pages_pdf(document_bytes)
-
-        documents.append(
-            {
-                "filename": document.filename,
-                "pdf_bytes": document_bytes,
-                "nb_pages": nb_pages
-            }
+    try:
+        documents = await spool_pdf_uploads(
+            documents_files,
+            max_document_bytes=MAX_DOCUMENT_BYTES,
+            max_total_bytes=MAX_CHATBOT_BYTES,
+            max_total_pages=MAX_NB_PAGES_PER_CHATBOT,
+            total_bytes=await docu_talk.get_documents_size(existing_documents),
+            total_pages=sum([d["nb_pages"] for d in existing_documents])
         )
-
-        total_pages += nb_pages
-
-    if total_pages > MAX_NB_PAGES_PER_CHATBOT:
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message) from e
+    except TooManyPagesError as e:
         raise HTTPException(
             status_code=400,
             detail="You have reached the maximum number of pages per chatbot"
-        )
-
-    for document in documents:
+        ) from e
 
-        docu_talk.add_document(
+    try:
+        await docu_talk.add_documents(
             chatbot_id=chatbot_id,
             created_by=email,
-            filename=document["filename"],
-            pdf_bytes=document["pdf_bytes"],
-            nb_pages=document["nb_pages"]
+            documents=documents
         )
+    except BatchUploadError as e:
+        filenames = [documents[index]["filename"] for index in sorted(e.failures)]
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to upload {', '.join(filenames)}, no document was added"
+        ) from e
+    finally:
+        remove_spooled_files(documents)
 
 @router.delete("/delete_document/{chatbot_id}/{filename}")
 async def delete_document(
@@ -324,13 +327,13 @@ async def delete_document(
         A message confirming successful document deletion.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email,
         check_admin=True
     )
 
-    docu_talk.remove_document(
+    await docu_talk.remove_document(
         chatbot_id=chatbot_id,
         filename=filename
     )
@@ -1,17 +1,23 @@
+import asyncio
 import json
 from datetime import datetime
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from config.config import (
+    BASIC_MODEL_NAME,
     CREDIT_EXCHANGE_RATE,
+    HISTORY_POLICY,
+    RETRIEVAL_TOP_K_DOCUMENTS,
+    SOURCES_ATTRIBUTION_MODE,
     check_user_access,
     docu_talk,
     get_current_user,
 )
+from docu_talk.base import ChatBot
 
 router = APIRouter()
 
@@ -26,6 +32,21 @@ class Conversation(BaseModel):
     title: str
     messages: list[Message]
 
+class ConversationsPage(BaseModel):
+    conversations: list[Conversation]
+    next_cursor: str | None
+
+class AskEstimationRequest(BaseModel):
+    chatbot_id: str
+    model: str
+
+class AskEstimation(BaseModel):
+    chatbot_id: str
+    model: str
+    estimated_duration: float
+
+MAX_NB_ASK_ESTIMATIONS = 50
+
 @router.get("/get_ask_estimation_duration")
 async def get_ask_estimation_duration(
         chatbot_id: str,
@@ -52,15 +73,14 @@ async def get_ask_estimation_duration(
             Predicted duration for answering a question using the chatbot.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email
     )
 
-    documents = docu_talk.db.get_data(
-        table="Documents",
-        filter={"chatbot_id": chatbot_id}
-    )
+    chatbot_data = await docu_talk.get_chatbot_data(chatbot_id)
+
+    documents = chatbot_data["documents"]
 
     total_pages = sum(d["nb_pages"] for d in documents)
 
@@ -76,60 +96,135 @@ async def get_ask_estimation_duration(
 
     return {"estimated_duration": round(estimated_duration, 1)}
 
+@router.post("/get_ask_estimations")
+async def get_ask_estimations(
+        requests: list[AskEstimationRequest],
+        email: str = Depends(get_current_user)
+    ) -> list[AskEstimation]:
+    """
+    Estimate the response duration of several (chatbot, model) pairs in one round
+    trip.
+
+    Parameters
+    ----------
+    requests : list of AskEstimationRequest
+        The chatbot and model of each estimation.
+    email : str
+        The current authenticated user's email.
+
+    Returns
+    -------
+    list of AskEstimation
+        The estimated duration of each pair, in request order.
+
+    Raises
+    ------
+    HTTPException
+        If too many estimations are requested, or the user does not have access to
+        one of the chatbots.
+    """
+
+    if len(requests) > MAX_NB_ASK_ESTIMATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_NB_ASK_ESTIMATIONS} estimations can be requested"
+        )
+
+    chatbot_ids = list(dict.fromkeys(request.chatbot_id for request in requests))
+
+    await asyncio.gather(
+        *[
+            check_user_access(chatbot_id=chatbot_id, email=email)
+            for chatbot_id in chatbot_ids
+        ]
+    )
+
+    totals = await docu_talk.get_document_totals(chatbot_ids)
+
+    timestamp = datetime.now()
+    estimated_durations = docu_talk.predictor.predict_many(
+        metric="ask_chatbot_duration",
+        rows=[
+            {
+                **totals[request.chatbot_id],
+                "model": request.model,
+                "timestamp": timestamp
+            }
+            for request in requests
+        ]
+    )
+
+    estimations = [
+        AskEstimation(
+            chatbot_id=request.chatbot_id,
+            model=request.model,
+            estimated_duration=round(estimated_duration, 1)
+        )
+        for request, estimated_duration in zip(
+            requests, estimated_durations, strict=True
+        )
+    ]
+
+    return estimations
+
 @router.post("/get_conversations")
 async def get_conversations(
         chatbot_id: str = Form(...),
+        limit: int = Form(20, ge=1, le=100),
+        cursor: str | None = Form(None),
+        last_messages: int | None = Form(None, ge=1),
         email: str = Depends(get_current_user)
-    ) -> list[Conversation]:
+    ) -> ConversationsPage:
     """
-    Retrieve all conversations associated with a chatbot for the current user.
+    Retrieve a page of the conversations associated with a chatbot for the current
+    user, most recent first.
 
     Parameters
     ----------
     chatbot_id : str
         The unique identifier of the chatbot.
+    limit : int, optional
+        The maximum number of conversations to return (default is 20).
+    cursor : str, optional
+        The `next_cursor` returned with the previous page.
+    last_messages : int, optional
+        If set, only the last N messages of each conversation are returned.
     email : str
         The current authenticated user's email.
 
     Returns
     -------
-    list of Conversation
-        A list of conversation objects, each containing messages exchanged with the
-        chatbot.
+    ConversationsPage
+        A page of conversation objects, each containing messages exchanged with the
+        chatbot, and the cursor of the next page (None on the last page).
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email
     )
 
-    conversations_data = docu_talk.db.get_data(
-        table="Conversations",
-        filter={
-            "chatbot_id": chatbot_id,
-            "user_id": email
-        }
-    )
-
-    conversations = []
-    for conversation_data in conversations_data:
-
-        messages_data = docu_talk.db.get_data(
-            table="Messages",
-            filter={
-                "conversation_id": conversation_data["id"]
-            }
+    try:
+        conversations, next_cursor = await docu_talk.get_conversations(
+            chatbot_id=chatbot_id,
+            user_id=email,
+            limit=limit,
+            cursor=cursor,
+            last_messages=last_messages
         )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        ) from e
 
-        conversation_data["messages"] = []
-        for message_data in messages_data:
-            message = Message.model_validate(message_data)
-            conversation_data["messages"].append(message)
-
-        conversation = Conversation.model_validate(conversation_data)
-        conversations.append(conversation)
+    # Validation is left to the response model, which runs it once
+    response = {
+        "conversations": conversations,
+        "next_cursor": next_cursor
+    }
 
-    return conversations
+    return response
 
 @router.post("/create_conversation")
 async def create_conversation(
@@ -154,14 +249,14 @@ async def create_conversation(
             The unique identifier of the newly created conversation.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email
     )
 
     conversation_id = str(uuid4())
 
-    docu_talk.db.insert_data(
+    await docu_talk.db.insert_data(
         table="Conversations",
         data={
             "id": conversation_id,
@@ -173,6 +268,40 @@ async def create_conversation(
 
     return {"conversation_id": conversation_id}
 
+async def start_chat(
+        chatbot_id: str,
+        conversation_id: str
+    ) -> ChatBot:
+    """
+    Start a chat session with a chatbot, loading only the part of the conversation
+    history required by the history policy.
+
+    Parameters
+    ----------
+    chatbot_id : str
+        The unique identifier of the chatbot.
+    conversation_id : str
+        The conversation identifier for context.
+
+    Returns
+    -------
+    ChatBot
+        The chatbot, whose service holds the conversation summary and messages.
+    """
+
+    chatbot, (summary, previous_messages) = await asyncio.gather(
+        docu_talk.start_chat(chatbot_id, history_policy=HISTORY_POLICY),
+        docu_talk.get_conversation_history(
+            conversation_id=conversation_id,
+            max_messages=HISTORY_POLICY.max_loaded_messages
+        )
+    )
+
+    chatbot.service.summary = summary
+    chatbot.service.messages.extend(previous_messages)
+
+    return chatbot
+
 async def stream_ask_chatbot(
         chatbot_id: str,
         message: str,
@@ -206,37 +335,36 @@ async def stream_ask_chatbot(
 
     start_time = datetime.now()
 
-    chatbot = docu_talk.start_chat(chatbot_id)
-
-    messages_data = docu_talk.db.get_data(
-        table="Messages",
-        filter={"conversation_id": conversation_id}
+    chatbot = await start_chat(
+        chatbot_id=chatbot_id,
+        conversation_id=conversation_id
     )
 
-    previous_messages = [
-        {
-            "role": message["role"],
-            "content": message["content"]
-        }
-        for message in messages_data
+    # The previous question is part of the query, for follow-up questions
+    previous_questions = [
+        m["content"] for m in chatbot.service.messages if m["role"] == "user"
     ]
 
-    chatbot.service.messages.extend(previous_messages)
+    document_ids = await docu_talk.select_document_ids(
+        chatbot_id=chatbot_id,
+        query=" ".join(previous_questions[-1:] + [message]),
+        top_k=RETRIEVAL_TOP_K_DOCUMENTS
+    )
 
-    stream = chatbot.service.ask(
+    stream = await chatbot.service.ask_async(
         message=message,
         model=model,
-        # document_ids=selected_document_ids
+        document_ids=document_ids
     )
 
     answer = ""
-    for chunk in stream:
+    async for chunk in stream:
         answer += chunk
         yield chunk
 
     qty = chatbot.service.last_usages["qty"] * 4
 
-    price = docu_talk.store_usage(
+    price = await docu_talk.store_usage(
         user_id=email,
         model_name=model,
         qty=qty,
@@ -249,7 +377,7 @@ async def stream_ask_chatbot(
         f"data: {json.dumps({'consumed_credits': consumed_credits})}\n\n"
     )
 
-    docu_talk.db.insert_data(
+    await docu_talk.db.insert_data(
         table="Messages",
         data={
             "conversation_id": conversation_id,
@@ -258,7 +386,7 @@ async def stream_ask_chatbot(
         }
     )
 
-    docu_talk.db.insert_data(
+    await docu_talk.db.insert_data(
         table="Messages",
         data={
             "conversation_id": conversation_id,
@@ -267,7 +395,7 @@ async def stream_ask_chatbot(
         }
     )
 
-    docu_talk.predictor.log_ask_chatbot_metrics(
+    await docu_talk.predictor.log_ask_chatbot_metrics(
         duration=(datetime.now() - start_time).total_seconds(),
         token_count=chatbot.service.last_usages["qty"],
         nb_documents=len(chatbot.service.documents),
@@ -276,6 +404,27 @@ async def stream_ask_chatbot(
         chatbot_id=chatbot_id
     )
 
+    # Older turns are folded into the summary once the answer is delivered, so that
+    # the next question only sends the summary and the last turns
+    folded_messages = await chatbot.service.summarize_history_async(
+        model=BASIC_MODEL_NAME
+    )
+
+    if len(folded_messages) > 0:
+
+        await docu_talk.store_usage(
+            user_id=email,
+            model_name=BASIC_MODEL_NAME,
+            qty=chatbot.service.last_usages["qty"] * 4,
+        )
+
+        await docu_talk.update_conversation_summary(
+            conversation_id=conversation_id,
+            summary=chatbot.service.summary,
+            # Messages of this turn are not timestamped until reloaded
+            summary_until=folded_messages[-1].get("timestamp", datetime.now())
+        )
+
 @router.post("/ask_chatbot")
 async def ask_chatbot(
         chatbot_id: str = Form(...),
@@ -307,7 +456,7 @@ async def ask_chatbot(
         chatbot's response and credit updates.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email
     )
@@ -325,7 +474,7 @@ async def ask_chatbot(
         media_type="text/event-stream",
         headers={
             "Content-Type": "text/event-stream",
-            "Cache-Control": "no-cafche",
+            "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "Transfer-Encoding": "chunked",
             "Content-Encoding": "none"
@@ -366,33 +515,43 @@ async def get_last_message_sources(
             The number of credits consumed by this operation.
     """
 
-    check_user_access(
+    await check_user_access(
         chatbot_id=chatbot_id,
         email=email
     )
 
     start_time = datetime.now()
 
-    chatbot = docu_talk.start_chat(chatbot_id)
-
-    messages_data = docu_talk.db.get_data(
-        table="Messages",
-        filter={"conversation_id": conversation_id}
+    chatbot = await start_chat(
+        chatbot_id=chatbot_id,
+        conversation_id=conversation_id
     )
 
-    previous_messages = [
-        {
-            "role": message["role"],
-            "content": message["content"]
-        }
-        for message in messages_data
+    # The sources of the last answer are looked for in the documents it matches
+    answers = [
+        m["content"] for m in chatbot.service.messages if m["role"] == "assistant"
     ]
 
-    chatbot.service.messages.extend(previous_messages)
+    document_ids = None
+    if len(answers) > 0:
+        document_ids = await docu_talk.select_document_ids(
+            chatbot_id=chatbot_id,
+            query=answers[-1],
+            top_k=RETRIEVAL_TOP_K_DOCUMENTS
+        )
 
-    sources = chatbot.service.get_last_message_sources(
+    pages = None
+    if SOURCES_ATTRIBUTION_MODE != "llm":
+        pages = await docu_talk.get_document_pages(
+            chatbot_id=chatbot_id,
+            document_ids=document_ids
+        )
+
+    sources = await chatbot.service.get_last_message_sources_async(
         model=model,
-        # document_ids=selected_document_ids
+        document_ids=document_ids,
+        mode=SOURCES_ATTRIBUTION_MODE,
+        pages=pages
     )
 
     if len(sources) == 0:
@@ -405,33 +564,39 @@ async def get_last_message_sources(
 
         answer = "\n\n".join(parts)
 
-    qty = chatbot.service.last_usages["qty"] * 4
+    # Sources located without the model are free
+    consumed_credits = 0
+    if chatbot.service.last_usages is not None:
 
-    price = docu_talk.store_usage(
-        user_id=email,
-        model_name=model,
-        qty=qty,
-    )
+        qty = chatbot.service.last_usages["qty"] * 4
 
-    consumed_credits = round(price * CREDIT_EXCHANGE_RATE, 2)
+        price = await docu_talk.store_usage(
+            user_id=email,
+            model_name=model,
+            qty=qty,
+        )
+
+        consumed_credits = round(price * CREDIT_EXCHANGE_RATE, 2)
 
-    docu_talk.db.insert_data(
+    await docu_talk.db.insert_data(
         table="Messages",
         data={
             "conversation_id": conversation_id,
             "role": "assistant",
-            "content": answer
+            "content": answer,
+            "kind": "sources"
         }
     )
 
-    docu_talk.predictor.log_ask_chatbot_metrics(
-        duration=(datetime.now() - start_time).total_seconds(),
-        token_count=chatbot.service.last_usages["qty"],
-        nb_documents=len(chatbot.service.documents),
-        total_pages=sum(d["nb_pages"] for d in chatbot.service.documents),
-        model=model,
-        chatbot_id=chatbot_id
-    )
+    if chatbot.service.last_usages is not None:
+        await docu_talk.predictor.log_ask_chatbot_metrics(
+            duration=(datetime.now() - start_time).total_seconds(),
+            token_count=chatbot.service.last_usages["qty"],
+            nb_documents=len(chatbot.service.documents),
+            total_pages=sum(d["nb_pages"] for d in chatbot.service.documents),
+            model=model,
+            chatbot_id=chatbot_id
+        )
 
     response = {
         "answer": answer,
@@ -1,17 +1,76 @@
+import asyncio
 import json
 from base64 import b64encode
 from datetime import datetime
 from typing import List
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
 
-from config.config import CREDIT_EXCHANGE_RATE, docu_talk, get_current_user
-from utils.file_io import get_nb_pages_pdf
+from config.config import (
+    CREDIT_EXCHANGE_RATE,
+    MAX_CHATBOT_BYTES,
+    MAX_DOCUMENT_BYTES,
+    MAX_NB_DOC_PER_CHATBOT,
+    MAX_NB_PAGES_PER_CHATBOT,
+    docu_talk,
+    get_current_user,
+)
+from docu_talk.exceptions import (
+    BatchUploadError,
+    FileTooLargeError,
+    TooManyPagesError,
+)
+from utils.file_io import remove_spooled_files, spool_pdf_uploads
 
 router = APIRouter()
 
+async def get_spooled_documents(documents_files: List[UploadFile]) -> list[dict]:
+    """
+    Copy the uploaded documents of a new chatbot to temporary files, enforcing the
+    per-chatbot limits.
+
+    Parameters
+    ----------
+    documents_files : List[UploadFile]
+        List of uploaded PDF documents.
+
+    Returns
+    -------
+    list of dict
+        The `filename`, temporary file `path`, `size`, `sha256` digest and `nb_pages`
+        of each document.
+
+    Raises
+    ------
+    HTTPException
+        If the maximum number of documents, pages or bytes per chatbot is exceeded.
+    """
+
+    if len(documents_files) > MAX_NB_DOC_PER_CHATBOT:
+        raise HTTPException(
+            status_code=400,
+            detail="You have reached the maximum number of documents per chatbot"
+        )
+
+    try:
+        documents = await spool_pdf_uploads(
+            documents_files,
+            max_document_bytes=MAX_DOCUMENT_BYTES,
+            max_total_bytes=MAX_CHATBOT_BYTES,
+            max_total_pages=MAX_NB_PAGES_PER_CHATBOT
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=e.message) from e
+    except TooManyPagesError as e:
+        raise HTTPException(
+            status_code=400,
+            detail="You have reached the maximum number of pages per chatbot"
+        ) from e
+
+    return documents
+
 @router.post("/get_create_chatbot_estimations")
 async def get_create_chatbot_estimations(
         documents_files: List[UploadFile] = File(...),
@@ -37,11 +96,10 @@ async def get_create_chatbot_estimations(
             Predicted duration for creating the chatbot.
     """
 
-    total_pages = 0
-    for document in documents_files:
-        document_bytes = await document.read()
-        nb_pages = get_nb_pages_pdf(document_bytes)
-        total_pages += nb_pages
+    documents = await get_spooled_documents(documents_files)
+    remove_spooled_files(documents)
+
+    total_pages = sum(document["nb_pages"] for document in documents)
 
     estimated_duration = docu_talk.predictor.predict(
         metric="create_chatbot_duration",
@@ -58,26 +116,20 @@ async def get_create_chatbot_estimations(
         "estimated_duration": estimated_duration
     }
 
-def create_chatbot_stream(
-        chatbot_id: str,
-        documents: list[dict],
-        model: str,
-        email: str
+async def stream_job_progress(
+        job_id: str,
+        poll_interval: float = 0.5
     ):
     """
-    Stream the chatbot creation process including title, description, icon, prompts, and
-    credit consumption.
+    Stream the progress of a chatbot creation job, from its first stage, until the job
+    completes or fails.
 
     Parameters
     ----------
-    chatbot_id : str
-        Unique identifier for the chatbot being created.
-    documents : list of dict
-        List of dictionaries containing document metadata and content.
-    model : str
-        The model name to guide the chatbot generation process.
-    email : str
-        Email of the user creating the chatbot.
+    job_id : str
+        Unique identifier of the chatbot creation job.
+    poll_interval : float, optional
+        The delay between two reads of the job, in seconds (default is 0.5).
 
     Yields
     ------
@@ -86,92 +138,84 @@ def create_chatbot_stream(
         of chatbot creation.
     """
 
-    chatbot = docu_talk.get_chatbot_service(
-        chatbot_id=chatbot_id,
-        documents=documents
-    )
-
-    title, description = chatbot.generate_title_description(
-        model=model
-    )
-
     yield json.dumps({
-        "title": title,
-        "description": description
+        "job_id": job_id
     }) + "\n"
 
-    price = docu_talk.store_usage(
-        user_id=email,
-        model_name=model,
-        qty=chatbot.last_usages["qty"] * 4,
-    )
+    nb_sent_stages = 0
+    while True:
 
-    consumed_credits = round(price * CREDIT_EXCHANGE_RATE, 2)
+        job = await docu_talk.get_job(job_id)
 
-    yield (
-        f"event: credits\nid: {int(datetime.now().timestamp())}\n"
-        f"data: {json.dumps({'consumed_credits': consumed_credits})}\n\n"
-    )
+        if job is None:
+            yield (
+                f"event: error\nid: {int(datetime.now().timestamp())}\n"
+                f"data: {json.dumps({'detail': 'Job not found'})}\n\n"
+            )
+            return
 
-    icon = chatbot.generate_icon(
-        description=description,
-        model=model
-    )
+        for name in job["completed_stages"][nb_sent_stages:]:
 
-    icon_base64 = b64encode(icon).decode("utf-8")
+            checkpoint = job["checkpoints"][name]
 
-    yield json.dumps({
-        "icon": icon_base64
-    }) + "\n"
+            event = checkpoint["result"]
+            if name == "icon":
+                event = {"icon": b64encode(event["icon"]).decode("utf-8")}
 
-    price = docu_talk.store_usage(
-        user_id=email,
-        model_name=model,
-        qty=chatbot.last_usages["qty"] * 4,
-    )
+            yield json.dumps(event) + "\n"
 
-    consumed_credits = round(price * CREDIT_EXCHANGE_RATE, 2)
+            consumed_credits = round(checkpoint["price"] * CREDIT_EXCHANGE_RATE, 2)
 
-    yield (
-        f"event: credits\nid: {int(datetime.now().timestamp())}\n"
-        f"data: {json.dumps({'consumed_credits': consumed_credits})}\n\n"
-    )
+            yield (
+                f"event: credits\nid: {int(datetime.now().timestamp())}\n"
+                f"data: {json.dumps({'consumed_credits': consumed_credits})}\n\n"
+            )
 
-    suggested_prompts = chatbot.get_suggested_prompts(
-        model=model
-    )
+        nb_sent_stages = len(job["completed_stages"])
 
-    yield json.dumps({
-        "suggested_prompts": suggested_prompts
-    }) + "\n"
+        if job["status"] == "completed":
+            yield json.dumps({
+                "chatbot_id": job["chatbot_id"]
+            }) + "\n"
+            return
 
-    price = docu_talk.store_usage(
-        user_id=email,
-        model_name=model,
-        qty=chatbot.last_usages["qty"] * 4,
-    )
+        if job["status"] == "failed":
+            yield (
+                f"event: error\nid: {int(datetime.now().timestamp())}\n"
+                f"data: {json.dumps({'detail': 'Chatbot creation failed'})}\n\n"
+            )
+            return
 
-    consumed_credits = round(price * CREDIT_EXCHANGE_RATE, 2)
+        await asyncio.sleep(poll_interval)
 
-    yield (
-        f"event: credits\nid: {int(datetime.now().timestamp())}\n"
-        f"data: {json.dumps({'consumed_credits': consumed_credits})}\n\n"
-    )
+def get_job_stream_response(job_id: str) -> StreamingResponse:
+    """
+    Build the Server-Sent Events (SSE) response streaming a job's progress.
+
+    Parameters
+    ----------
+    job_id : str
+        Unique identifier of the chatbot creation job.
+
+    Returns
+    -------
+    StreamingResponse
+        The streaming HTTP response.
+    """
 
-    docu_talk.create_chatbot(
-        chatbot_id=chatbot_id,
-        created_by=email,
-        title=title,
-        description=description,
-        icon=icon,
-        access="private",
-        documents=chatbot.documents,
-        suggested_prompts=suggested_prompts
+    response = StreamingResponse(
+        content=stream_job_progress(job_id),
+        media_type="text/event-stream",
+        headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Transfer-Encoding": "chunked",
+            "Content-Encoding": "none"
+        }
     )
 
-    yield json.dumps({
-        "chatbot_id": chatbot_id
-    }) + "\n"
+    return response
 
 @router.post("/create_chatbot")
 async def create_chatbot(
@@ -199,52 +243,58 @@ async def create_chatbot(
         updates on the chatbot creation process.
     """
 
-    start_time = datetime.now()
-
-    documents = []
-    total_pages = 0
-    for document in documents_files:
+    documents = await get_spooled_documents(documents_files)
 
-        document_bytes = await document.read()
-        nb_pages = get_nb_pages_pdf(document_bytes)
+    chatbot_id = str(uuid4())
 
-        documents.append(
-            {
-                "filename": document.filename,
-                "bytes": document_bytes,
-                "nb_pages": nb_pages
-            }
+    # The job is run by a worker and survives the client disconnecting
+    try:
+        job_id = await docu_talk.submit_create_chatbot_job(
+            chatbot_id=chatbot_id,
+            user_id=email,
+            model=model,
+            documents=documents
         )
+    except BatchUploadError as e:
+        filenames = [documents[index]["filename"] for index in sorted(e.failures)]
+        raise HTTPException(
+            status_code=502,
+            detail=f"Failed to upload {', '.join(filenames)}"
+        ) from e
+    finally:
+        remove_spooled_files(documents)
+
+    return get_job_stream_response(job_id)
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(
+        job_id: str,
+        email: str = Depends(get_current_user)
+    ):
+    """
+    Endpoint to re-attach a client to the progress of a chatbot creation job, e.g.
+    after a disconnection. The stages completed so far are replayed first.
 
-        total_pages += nb_pages
-
-    chatbot_id = str(uuid4())
+    Parameters
+    ----------
+    job_id : str
+        Unique identifier of the chatbot creation job.
+    email : str
+        The current authenticated user's email, injected via dependency.
 
-    stream = create_chatbot_stream(
-        chatbot_id=chatbot_id,
-        documents=documents,
-        model=model,
-        email=email
-    )
+    Returns
+    -------
+    StreamingResponse
+        A streaming HTTP response using Server-Sent Events (SSE) to provide real-time
+        updates on the chatbot creation process.
+    """
 
-    response = StreamingResponse(
-        content=stream,
-        media_type="text/event-stream",
-        headers={
-            "Content-Type": "text/event-stream",
-            "Cache-Control": "no-cafche",
-            "Connection": "keep-alive",
-            "Transfer-Encoding": "chunked",
-            "Content-Encoding": "none"
-        }
-    )
+    job = await docu_talk.get_job(job_id)
 
-    docu_talk.predictor.log_create_chatbot_metric(
-        duration=(datetime.now() - start_time).total_seconds(),
-        nb_documents=len(documents),
-        total_pages=total_pages,
-        model=model,
-        chatbot_id=chatbot_id
-    )
+    if job is None or job["user_id"] != email:
+        raise HTTPException(
+            status_code=404,
+            detail="Job not found"
+        )
 
-    return response
+    return get_job_stream_response(job_id)
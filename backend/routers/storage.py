@@ -0,0 +1,59 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from config.config import docu_talk
+
+router = APIRouter()
+
+@router.get("/{path:path}")
+async def get_file(
+        path: str,
+        expires: int,
+        signature: str
+    ):
+    """
+    Serve a file of the local storage through a URL signed by the storage manager.
+
+    Parameters
+    ----------
+    path : str
+        The path of the file in the storage.
+    expires : int
+        The expiration time of the URL, as a Unix timestamp.
+    signature : str
+        The signature of the URL.
+
+    Returns
+    -------
+    FileResponse
+        The content of the file.
+
+    Raises
+    ------
+    HTTPException
+        If the signature is invalid or expired, or the file does not exist.
+    """
+
+    storage_manager = docu_talk.storage_manager
+
+    is_valid = storage_manager.verify_signature(
+        path=path,
+        expires=expires,
+        method="GET",
+        signature=signature
+    )
+    if not is_valid:
+        raise HTTPException(
+            status_code=403,
+            detail="Invalid or expired signature"
+        )
+
+    try:
+        file_path = storage_manager.get_file_path(path)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail="File not found") from e
+
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    return FileResponse(file_path, media_type="application/pdf")
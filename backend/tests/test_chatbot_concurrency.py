@@ -0,0 +1,125 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from vertexai.generative_models import GenerativeModel
+
+from docu_talk.agents.chatbot.chatbot import ChatBotService
+
+LATENCY = 0.2
+NB_CALLS = 8
+
+
+def make_chunk(
+        text: str
+    ) -> SimpleNamespace:
+
+    return SimpleNamespace(
+        candidates=[
+            SimpleNamespace(content=SimpleNamespace(parts=[SimpleNamespace(text=text)]))
+        ],
+        _raw_response=SimpleNamespace(model_version="fake-model"),
+        usage_metadata=SimpleNamespace(total_token_count=1)
+    )
+
+
+async def generate_content_async(
+        self,
+        contents,
+        stream: bool = False,
+        **kwargs
+    ):
+    """
+    A slow model answering after `LATENCY` seconds, without blocking the event loop.
+    """
+
+    await asyncio.sleep(LATENCY)
+
+    async def stream_chunks():
+        for text in ("Hello", " world"):
+            yield make_chunk(text)
+
+    return stream_chunks()
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+
+    monkeypatch.setenv("GCP_PROJECT_ID", "project")
+    monkeypatch.setenv("GCP_LOCATION", "europe-west1")
+    monkeypatch.setattr(
+        GenerativeModel,
+        "generate_content_async",
+        generate_content_async
+    )
+
+    def make_service() -> ChatBotService:
+        return ChatBotService(
+            documents=[
+                {"id": "document", "filename": "document.pdf", "uri": "gs://b/d.pdf"}
+            ],
+            storage_manager=None
+        )
+
+    return make_service
+
+
+async def ask(
+        service: ChatBotService
+    ) -> str:
+
+    stream = await service.ask_async(message="Question", model="gemini")
+
+    return "".join([chunk async for chunk in stream])
+
+
+async def stream_answer(
+        service: ChatBotService
+    ) -> list:
+
+    completion = await GenerativeModel("gemini").generate_content_async(
+        contents=[],
+        stream=True
+    )
+
+    stream = service.gemini.get_streamed_response_async(completion)
+
+    return [part async for part in stream]
+
+
+def run_concurrently(
+        call,
+        services: list[ChatBotService]
+    ) -> tuple[list, float]:
+
+    async def main():
+        return await asyncio.gather(*[call(service) for service in services])
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+
+    return results, time.perf_counter() - start
+
+
+def test_concurrent_questions_overlap(make_service):
+
+    services = [make_service() for _ in range(NB_CALLS)]
+
+    answers, duration = run_concurrently(ask, services)
+
+    assert answers == ["Hello world"] * NB_CALLS
+    assert duration < 2 * LATENCY
+
+
+def test_concurrent_streams_overlap(make_service):
+
+    services = [make_service() for _ in range(NB_CALLS)]
+
+    parts, duration = run_concurrently(stream_answer, services)
+
+    for service_parts in parts:
+        assert service_parts[:2] == ["Hello", " world"]
+        assert service_parts[2]["qty"] == 1
+
+    assert duration < 2 * LATENCY
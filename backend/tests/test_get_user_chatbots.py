@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from docu_talk.docu_talk import DocuTalk
+
+
+class CountingDatabase:
+    """
+    An in-memory database counting the queries it receives, supporting the
+    equality, `$in` and `$or` filters used by `DocuTalk.get_user_chatbots`.
+    """
+
+    def __init__(
+            self,
+            tables: dict[str, list[dict]]
+        ) -> None:
+
+        self.tables = tables
+        self.nb_queries = 0
+
+    def matches(
+            self,
+            record: dict,
+            filter: dict
+        ) -> bool:
+
+        for key, value in filter.items():
+
+            if key == "$or":
+                if not any(self.matches(record, f) for f in value):
+                    return False
+            elif isinstance(value, dict) and "$in" in value:
+                if record.get(key) not in value["$in"]:
+                    return False
+            elif record.get(key) != value:
+                return False
+
+        return True
+
+    async def get_data(
+            self,
+            table: str,
+            filter: dict | None = None,
+            **kwargs
+        ) -> list[dict]:
+
+        self.nb_queries += 1
+
+        return [
+            dict(record) for record in self.tables.get(table, [])
+            if self.matches(record, filter or {})
+        ]
+
+
+def make_tables(
+        nb_chatbots: int
+    ) -> dict[str, list[dict]]:
+
+    tables = {"Chatbots": [], "Access": [], "SuggestedPrompts": [], "Documents": []}
+
+    for i in range(nb_chatbots):
+
+        chatbot_id = f"chatbot-{i}"
+
+        tables["Chatbots"].append({"id": chatbot_id, "access": "private"})
+        tables["Access"].append(
+            {
+                "id": f"access-{i}",
+                "chatbot_id": chatbot_id,
+                "user_id": "user",
+                "role": "Admin"
+            }
+        )
+        tables["SuggestedPrompts"].append(
+            {"chatbot_id": chatbot_id, "prompt": f"prompt-{i}"}
+        )
+        tables["Documents"].append(
+            {
+                "id": f"document-{i}",
+                "chatbot_id": chatbot_id,
+                "created_by": "user",
+                "filename": f"document-{i}.pdf",
+                "public_path": f"public/document-{i}.pdf",
+                "uri": f"file:///document-{i}.pdf",
+                "nb_pages": 1
+            }
+        )
+
+    return tables
+
+
+def get_user_chatbots(
+        nb_chatbots: int
+    ) -> tuple[list[dict], int]:
+
+    db = CountingDatabase(make_tables(nb_chatbots))
+
+    docu_talk = DocuTalk.__new__(DocuTalk)
+    docu_talk.db = db
+
+    chatbots = asyncio.run(docu_talk.get_user_chatbots(user_id="user"))
+
+    return chatbots, db.nb_queries
+
+
+@pytest.mark.parametrize("nb_chatbots", [10, 100])
+def test_get_user_chatbots_query_count_is_constant(nb_chatbots):
+
+    _, single_queries = get_user_chatbots(1)
+    chatbots, many_queries = get_user_chatbots(nb_chatbots)
+
+    assert len(chatbots) == nb_chatbots
+    assert many_queries == single_queries
+
+
+def test_get_user_chatbots_joins_related_records():
+
+    chatbots, _ = get_user_chatbots(3)
+
+    for i, chatbot in enumerate(chatbots):
+        assert chatbot["user_role"] == "Admin"
+        assert chatbot["suggested_prompts"] == [f"prompt-{i}"]
+        assert [d["id"] for d in chatbot["documents"]] == [f"document-{i}"]
+        assert [a["id"] for a in chatbot["accesses"]] == [f"access-{i}"]
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    A bounded in-process cache evicting the least recently used entries, whose entries
+    expire after a time-to-live.
+    """
+
+    def __init__(
+            self,
+            maxsize: int = 1024,
+            ttl: float = 300
+        ) -> None:
+        """
+        Initializes the cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of entries (default is 1024).
+        ttl : float, optional
+            The default time-to-live of an entry, in seconds (default is 300).
+        """
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+            self,
+            key: Hashable,
+            default: Any = None
+        ) -> Any:
+        """
+        Retrieves a value from the cache.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the entry.
+        default : Any, optional
+            The value returned if the entry is missing or expired (default is None).
+
+        Returns
+        -------
+        Any
+            The cached value, or the default value.
+        """
+
+        with self.lock:
+
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[1]
+
+    def set(
+            self,
+            key: Hashable,
+            value: Any,
+            ttl: float | None = None
+        ) -> None:
+        """
+        Stores a value in the cache, evicting the least recently used entry if the
+        cache is full.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the entry.
+        value : Any
+            The value to store.
+        ttl : float or None, optional
+            The time-to-live of the entry, in seconds (default is None, the cache's
+            default time-to-live).
+        """
+
+        if ttl is None:
+            ttl = self.ttl
+
+        with self.lock:
+
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(
+            self,
+            key: Hashable
+        ) -> None:
+        """
+        Removes an entry from the cache.
+
+        Parameters
+        ----------
+        key : Hashable
+            The key of the entry.
+        """
+
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def invalidate_where(
+            self,
+            predicate: Callable[[Hashable], bool]
+        ) -> None:
+        """
+        Removes the entries whose key matches a predicate.
+
+        Parameters
+        ----------
+        predicate : Callable
+            A function returning True for the keys to remove.
+        """
+
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                del self.entries[key]
+
+    def clear(self) -> None:
+        """
+        Removes all the entries from the cache.
+        """
+
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> dict[str, int | float]:
+        """
+        Retrieves the usage counters of the cache.
+
+        Returns
+        -------
+        dict
+            The number of entries, hits and misses, and the hit rate.
+        """
+
+        with self.lock:
+
+            nb_lookups = self.hits + self.misses
+
+            stats = {
+                "size": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / nb_lookups if nb_lookups > 0 else 0
+            }
+
+        return stats
@@ -0,0 +1,83 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable
+
+
+@dataclass
+class Stage:
+    """
+    A step of a pipeline, run once all the stages it depends on are complete.
+
+    Attributes
+    ----------
+    name : str
+        The unique name of the stage.
+    run : Callable
+        The coroutine function running the stage, called with the results of its
+        dependencies, in order.
+    dependencies : list of str
+        The names of the stages the stage depends on.
+    """
+
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    dependencies: list[str] = field(default_factory=list)
+
+async def run_stages(stages: list[Stage]) -> AsyncGenerator[tuple[str, Any], None]:
+    """
+    Runs a directed acyclic graph of stages, each stage starting as soon as its
+    dependencies are complete.
+
+    Parameters
+    ----------
+    stages : list of Stage
+        The stages to run.
+
+    Yields
+    ------
+    tuple of (str, Any)
+        The name and the result of each stage, in order of completion.
+
+    Raises
+    ------
+    ValueError
+        If a dependency is unknown or the dependencies are cyclic.
+    Exception
+        Any exception raised by a stage, the running stages being cancelled.
+    """
+
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        unknown = set(stage.dependencies) - names
+        if len(unknown) > 0:
+            raise ValueError(
+                f"Stage `{stage.name}` depends on unknown stages {unknown}"
+            )
+
+    pending = {stage.name: stage for stage in stages}
+    running: dict[asyncio.Task, str] = {}
+    results = {}
+
+    try:
+        while len(pending) > 0 or len(running) > 0:
+
+            for name, stage in list(pending.items()):
+                if all(dependency in results for dependency in stage.dependencies):
+                    args = [results[dependency] for dependency in stage.dependencies]
+                    running[asyncio.create_task(stage.run(*args))] = name
+                    del pending[name]
+
+            if len(running) == 0:
+                raise ValueError(f"Stages {set(pending)} have cyclic dependencies")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                name = running.pop(task)
+                results[name] = task.result()
+                yield name, results[name]
+
+    finally:
+        # Stops the other stages if one failed or the consumer went away
+        for task in running:
+            task.cancel()
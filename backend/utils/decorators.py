@@ -1,6 +1,62 @@
+import asyncio
+import functools
+import logging
 import random
 import time
 
+logger = logging.getLogger(__name__)
+
+
+def get_next_delay(
+        error: Exception,
+        num_retries: int,
+        delay: float,
+        exponential_base: float,
+        jitter: bool,
+        max_retries: int
+    ) -> float:
+    """
+    Decides whether a failed call is retried, and how long to wait before.
+
+    Parameters
+    ----------
+    error : Exception
+        The error raised by the call.
+    num_retries : int
+        The number of retries including the upcoming one.
+    delay : float
+        The delay waited before the previous retry, in seconds.
+    exponential_base : float
+        The base for the exponential growth of the delay.
+    jitter : bool
+        Whether to add random jitter to the delay.
+    max_retries : int
+        The maximum number of retries before raising an exception.
+
+    Returns
+    -------
+    float
+        The delay to wait before the upcoming retry, in seconds.
+
+    Raises
+    ------
+    Exception
+        If the maximum number of retries is exceeded.
+    """
+
+    if num_retries > max_retries:
+        raise Exception(
+            f"Maximum number of retries ({max_retries}) exceeded."
+        ) from error
+
+    delay *= exponential_base * (1 + jitter * random.random()) # noqa: S311
+
+    logger.warning(
+        f"{type(error).__name__}: {error} => Retry in {round(delay, 2)} seconds"
+    )
+
+    return delay
+
 
 def retry_with_exponential_backoff(
         initial_delay: float = 1,
@@ -11,7 +67,7 @@ def retry_with_exponential_backoff(
     ):
     """
     A decorator to retry a function with exponential backoff in case of specified
-    errors.
+    errors. Coroutine functions are retried without blocking the event loop.
 
     Parameters
     ----------
@@ -38,6 +94,33 @@ def retry_with_exponential_backoff(
     """
 
     def decorator(func):
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                num_retries = 0
+                delay = initial_delay
+
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+
+                    except errors as e:
+                        num_retries += 1
+                        delay = get_next_delay(
+                            e,
+                            num_retries=num_retries,
+                            delay=delay,
+                            exponential_base=exponential_base,
+                            jitter=jitter,
+                            max_retries=max_retries
+                        )
+
+                        await asyncio.sleep(delay)
+
+            return async_wrapper
+
         def wrapper(*args, **kwargs):
             num_retries = 0
             delay = initial_delay
@@ -48,16 +131,13 @@ def retry_with_exponential_backoff(
 
                 except errors as e:
                     num_retries += 1
-                    if num_retries > max_retries:
-                        raise Exception(
-                            f"Maximum number of retries ({max_retries}) exceeded."
-                        ) from e
-
-                    delay *= exponential_base * (1 + jitter * random.random()) # noqa: S311
-
-                    print(
-                        f"{type(e).__name__}: {e} => Retry in "
-                        f"{round(delay, 2)} seconds"
+                    delay = get_next_delay(
+                        e,
+                        num_retries=num_retries,
+                        delay=delay,
+                        exponential_base=exponential_base,
+                        jitter=jitter,
+                        max_retries=max_retries
                     )
 
                     time.sleep(delay)
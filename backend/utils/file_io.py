@@ -1,10 +1,15 @@
+import asyncio
 import base64
+import hashlib
 import os
+import tempfile
 from typing import Any, Dict
 
 import fitz
 from easyenvi import file
 
+from docu_talk.exceptions import FileTooLargeError, TooManyPagesError
+
 
 def recursive_read(
         folder: str,
@@ -75,14 +80,34 @@ def get_encoded_image(path):
 
     return encoded_image
 
-def get_nb_pages_pdf(pdf_bytes):
+def open_pdf(pdf):
+    """
+    Opens a PDF document from its content or from a local file.
+
+    Parameters
+    ----------
+    pdf : bytes or str
+        The binary content of the PDF file, or its path.
+
+    Returns
+    -------
+    fitz.Document
+        The PDF document.
+    """
+
+    if isinstance(pdf, bytes):
+        return fitz.open(stream=pdf, filetype="pdf")
+
+    return fitz.open(pdf, filetype="pdf")
+
+def get_nb_pages_pdf(pdf):
     """
     Retrieves the number of pages in a PDF document.
 
     Parameters
     ----------
-    pdf_bytes : bytes
-        The binary content of the PDF file.
+    pdf : bytes or str
+        The binary content of the PDF file, or its path.
 
     Returns
     -------
@@ -90,6 +115,181 @@ def get_nb_pages_pdf(pdf_bytes):
         The number of pages in the PDF document.
     """
 
-    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    with open_pdf(pdf) as pdf_document:
+        nb_pages = pdf_document.page_count
+
+    return nb_pages
+
+def get_pdf_pages_text(pdf):
+    """
+    Extracts the text of each page of a PDF document, with whitespace collapsed.
+
+    Parameters
+    ----------
+    pdf : bytes or str
+        The binary content of the PDF file, or its path.
+
+    Returns
+    -------
+    list of str
+        The text of each page, in page order (empty for pages without a text layer,
+        e.g. scanned pages).
+    """
+
+    with open_pdf(pdf) as pdf_document:
+        pages = [" ".join(page.get_text().split()) for page in pdf_document]
+
+    return pages
+
+async def spool_upload(
+        upload,
+        max_bytes: int,
+        chunk_size: int = 1024 * 1024
+    ) -> tuple[str, int, str]:
+    """
+    Copies an uploaded file to a temporary file chunk by chunk, so that the file is
+    never held in memory as a whole, and hashes it on the way.
+
+    Parameters
+    ----------
+    upload : UploadFile
+        The uploaded file.
+    max_bytes : int
+        The maximum size of the file, in bytes.
+    chunk_size : int, optional
+        The number of bytes read at once (default is 1 MiB).
+
+    Returns
+    -------
+    tuple of (str, int, str)
+        The path of the temporary file, the size of the file in bytes, and the hex
+        SHA-256 digest of its content.
+
+    Raises
+    ------
+    FileTooLargeError
+        As soon as the file exceeds the maximum size, the temporary file being deleted.
+    """
+
+    size = 0
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        try:
+            while chunk := await upload.read(chunk_size):
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(
+                        f"{upload.filename} exceeds {max_bytes // 1024 ** 2} MB"
+                    )
+
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+
+        except BaseException:
+            f.close()
+            os.remove(f.name)
+            raise
+
+    return f.name, size, digest.hexdigest()
+
+async def spool_pdf_uploads(
+        uploads: list,
+        max_document_bytes: int,
+        max_total_bytes: int,
+        max_total_pages: int,
+        total_bytes: int = 0,
+        total_pages: int = 0
+    ) -> list[dict]:
+    """
+    Copies uploaded PDF documents to temporary files, stopping as soon as a size or
+    page limit is exceeded.
+
+    Parameters
+    ----------
+    uploads : list of UploadFile
+        The uploaded documents.
+    max_document_bytes : int
+        The maximum size of a document, in bytes.
+    max_total_bytes : int
+        The maximum size of all the documents, in bytes.
+    max_total_pages : int
+        The maximum number of pages of all the documents.
+    total_bytes : int, optional
+        The size of the documents already counted in the limits, in bytes (default is
+        0).
+    total_pages : int, optional
+        The number of pages already counted in the limits (default is 0).
+
+    Returns
+    -------
+    list of dict
+        The `filename`, temporary file `path`, `size`, `sha256` digest and `nb_pages`
+        of each document, in upload order. The temporary files should be deleted with
+        `remove_spooled_files` once processed.
+
+    Raises
+    ------
+    FileTooLargeError
+        If a document, or all the documents, exceed the maximum size.
+    TooManyPagesError
+        If the documents exceed the maximum number of pages.
+    """
+
+    documents = []
+
+    try:
+        for upload in uploads:
+
+            remaining_bytes = max_total_bytes - total_bytes
+            try:
+                path, size, sha256 = await spool_upload(
+                    upload,
+                    max_bytes=min(max_document_bytes, remaining_bytes)
+                )
+            except FileTooLargeError as e:
+                if remaining_bytes < max_document_bytes:
+                    raise FileTooLargeError(
+                        f"The documents exceed {max_total_bytes // 1024 ** 2} MB"
+                    ) from e
+                raise
+            nb_pages = await asyncio.to_thread(get_nb_pages_pdf, path)
+
+            documents.append(
+                {
+                    "filename": upload.filename,
+                    "path": path,
+                    "size": size,
+                    "sha256": sha256,
+                    "nb_pages": nb_pages
+                }
+            )
+
+            total_bytes += size
+            total_pages += nb_pages
+            if total_pages > max_total_pages:
+                raise TooManyPagesError(
+                    f"The documents exceed {max_total_pages} pages"
+                )
+
+    except BaseException:
+        remove_spooled_files(documents)
+        raise
+
+    return documents
+
+def remove_spooled_files(documents: list[dict]) -> None:
+    """
+    Deletes the temporary files of spooled documents.
+
+    Parameters
+    ----------
+    documents : list of dict
+        The documents returned by `spool_pdf_uploads`.
+    """
 
-    return pdf_document.page_count
+    for document in documents:
+        try:
+            os.remove(document["path"])
+        except FileNotFoundError:
+            pass
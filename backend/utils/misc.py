@@ -1,4 +1,7 @@
+import base64
+import json
 import os
+from datetime import datetime, timedelta
 
 
 def get_param_or_env(
@@ -36,3 +39,74 @@ def get_param_or_env(
             f"{env_var} is not set. You should specify it as a parameter or "
             "as an environment variable."
         )
+
+def encode_cursor(
+        timestamp: datetime,
+        id: str
+    ) -> str:
+    """
+    Encodes the position of a record into an opaque pagination cursor.
+
+    Parameters
+    ----------
+    timestamp : datetime
+        The timestamp of the last returned record.
+    id : str
+        The ID of the last returned record.
+
+    Returns
+    -------
+    str
+        The URL-safe pagination cursor.
+    """
+
+    position = json.dumps({"timestamp": timestamp.isoformat(), "id": id})
+
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("utf-8")
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decodes a pagination cursor built by `encode_cursor`.
+
+    Parameters
+    ----------
+    cursor : str
+        The pagination cursor.
+
+    Returns
+    -------
+    tuple of (datetime, str)
+        The timestamp and the ID of the last returned record.
+
+    Raises
+    ------
+    ValueError
+        If the cursor is malformed.
+    """
+
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+        return datetime.fromisoformat(position["timestamp"]), position["id"]
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+def get_start_of_week(timestamp: datetime) -> datetime:
+    """
+    Retrieves the start (Monday, midnight) of the week containing a timestamp.
+
+    Parameters
+    ----------
+    timestamp : datetime
+        The timestamp.
+
+    Returns
+    -------
+    datetime
+        The start of the week.
+    """
+
+    start_of_week = (timestamp - timedelta(days=timestamp.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+
+    return start_of_week
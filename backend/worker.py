@@ -0,0 +1,22 @@
+import asyncio
+
+from dotenv import load_dotenv
+
+from config.config import docu_talk
+from docu_talk.jobs import JobWorker
+
+load_dotenv()
+
+async def main() -> None:
+    """
+    Runs a job worker, to scale job processing separately from the API (in which case
+    the API is started with `RUN_JOB_WORKER=false`).
+    """
+
+    await docu_talk.db.ensure_indexes()
+
+    await JobWorker(docu_talk).run_forever()
+
+if __name__ == "__main__":
+
+    asyncio.run(main())